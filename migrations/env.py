@@ -97,6 +97,15 @@ def run_migrations_online():
     connectable = get_engine()
 
     with connectable.connect() as connection:
+        sqlite = connection.dialect.name == "sqlite"
+        if sqlite:
+            # foreign_keys=ON dari SQLITE_PRAGMAS membuat batch_alter_table
+            # (copy + DROP TABLE) gagal jika tabel direferensikan baris lain;
+            # PRAGMA ini tidak berlaku di dalam transaksi, jadi set sebelum mulai.
+            foreign_keys = connection.exec_driver_sql("PRAGMA foreign_keys").scalar()
+            connection.exec_driver_sql("PRAGMA foreign_keys=OFF")
+            connection.commit()
+
         context.configure(
             connection=connection,
             target_metadata=get_metadata(),
@@ -106,6 +115,16 @@ def run_migrations_online():
         with context.begin_transaction():
             context.run_migrations()
 
+        if sqlite:
+            violations = connection.exec_driver_sql("PRAGMA foreign_key_check").all()
+            connection.exec_driver_sql(f"PRAGMA foreign_keys={'ON' if foreign_keys else 'OFF'}")
+            connection.commit()
+            if violations:
+                raise RuntimeError(
+                    f"Migrasi meninggalkan {len(violations)} pelanggaran foreign key, "
+                    f"mis. {tuple(violations[0])}"
+                )
+
 
 if context.is_offline_mode():
     run_migrations_offline()
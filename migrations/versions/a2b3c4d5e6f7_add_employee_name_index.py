@@ -0,0 +1,22 @@
+"""add employee (name, id) index for directory keyset pagination
+
+Revision ID: a2b3c4d5e6f7
+Revises: f1a2b3c4d5e6
+Create Date: 2026-10-19 10:00:00.000000
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'a2b3c4d5e6f7'
+down_revision = 'f1a2b3c4d5e6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_employee_name_id', 'employee', ['name', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_employee_name_id', table_name='employee')
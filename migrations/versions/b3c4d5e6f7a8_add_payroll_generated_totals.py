@@ -0,0 +1,42 @@
+"""add stored generated take_home_pay / total_deductions to payroll
+
+Revision ID: b3c4d5e6f7a8
+Revises: a2b3c4d5e6f7
+Create Date: 2026-10-19 11:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3c4d5e6f7a8'
+down_revision = 'a2b3c4d5e6f7'
+branch_labels = None
+depends_on = None
+
+TOTAL_DEDUCTIONS_SQL = (
+    "potongan_gaji + hutang + alpha * (gaji_pokok / 30.0) + loan_deduction"
+    " + bpjs_ketenagakerjaan + bpjs_kesehatan + pph21"
+)
+TAKE_HOME_PAY_SQL = (
+    "gaji_pokok + tunjangan_makan + tunjangan_transport + tunjangan_lainnya + upah_lembur + thr"
+    f" - ({TOTAL_DEDUCTIONS_SQL})"
+)
+
+
+def upgrade():
+    # Kolom STORED langsung terisi untuk semua baris lama (Postgres me-rewrite tabel,
+    # SQLite lewat batch = tabel dibuat ulang lalu data disalin), tanpa backfill manual.
+    with op.batch_alter_table('payroll') as batch_op:
+        batch_op.add_column(sa.Column('total_deductions', sa.Float(),
+                                      sa.Computed(TOTAL_DEDUCTIONS_SQL, persisted=True)))
+        batch_op.add_column(sa.Column('take_home_pay', sa.Float(),
+                                      sa.Computed(TAKE_HOME_PAY_SQL, persisted=True)))
+        batch_op.create_index('ix_payroll_take_home_pay', ['take_home_pay'])
+
+
+def downgrade():
+    with op.batch_alter_table('payroll') as batch_op:
+        batch_op.drop_index('ix_payroll_take_home_pay')
+        batch_op.drop_column('take_home_pay')
+        batch_op.drop_column('total_deductions')
@@ -0,0 +1,39 @@
+"""add payroll.period_start date column
+
+Revision ID: c4d5e6f7a8b9
+Revises: b3c4d5e6f7a8
+Create Date: 2026-10-19 12:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4d5e6f7a8b9'
+down_revision = 'b3c4d5e6f7a8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('payroll', sa.Column('period_start', sa.Date(), nullable=True))
+
+    # backfill dari pay_period "YYYY-MM"; nilai yang tidak valid dibiarkan NULL
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(
+            "UPDATE payroll SET period_start = to_date(pay_period || '-01', 'YYYY-MM-DD') "
+            "WHERE pay_period ~ '^[0-9]{4}-(0[1-9]|1[0-2])$'"
+        )
+    else:
+        op.execute(
+            "UPDATE payroll SET period_start = pay_period || '-01' "
+            "WHERE pay_period GLOB '[0-9][0-9][0-9][0-9]-[0-1][0-9]' "
+            "AND substr(pay_period, 6, 2) BETWEEN '01' AND '12'"
+        )
+
+    op.create_index('ix_payroll_period_start', 'payroll', ['period_start'])
+
+
+def downgrade():
+    op.drop_index('ix_payroll_period_start', table_name='payroll')
+    op.drop_column('payroll', 'period_start')
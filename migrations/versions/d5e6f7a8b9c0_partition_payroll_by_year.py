@@ -0,0 +1,43 @@
+"""add payroll_loan.payroll_period_start; optional yearly partitioning of payroll
+
+Kolom payroll_loan.payroll_period_start selalu ditambahkan. Konversi payroll
+menjadi tabel berpartisi per tahun hanya dijalankan di Postgres bila
+PAYROLL_PARTITIONING=1 saat upgrade (bisa juga belakangan lewat
+`flask partitions enable`).
+
+Revision ID: d5e6f7a8b9c0
+Revises: c4d5e6f7a8b9
+Create Date: 2026-10-19 14:00:00.000000
+"""
+import os
+
+from alembic import op
+import sqlalchemy as sa
+
+from payroll import partitions
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5e6f7a8b9c0'
+down_revision = 'c4d5e6f7a8b9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('payroll_loan', sa.Column('payroll_period_start', sa.Date(), nullable=True))
+    op.execute(
+        "UPDATE payroll_loan SET payroll_period_start = "
+        "(SELECT period_start FROM payroll WHERE payroll.id = payroll_loan.payroll_id)"
+    )
+
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql' and os.getenv('PAYROLL_PARTITIONING') == '1':
+        partitions.enable_partitioning(bind)
+
+
+def downgrade():
+    bind = op.get_bind()
+    if partitions.is_partitioned(bind):
+        partitions.disable_partitioning(bind)
+    op.drop_column('payroll_loan', 'payroll_period_start')
@@ -0,0 +1,93 @@
+"""add loan_schedule (one row per installment) and backfill approved loans
+
+Revision ID: e6f7a8b9c0d1
+Revises: d5e6f7a8b9c0
+Create Date: 2026-10-19 15:00:00.000000
+"""
+from datetime import date, datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6f7a8b9c0d1'
+down_revision = 'd5e6f7a8b9c0'
+branch_labels = None
+depends_on = None
+
+
+def _add_months(value, months):
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def upgrade():
+    schedule = op.create_table(
+        'loan_schedule',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('loan_id', sa.Integer(), nullable=False),
+        sa.Column('employee_id', sa.Integer(), nullable=False),
+        sa.Column('installment_number', sa.Integer(), nullable=False),
+        sa.Column('due_period', sa.Date(), nullable=False),
+        sa.Column('amount', sa.Float(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('payment_id', sa.Integer(), nullable=True),
+        sa.Column('payroll_id', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['loan_id'], ['loan.id']),
+        sa.ForeignKeyConstraint(['employee_id'], ['employee.id']),
+        sa.ForeignKeyConstraint(['payment_id'], ['payment.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('loan_id', 'installment_number', name='uq_loan_schedule_number'),
+        sa.UniqueConstraint('payment_id'),
+    )
+    op.create_index('ix_loan_schedule_status_due', 'loan_schedule', ['status', 'due_period'])
+    op.create_index('ix_loan_schedule_employee_id', 'loan_schedule', ['employee_id'])
+    op.create_index('ix_loan_schedule_payroll_id', 'loan_schedule', ['payroll_id'])
+
+    # backfill: pinjaman approved/completed; payment approved/posted mengisi cicilan awal
+    bind = op.get_bind()
+    loan = sa.table('loan', sa.column('id', sa.Integer), sa.column('employee_id', sa.Integer),
+                    sa.column('tenor', sa.Integer), sa.column('installment', sa.Float),
+                    sa.column('status', sa.String), sa.column('approval_date', sa.DateTime),
+                    sa.column('application_date', sa.DateTime))
+    payment = sa.table('payment', sa.column('id', sa.Integer), sa.column('loan_id', sa.Integer),
+                       sa.column('status', sa.String), sa.column('payment_date', sa.DateTime))
+    payroll_loan = sa.table('payroll_loan', sa.column('payment_id', sa.Integer),
+                            sa.column('payroll_id', sa.Integer))
+
+    paid = {}
+    for row in bind.execute(
+        sa.select(payment.c.id, payment.c.loan_id, payroll_loan.c.payroll_id)
+        .select_from(payment.outerjoin(payroll_loan, payroll_loan.c.payment_id == payment.c.id))
+        .where(payment.c.status.in_(('approved', 'posted')))
+        .order_by(payment.c.loan_id, payment.c.payment_date, payment.c.id)
+    ):
+        paid.setdefault(row.loan_id, []).append(row)
+
+    rows = []
+    for item in bind.execute(sa.select(loan).where(loan.c.status.in_(('approved', 'completed')))):
+        approved_on = item.approval_date or item.application_date or datetime.now()
+        first_due = _add_months(approved_on.date(), 1)
+        payments = paid.get(item.id, [])
+        for number in range(1, (item.tenor or 0) + 1):
+            settled = payments[number - 1] if number <= len(payments) else None
+            rows.append({
+                'loan_id': item.id,
+                'employee_id': item.employee_id,
+                'installment_number': number,
+                'due_period': _add_months(first_due, number - 1),
+                'amount': item.installment,
+                'status': 'paid' if settled or item.status == 'completed' else 'open',
+                'payment_id': settled.id if settled else None,
+                'payroll_id': settled.payroll_id if settled else None,
+            })
+    if rows:
+        op.bulk_insert(schedule, rows)
+
+
+def downgrade():
+    op.drop_index('ix_loan_schedule_payroll_id', table_name='loan_schedule')
+    op.drop_index('ix_loan_schedule_employee_id', table_name='loan_schedule')
+    op.drop_index('ix_loan_schedule_status_due', table_name='loan_schedule')
+    op.drop_table('loan_schedule')
@@ -0,0 +1,56 @@
+"""add employee search index (pg_trgm / FTS5)
+
+Revision ID: f1a2b3c4d5e6
+Revises: e7f8a9b0c1d2
+Create Date: 2026-10-19 09:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1a2b3c4d5e6'
+down_revision = 'e7f8a9b0c1d2'
+branch_labels = None
+depends_on = None
+
+COLUMNS = ('name', 'nik', 'position', 'no_rek')
+
+
+def upgrade():
+    bind = op.get_bind()
+    cols = ', '.join(COLUMNS)
+    new = ', '.join(f'new.{c}' for c in COLUMNS)
+    old = ', '.join(f'old.{c}' for c in COLUMNS)
+
+    if bind.dialect.name == 'postgresql':
+        # pg_trgm bisa tidak tersedia (mis. managed DB); pencarian tetap jalan tanpa indeks.
+        try:
+            with bind.begin_nested():
+                op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+                for c in COLUMNS:
+                    op.execute(f"CREATE INDEX IF NOT EXISTS ix_employee_{c}_trgm ON employee USING gin ({c} gin_trgm_ops)")
+        except sa.exc.DBAPIError:
+            pass
+    elif bind.dialect.name == 'sqlite':
+        op.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS employee_fts USING fts5("
+                   f"{cols}, content='employee', content_rowid='id', tokenize='trigram')")
+        op.execute(f"CREATE TRIGGER IF NOT EXISTS employee_fts_ai AFTER INSERT ON employee BEGIN "
+                   f"INSERT INTO employee_fts(rowid, {cols}) VALUES (new.id, {new}); END")
+        op.execute(f"CREATE TRIGGER IF NOT EXISTS employee_fts_ad AFTER DELETE ON employee BEGIN "
+                   f"INSERT INTO employee_fts(employee_fts, rowid, {cols}) VALUES ('delete', old.id, {old}); END")
+        op.execute(f"CREATE TRIGGER IF NOT EXISTS employee_fts_au AFTER UPDATE ON employee BEGIN "
+                   f"INSERT INTO employee_fts(employee_fts, rowid, {cols}) VALUES ('delete', old.id, {old}); "
+                   f"INSERT INTO employee_fts(rowid, {cols}) VALUES (new.id, {new}); END")
+        op.execute("INSERT INTO employee_fts(employee_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        for c in COLUMNS:
+            op.execute(f"DROP INDEX IF EXISTS ix_employee_{c}_trgm")
+    elif bind.dialect.name == 'sqlite':
+        for suffix in ('ai', 'ad', 'au'):
+            op.execute(f"DROP TRIGGER IF EXISTS employee_fts_{suffix}")
+        op.execute("DROP TABLE IF EXISTS employee_fts")
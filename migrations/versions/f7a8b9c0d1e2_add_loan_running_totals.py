@@ -0,0 +1,32 @@
+"""add loan.paid_amount / loan.pending_amount running totals
+
+Revision ID: f7a8b9c0d1e2
+Revises: e6f7a8b9c0d1
+Create Date: 2026-10-19 16:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f7a8b9c0d1e2'
+down_revision = 'e6f7a8b9c0d1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('loan', sa.Column('paid_amount', sa.Float(), nullable=False, server_default='0'))
+    op.add_column('loan', sa.Column('pending_amount', sa.Float(), nullable=False, server_default='0'))
+    op.execute(
+        "UPDATE loan SET "
+        "paid_amount = COALESCE((SELECT SUM(payment_amount) FROM payment "
+        "  WHERE payment.loan_id = loan.id AND payment.status IN ('approved', 'posted')), 0), "
+        "pending_amount = COALESCE((SELECT SUM(payment_amount) FROM payment "
+        "  WHERE payment.loan_id = loan.id AND payment.status = 'pending'), 0)"
+    )
+
+
+def downgrade():
+    op.drop_column('loan', 'pending_amount')
+    op.drop_column('loan', 'paid_amount')
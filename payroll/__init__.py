@@ -0,0 +1,47 @@
+"""Aplikasi payroll Flask.
+
+Gunakan create_app() untuk membuat instance aplikasi. Import modul ini sengaja
+ringan: pandas/pdfkit hanya di-import oleh route ekspor/import yang memakainya,
+dan alembic hanya saat dijalankan lewat CLI `flask`.
+"""
+import os
+
+from dotenv import load_dotenv
+from flask import Flask
+
+# .env harus terbaca sebelum modul lain membaca env di level modul (tarif BPJS/PPH21).
+load_dotenv()
+
+from payroll.backup import start_backup_worker  # noqa: E402
+from payroll.blueprints import register_blueprints  # noqa: E402
+from payroll.cli import register_cli  # noqa: E402
+from payroll.config import BASE_DIR, load_config  # noqa: E402
+from payroll.database import init_database  # noqa: E402
+from payroll.extensions import db  # noqa: E402
+from payroll.profiling import init_profiler  # noqa: E402
+from payroll.utils import rupiah_format, strftime_filter  # noqa: E402
+
+
+def create_app(config=None):
+    app = Flask(__name__, root_path=BASE_DIR)
+    load_config(app, config)
+
+    db.init_app(app)
+    init_database(app)
+    init_profiler(app)
+
+    # Flask-Migrate (alembic) hanya dibutuhkan perintah `flask db ...`.
+    if os.getenv("FLASK_RUN_FROM_CLI") == "true":
+        from flask_migrate import Migrate
+
+        Migrate(app, db)
+
+    app.add_template_filter(strftime_filter, 'strftime')
+    app.add_template_filter(rupiah_format, 'rupiah')
+    register_blueprints(app)
+    register_cli(app)
+
+    if app.config['AUTO_BACKUP_WORKER']:
+        start_backup_worker(app)
+
+    return app
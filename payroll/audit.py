@@ -0,0 +1,31 @@
+"""Pencatatan audit log."""
+import sqlalchemy as sa
+from flask import session
+
+from payroll.extensions import db
+from payroll.models import AuditLog
+
+
+def log_action(action, entity_type, entity_id, details=None):
+    user_id = session.get('user_id')
+    entry = AuditLog(
+        user_id=user_id,
+        action=action,
+        entity_type=entity_type,
+        entity_id=entity_id,
+        details=details
+    )
+    db.session.add(entry)
+    db.session.commit()
+
+
+def log_actions(action, entity_type, entity_ids, details=None):
+    """Catat banyak entri audit sekaligus (satu INSERT batch, tanpa commit)."""
+    user_id = session.get('user_id')
+    rows = [
+        {"user_id": user_id, "action": action, "entity_type": entity_type,
+         "entity_id": entity_id, "details": details}
+        for entity_id in entity_ids
+    ]
+    if rows:
+        db.session.execute(sa.insert(AuditLog), rows)
@@ -0,0 +1,205 @@
+"""Backup JSON database dan worker backup otomatis (juga snapshot analitik Parquet dan pemeliharaan SQLite terjadwal)."""
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+import sqlalchemy as sa
+
+from payroll.config import BASE_DIR
+from payroll.database import read_from_replica, run_scheduled_sqlite_maintenance
+from payroll.extensions import db
+from payroll.models import BackupSettings
+from payroll.partitions import partition_child_tables
+from payroll.services.analytics_export import run_scheduled_snapshot
+from payroll.services.search import is_fts_table
+from payroll.utils import utcnow, serialize_value
+
+
+AUTO_BACKUP_POLL_SECONDS = max(10, int(os.getenv("AUTO_BACKUP_POLL_SECONDS", "60")))
+backup_worker_thread = None
+backup_worker_lock = threading.Lock()
+backup_run_lock = threading.Lock()
+
+
+def ensure_backup_dir():
+    backup_dir = os.path.join(BASE_DIR, "backups")
+    os.makedirs(backup_dir, exist_ok=True)
+    return backup_dir
+
+
+def export_database_json():
+    backup_dir = ensure_backup_dir()
+    timestamp = utcnow().strftime("%Y%m%d_%H%M%S")
+    backend = db.engine.url.get_backend_name()
+    filename = f"backup_{backend}_{timestamp}.json"
+    path = os.path.join(backup_dir, filename)
+
+    metadata = sa.MetaData()
+    with db.engine.connect() as conn:
+        # partisi payroll sudah terbaca lewat tabel induknya; indeks FTS
+        # SQLite dibangun ulang dari tabel employee
+        children = partition_child_tables(conn)
+        metadata.reflect(bind=conn, only=lambda name, _: name not in children and not is_fts_table(name))
+
+    data = {
+        "meta": {
+            "exported_at": utcnow().isoformat() + "Z",
+            "backend": backend,
+            "database": db.engine.url.render_as_string(hide_password=True),
+        },
+        "tables": {},
+    }
+
+    with read_from_replica():
+        for table in metadata.sorted_tables:
+            rows = db.session.execute(sa.select(table)).mappings().all()
+            data["tables"][table.name] = [
+                {k: serialize_value(v) for k, v in row.items()} for row in rows
+            ]
+
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(data, handle, ensure_ascii=True, indent=2)
+
+    return path
+
+
+def get_backup_settings(create_if_missing=True):
+    try:
+        settings = BackupSettings.query.first()
+    except Exception:
+        db.session.rollback()
+        return None
+
+    if not settings and create_if_missing:
+        settings = BackupSettings(
+            enabled=False,
+            interval_hours=24,
+            retention_count=7,
+        )
+        db.session.add(settings)
+        db.session.commit()
+
+    return settings
+
+
+def compute_next_run(now, interval_hours):
+    hours = max(1, int(interval_hours or 24))
+    return now + timedelta(hours=hours)
+
+
+def list_backup_files(limit=10):
+    backup_dir = ensure_backup_dir()
+    files = []
+
+    try:
+        for entry in os.scandir(backup_dir):
+            if not entry.is_file():
+                continue
+            if not entry.name.startswith("backup_") or not entry.name.endswith(".json"):
+                continue
+            stat = entry.stat()
+            files.append({
+                "name": entry.name,
+                "mtime": datetime.utcfromtimestamp(stat.st_mtime),
+                "size": stat.st_size,
+            })
+    except FileNotFoundError:
+        return []
+
+    files.sort(key=lambda item: item["mtime"], reverse=True)
+    if limit:
+        return files[:limit]
+    return files
+
+
+def prune_old_backups(retention_count):
+    retention = max(1, int(retention_count or 7))
+    backup_dir = ensure_backup_dir()
+    files = list_backup_files(limit=None)
+
+    for item in files[retention:]:
+        try:
+            os.remove(os.path.join(backup_dir, item["name"]))
+        except OSError:
+            continue
+
+
+def run_scheduled_backup(app):
+    if not backup_run_lock.acquire(blocking=False):
+        return
+
+    try:
+        with app.app_context():
+            settings = get_backup_settings(create_if_missing=False)
+            if not settings or not settings.enabled:
+                return
+
+            now = utcnow()
+            if settings.next_run_at and now < settings.next_run_at:
+                return
+
+            backup_path = export_database_json()
+            settings.last_run_at = now
+            settings.last_status = "success"
+            settings.last_error = None
+            settings.last_backup_file = os.path.basename(backup_path)
+            settings.next_run_at = compute_next_run(now, settings.interval_hours)
+            db.session.commit()
+            prune_old_backups(settings.retention_count)
+    except Exception as exc:
+        with app.app_context():
+            db.session.rollback()
+            settings = get_backup_settings(create_if_missing=False)
+            if settings:
+                settings.last_run_at = utcnow()
+                settings.last_status = "failed"
+                settings.last_error = str(exc)
+                settings.next_run_at = compute_next_run(settings.last_run_at, settings.interval_hours)
+                db.session.commit()
+    finally:
+        backup_run_lock.release()
+
+
+def auto_backup_loop(app):
+    while True:
+        try:
+            run_scheduled_backup(app)
+        except Exception:
+            app.logger.exception("Auto backup gagal.")
+        try:
+            run_scheduled_snapshot(app)
+        except Exception:
+            app.logger.exception("Snapshot analitik gagal.")
+        try:
+            run_scheduled_sqlite_maintenance(app)
+        except Exception:
+            app.logger.exception("Pemeliharaan SQLite gagal.")
+        time.sleep(AUTO_BACKUP_POLL_SECONDS)
+
+
+def should_start_backup_worker():
+    if os.getenv("AUTO_BACKUP_DISABLED") == "1":
+        return False
+    if os.getenv("PYTEST_CURRENT_TEST"):
+        return False
+    if os.getenv("FLASK_RUN_FROM_CLI") == "true":
+        return os.getenv("WERKZEUG_RUN_MAIN") == "true"
+    return True
+
+
+def start_backup_worker(app):
+    global backup_worker_thread
+    if not should_start_backup_worker():
+        return
+    with backup_worker_lock:
+        if backup_worker_thread and backup_worker_thread.is_alive():
+            return
+        backup_worker_thread = threading.Thread(
+            target=auto_backup_loop,
+            args=(app,),
+            name="auto-backup",
+            daemon=True,
+        )
+        backup_worker_thread.start()
@@ -0,0 +1,7 @@
+"""Registrasi blueprint aplikasi."""
+from payroll.blueprints import admin, auth, employees, loans, payroll, reports
+
+
+def register_blueprints(app):
+    for module in (auth, employees, payroll, loans, reports, admin):
+        app.register_blueprint(module.bp)
@@ -0,0 +1,390 @@
+"""Blueprint admin: backup, status server, manajemen user, audit log."""
+import os
+import platform
+from datetime import datetime
+
+import flask
+import sqlalchemy as sa
+from flask import Blueprint, current_app, render_template, request, redirect, url_for, session, flash, abort, send_file
+from werkzeug.security import generate_password_hash
+from werkzeug.utils import secure_filename
+
+from payroll.backup import (
+    compute_next_run,
+    ensure_backup_dir,
+    export_database_json,
+    get_backup_settings,
+    list_backup_files,
+    prune_old_backups,
+)
+from payroll.config import BASE_DIR
+from payroll.database import (
+    check_replica_health,
+    get_pool_stats,
+    get_sql_stats,
+    replica_configured,
+    sqlite_pragma_status,
+)
+from payroll.extensions import db, REPLICA_BIND_KEY
+from payroll.models import AuditLog, Employee, Payroll, User
+from payroll.profiling import get_profile, list_profiles, profile_dir, profile_summary
+from payroll.utils import format_bytes, get_disk_usage, utcnow
+
+
+bp = Blueprint('admin', __name__)
+
+
+@bp.route('/admin/backup/settings', methods=['GET', 'POST'])
+def backup_settings():
+    if 'user_id' not in session or session.get('role') != 'admin':
+        flash('Anda tidak memiliki hak akses.', 'danger')
+        return redirect(url_for('auth.login'))
+
+    settings = get_backup_settings()
+    if not settings:
+        flash('Pengaturan backup belum tersedia. Jalankan migrasi database.', 'danger')
+        return redirect(url_for('reports.dashboard'))
+
+    if request.method == 'POST':
+        action = request.form.get('action', 'save')
+        if action == 'save':
+            enabled = request.form.get('enabled') == 'on'
+            previous_enabled = settings.enabled
+            previous_interval = settings.interval_hours
+
+            try:
+                interval_hours = int(request.form.get('interval_hours') or settings.interval_hours or 24)
+            except ValueError:
+                interval_hours = settings.interval_hours or 24
+            try:
+                retention_count = int(request.form.get('retention_count') or settings.retention_count or 7)
+            except ValueError:
+                retention_count = settings.retention_count or 7
+
+            interval_hours = max(1, min(interval_hours, 720))
+            retention_count = max(1, min(retention_count, 365))
+
+            settings.enabled = enabled
+            settings.interval_hours = interval_hours
+            settings.retention_count = retention_count
+
+            if enabled:
+                if (not settings.next_run_at) or (not previous_enabled) or (previous_interval != interval_hours):
+                    settings.next_run_at = compute_next_run(utcnow(), interval_hours)
+            else:
+                settings.next_run_at = None
+
+            db.session.commit()
+            flash('Pengaturan backup berhasil disimpan.', 'success')
+            return redirect(url_for('admin.backup_settings'))
+
+        if action == 'run_now':
+            try:
+                backup_path = export_database_json()
+                now = utcnow()
+                settings.last_run_at = now
+                settings.last_status = "success"
+                settings.last_error = None
+                settings.last_backup_file = os.path.basename(backup_path)
+                if settings.enabled:
+                    settings.next_run_at = compute_next_run(now, settings.interval_hours)
+                db.session.commit()
+                prune_old_backups(settings.retention_count)
+                flash('Backup berhasil dibuat.', 'success')
+            except Exception as exc:
+                db.session.rollback()
+                settings = get_backup_settings(create_if_missing=False)
+                if settings:
+                    settings.last_run_at = utcnow()
+                    settings.last_status = "failed"
+                    settings.last_error = str(exc)
+                    settings.next_run_at = compute_next_run(settings.last_run_at, settings.interval_hours)
+                    db.session.commit()
+                flash(f'Gagal membuat backup: {exc}', 'danger')
+            return redirect(url_for('admin.backup_settings'))
+
+    backup_files = list_backup_files(limit=10)
+    return render_template(
+        'backup_settings.html',
+        settings=settings,
+        backup_files=backup_files
+    )
+
+
+@bp.route('/admin/backup/download/<path:filename>')
+def download_backup(filename):
+    if 'user_id' not in session or session.get('role') != 'admin':
+        flash('Anda tidak memiliki hak akses.', 'danger')
+        return redirect(url_for('auth.login'))
+
+    safe_name = secure_filename(filename or "")
+    if not safe_name:
+        abort(404)
+
+    backup_dir = ensure_backup_dir()
+    path = os.path.join(backup_dir, safe_name)
+    if not os.path.isfile(path):
+        abort(404)
+
+    return send_file(path, as_attachment=True, download_name=safe_name)
+
+
+@bp.route('/admin/backup/delete/<path:filename>', methods=['POST'])
+def delete_backup(filename):
+    if 'user_id' not in session or session.get('role') != 'admin':
+        flash('Anda tidak memiliki hak akses.', 'danger')
+        return redirect(url_for('auth.login'))
+
+    safe_name = secure_filename(filename or "")
+    if not safe_name:
+        abort(404)
+
+    backup_dir = ensure_backup_dir()
+    path = os.path.join(backup_dir, safe_name)
+    if not os.path.isfile(path):
+        abort(404)
+
+    try:
+        os.remove(path)
+        flash('Backup berhasil dihapus.', 'success')
+    except OSError as exc:
+        flash(f'Gagal menghapus backup: {exc}', 'danger')
+
+    return redirect(url_for('admin.backup_settings'))
+
+
+@bp.route('/admin/backup', methods=['POST'])
+def admin_backup():
+    if 'user_id' not in session or session.get('role') != 'admin':
+        flash('Anda tidak memiliki hak akses.', 'danger')
+        return redirect(url_for('auth.login'))
+
+    try:
+        backup_path = export_database_json()
+    except Exception as exc:
+        flash(f'Gagal membuat backup: {exc}', 'danger')
+        return redirect(url_for('reports.dashboard'))
+
+    return send_file(backup_path, as_attachment=True, download_name=os.path.basename(backup_path))
+
+
+@bp.route('/admin/server_status')
+def server_status():
+    if 'user_id' not in session or session.get('role') != 'admin':
+        flash('Anda tidak memiliki hak akses.', 'danger')
+        return redirect(url_for('auth.login'))
+
+    db_url = db.engine.url
+    backend = db_url.get_backend_name()
+    db_name = db_url.database or "-"
+    db_location = "-"
+    db_size_bytes = None
+    db_disk_usage = None
+    db_disk_note = None
+    sqlite_pragmas = None
+
+    if backend == "sqlite":
+        try:
+            sqlite_pragmas = sqlite_pragma_status(db.engine)
+        except Exception:
+            sqlite_pragmas = None
+        if db_name in (None, "", ":memory:"):
+            db_location = "in-memory"
+            db_name = "in-memory"
+            db_disk_note = "Tidak tersedia."
+        else:
+            db_path = db_name
+            if not os.path.isabs(db_path):
+                db_path = os.path.join(BASE_DIR, db_path)
+            db_location = db_path
+            db_name = os.path.basename(db_path)
+            if os.path.isfile(db_path):
+                db_size_bytes = os.path.getsize(db_path)
+            db_disk_usage = get_disk_usage(os.path.dirname(db_path))
+            if not db_disk_usage:
+                db_disk_note = "Tidak tersedia."
+    else:
+        host = db_url.host or "-"
+        port = f":{db_url.port}" if db_url.port else ""
+        db_location = f"{host}{port}" if host != "-" else "-"
+        if backend == "postgresql":
+            try:
+                db_size_bytes = db.session.execute(
+                    sa.text("SELECT pg_database_size(current_database())")
+                ).scalar()
+            except Exception:
+                db.session.rollback()
+        db_disk_note = "Postgres di Docker volume, disk usage tidak tersedia."
+
+    backup_dir = ensure_backup_dir()
+    backup_disk_usage = get_disk_usage(backup_dir)
+    connection_ok = True
+    connection_error = None
+    try:
+        db.session.execute(sa.text("SELECT 1"))
+    except Exception as exc:
+        db.session.rollback()
+        connection_ok = False
+        connection_error = str(exc)
+
+    settings = get_backup_settings(create_if_missing=True)
+    backup_files = list_backup_files(limit=None)
+    backup_count = len(backup_files)
+    backup_total_bytes = sum(item["size"] for item in backup_files)
+    last_backup = backup_files[0] if backup_files else None
+    total_users = User.query.count()
+    total_employees = Employee.query.count()
+    total_payrolls = Payroll.query.count()
+
+    return render_template(
+        'server_status.html',
+        db_backend=backend,
+        db_name=db_name,
+        db_location=db_location,
+        db_size=format_bytes(db_size_bytes),
+        sqlite_pragmas=sqlite_pragmas,
+        db_uri=db_url.render_as_string(hide_password=True),
+        connection_ok=connection_ok,
+        connection_error=connection_error,
+        backup_settings=settings,
+        backup_count=backup_count,
+        backup_total_size=format_bytes(backup_total_bytes),
+        backup_last_file=last_backup["name"] if last_backup else None,
+        backup_last_mtime=last_backup["mtime"] if last_backup else None,
+        backup_dir=backup_dir,
+        db_disk_usage=db_disk_usage,
+        db_disk_note=db_disk_note,
+        backup_disk_usage=backup_disk_usage,
+        total_users=total_users,
+        total_employees=total_employees,
+        total_payrolls=total_payrolls,
+        pool_stats=get_pool_stats(),
+        sql_stats=get_sql_stats() if current_app.config['SQL_INSTRUMENTATION'] else None,
+        replica_status=check_replica_health(force=True) if replica_configured() else None,
+        replica_uri=db.engines[REPLICA_BIND_KEY].url.render_as_string(hide_password=True) if replica_configured() else None,
+        server_time=datetime.now(),
+        server_time_utc=utcnow(),
+        python_version=platform.python_version(),
+        flask_version=flask.__version__,
+        system_info=platform.platform(),
+        app_root=BASE_DIR,
+    )
+
+
+@bp.route('/edit_user/<int:user_id>', methods=['GET', 'POST'])
+def edit_user(user_id):
+    # hanya admin
+    if 'user_id' not in session or session.get('role') != 'admin':
+        flash('Tidak memiliki akses.', 'danger')
+        return redirect(url_for('auth.login'))
+
+    user = User.query.get_or_404(user_id)
+
+    if request.method == 'POST':
+        # -------- update data --------
+        user.fullname = request.form.get('fullname')
+        user.email    = request.form.get('email')
+        user.role     = request.form.get('role', 'user')
+
+        # opsi ganti password
+        new_pw = request.form.get('password')
+        if new_pw:
+            user.password = generate_password_hash(new_pw, method='pbkdf2:sha256')
+
+        db.session.commit()
+        flash('Data user berhasil diperbarui.', 'success')
+        return redirect(url_for('loans.loans'))     # atau url_for('users') jika ada
+
+    # GET → tampilkan form
+    return render_template('edit_user.html', user=user)
+
+
+@bp.route('/delete_user/<int:user_id>', methods=['POST'])
+def delete_user(user_id):
+    # pastikan hanya admin
+    if 'user_id' not in session or session.get('role') != 'admin':
+        flash('Tidak memiliki akses.', 'danger')
+        return redirect(url_for('auth.login'))
+
+    user = User.query.get_or_404(user_id)
+
+    # Cegah menghapus diri sendiri
+    if user.id == session['user_id']:
+        flash('Tidak bisa menghapus akun yang sedang login.', 'warning')
+        return redirect(url_for('loans.loans'))
+
+    # lepas referensi ke user ini: histori audit/persetujuan payroll tetap ada
+    # tanpa pelaku (FK aktif di Postgres dan SQLite mode performa)
+    AuditLog.query.filter_by(user_id=user.id).update({'user_id': None}, synchronize_session=False)
+    Payroll.query.filter_by(approved_by=user.id).update({'approved_by': None}, synchronize_session=False)
+    Payroll.query.filter_by(submitted_by=user.id).update({'submitted_by': None}, synchronize_session=False)
+    Employee.query.filter_by(user_id=user.id).update({'user_id': None}, synchronize_session=False)
+    db.session.delete(user)
+    try:
+        db.session.commit()
+    except sa.exc.IntegrityError:
+        db.session.rollback()
+        flash('User masih dipakai data lain dan tidak dapat dihapus.', 'danger')
+        return redirect(url_for('loans.loans'))
+    flash('User berhasil dihapus.', 'success')
+    return redirect(url_for('loans.loans'))
+
+
+@bp.route('/audit_logs')
+def audit_logs():
+    if 'user_id' not in session or session.get('role') != 'admin':
+        flash('Tidak memiliki akses.', 'danger')
+        return redirect(url_for('auth.login'))
+
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 50, type=int)
+    if per_page not in (50, 100, 200):
+        per_page = 50
+
+    pagination = AuditLog.query.order_by(AuditLog.created_at.desc()).paginate(
+        page=page, per_page=per_page, error_out=False
+    )
+    logs = pagination.items
+    return render_template('audit_logs.html', logs=logs, pagination=pagination, per_page=per_page)
+
+
+@bp.route('/admin/profiles')
+def profiles():
+    if 'user_id' not in session or session.get('role') != 'admin':
+        flash('Anda tidak memiliki hak akses.', 'danger')
+        return redirect(url_for('auth.login'))
+
+    route = request.args.get('route') or None
+    all_profiles = list_profiles()
+    routes = sorted({meta["route"] for meta in all_profiles})
+    items = [meta for meta in all_profiles if not route or meta["route"] == route]
+    return render_template('profiles.html', profiles=items, routes=routes, route=route,
+                           enabled=current_app.config['PROFILER_ENABLED'])
+
+
+@bp.route('/admin/profiles/<profile_id>')
+def profile_detail(profile_id):
+    if 'user_id' not in session or session.get('role') != 'admin':
+        flash('Anda tidak memiliki hak akses.', 'danger')
+        return redirect(url_for('auth.login'))
+
+    meta = get_profile(profile_id)
+    if meta is None:
+        abort(404)
+    sort = request.args.get('sort', 'cumulative')
+    if sort not in ('cumulative', 'tottime', 'ncalls'):
+        sort = 'cumulative'
+    summary = profile_summary(meta, sort=sort) if meta["mode"] == "cprofile" else None
+    return render_template('profile_detail.html', profile=meta, summary=summary, sort=sort)
+
+
+@bp.route('/admin/profiles/<profile_id>/download')
+def download_profile(profile_id):
+    if 'user_id' not in session or session.get('role') != 'admin':
+        flash('Anda tidak memiliki hak akses.', 'danger')
+        return redirect(url_for('auth.login'))
+
+    meta = get_profile(profile_id)
+    if meta is None:
+        abort(404)
+    return send_file(os.path.join(profile_dir(), meta["file"]), as_attachment=True, download_name=meta["file"])
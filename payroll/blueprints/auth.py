@@ -0,0 +1,165 @@
+"""Blueprint auth: registrasi, login/logout, ganti password, dan CSRF sederhana."""
+import secrets
+
+from flask import Blueprint, render_template, request, redirect, url_for, session, flash, abort
+from werkzeug.security import generate_password_hash, check_password_hash
+
+from payroll.extensions import db
+from payroll.models import Employee, User
+
+
+bp = Blueprint('auth', __name__)
+
+
+# ---------- CSRF sederhana ----------
+def generate_csrf_token():
+    token = session.get('csrf_token')
+    if not token:
+        token = secrets.token_hex(16)
+        session['csrf_token'] = token
+    return token
+
+
+@bp.app_context_processor
+def inject_csrf():
+    return {'csrf_token': generate_csrf_token()}
+
+
+@bp.before_app_request
+def csrf_protect():
+    if request.method == "POST":
+        # Form bisa ditambah ke whitelist jika perlu
+        token = session.get('csrf_token')
+        form_token = request.form.get('csrf_token')
+        if not token or not form_token or token != form_token:
+            abort(400, description="CSRF token invalid")
+
+
+@bp.route('/register', methods=['GET', 'POST'])
+def register():
+    if request.method == 'POST':
+        fullname = request.form.get('fullname')
+        nik = request.form.get('nik').strip()
+        email = request.form.get('email')
+        password = request.form.get('password')
+
+        # Pastikan email belum terdaftar di tabel User
+        existing_user = User.query.filter_by(email=email).first()
+        if existing_user:
+            flash('Email sudah terdaftar, silakan gunakan email lain.', 'danger')
+            return redirect(url_for('auth.register'))
+
+        # Validasi domain email: hanya email dengan domain "goldenfarm99.com" yang diizinkan
+        allowed_domain = "goldenfarm99.com"
+        if not email.lower().endswith("@" + allowed_domain):
+            flash("Registrasi hanya diperbolehkan dengan email perusahaan (@goldenfarm99.com)", "danger")
+            return redirect(url_for('auth.register'))
+
+        # Cek apakah sudah ada record Employee dengan NIK tersebut
+        existing_employee = Employee.query.filter_by(nik=nik).first()
+
+        # Buat user baru terlebih dahulu (role 'user' untuk karyawan)
+        hashed_password = generate_password_hash(password, method='pbkdf2:sha256')
+        new_user = User(fullname=fullname, email=email, password=hashed_password, role='user')
+        db.session.add(new_user)
+        db.session.commit()
+
+        if existing_employee:
+            # Jika record Employee sudah ada
+            if existing_employee.user_id:
+                # Jika sudah di-link ke akun user lain, tolak registrasi
+                flash('NIK sudah terdaftar, silakan gunakan NIK lain.', 'danger')
+                return redirect(url_for('auth.register'))
+            else:
+                # Jika belum di-link, update record Employee untuk mengaitkan dengan akun baru
+                existing_employee.user_id = new_user.id
+                # Opsional: update nama sesuai input registrasi
+                existing_employee.name = fullname
+                db.session.commit()
+        else:
+            # Jika record Employee tidak ada, buat record baru
+            new_emp = Employee(
+                user_id=new_user.id,
+                nik=nik,
+                name=fullname,
+                position="",
+                address="",
+                phone="",
+                hire_date=None
+            )
+            db.session.add(new_emp)
+            db.session.commit()
+
+        flash('Registrasi berhasil! Silakan login.', 'success')
+        return redirect(url_for('auth.login'))
+
+    return render_template('register.html')
+
+
+@bp.route('/login', methods=['GET', 'POST'])
+def login():
+    if request.method == 'POST':
+        email = request.form.get('email')
+        password = request.form.get('password')
+
+        user = User.query.filter_by(email=email).first()
+        if user and check_password_hash(user.password, password):
+            session['user_id'] = user.id
+            session['user_name'] = user.fullname
+            session['role'] = user.role
+            flash('Login berhasil.', 'success')
+            # Redirect berdasarkan role
+            if user.role == 'admin':
+                return redirect(url_for('reports.dashboard'))
+            else:
+                return redirect(url_for('loans.employee_dashboard'))
+        else:
+            flash('Email atau password salah.', 'danger')
+            return redirect(url_for('auth.login'))
+
+    return render_template('login.html')
+
+
+@bp.route('/logout')
+def logout():
+    session.clear()
+    flash('Anda telah keluar.', 'info')
+    return redirect(url_for('reports.index'))
+
+
+@bp.route('/change_password', methods=['GET', 'POST'])
+def change_password():
+    if 'user_id' not in session:
+        flash('Harap login terlebih dahulu.', 'warning')
+        return redirect(url_for('auth.login'))
+
+    user = User.query.get(session.get('user_id'))
+    if not user:
+        session.clear()
+        flash('Akun tidak ditemukan. Silakan login kembali.', 'danger')
+        return redirect(url_for('auth.login'))
+
+    if request.method == 'POST':
+        current_password = request.form.get('current_password') or ''
+        new_password = request.form.get('new_password') or ''
+        confirm_password = request.form.get('confirm_password') or ''
+
+        if not check_password_hash(user.password, current_password):
+            flash('Password saat ini salah.', 'danger')
+            return redirect(url_for('auth.change_password'))
+        if not new_password:
+            flash('Password baru wajib diisi.', 'danger')
+            return redirect(url_for('auth.change_password'))
+        if new_password != confirm_password:
+            flash('Konfirmasi password tidak cocok.', 'danger')
+            return redirect(url_for('auth.change_password'))
+
+        user.password = generate_password_hash(new_password, method='pbkdf2:sha256')
+        db.session.commit()
+        flash('Password berhasil diperbarui.', 'success')
+
+        if session.get('role') == 'admin':
+            return redirect(url_for('reports.dashboard'))
+        return redirect(url_for('employees.employee_profile'))
+
+    return render_template('change_password.html')
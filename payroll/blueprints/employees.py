@@ -0,0 +1,446 @@
+"""Blueprint karyawan: data karyawan, import massal, arsip, profil karyawan."""
+import os
+from datetime import datetime, date
+
+import sqlalchemy as sa
+from flask import Blueprint, render_template, request, redirect, url_for, session, flash, current_app, jsonify
+from werkzeug.utils import secure_filename
+
+from payroll.extensions import db
+from payroll.models import Employee, EmployeeCompensation, Payroll
+from payroll.services.compensation import invalidate_compensation_cache
+from payroll.services.directory import DEFAULT_LIMIT, employee_directory
+
+
+bp = Blueprint('employees', __name__)
+
+
+@bp.route('/employees')
+def employees():
+    # Pastikan hanya user yang sudah login bisa mengakses
+    if 'user_id' not in session:
+        flash('Harap login terlebih dahulu.', 'warning')
+        return redirect(url_for('auth.login'))
+    if session.get('role') != 'admin':
+        flash('Anda tidak memiliki hak akses ke halaman ini.', 'danger')
+        return redirect(url_for('reports.index'))
+
+    # baris tabel dimuat bertahap dari /api/employees
+    return render_template('employees.html', page_size=DEFAULT_LIMIT)
+
+
+@bp.route('/employees/archive')
+def employees_archive():
+    if 'user_id' not in session:
+        flash('Harap login terlebih dahulu.', 'warning')
+        return redirect(url_for('auth.login'))
+    if session.get('role') != 'admin':
+        flash('Anda tidak memiliki hak akses ke halaman ini.', 'danger')
+        return redirect(url_for('reports.index'))
+
+    return render_template('employees_archive.html', page_size=DEFAULT_LIMIT)
+
+
+@bp.route('/api/employees')
+def employee_directory_api():
+    """
+    Direktori karyawan (JSON) dengan keyset pagination.
+    Parameter: q, match=contains|prefix, status=active|inactive|all,
+    fields=id,nik,name,..., sort=name|id, limit (maks 200), after=<next_cursor>.
+    """
+    if 'user_id' not in session:
+        return jsonify(error='Harap login terlebih dahulu.'), 401
+    if session.get('role') != 'admin':
+        return jsonify(error='Anda tidak memiliki hak akses.'), 403
+
+    fields = [f.strip() for f in request.args.get('fields', '').split(',') if f.strip()]
+    try:
+        page = employee_directory(
+            q=request.args.get('q'),
+            match=request.args.get('match', 'contains'),
+            status=request.args.get('status', 'active'),
+            fields=fields or None,
+            sort=request.args.get('sort', 'name'),
+            limit=request.args.get('limit', DEFAULT_LIMIT, type=int),
+            after=request.args.get('after'),
+        )
+    except ValueError as exc:
+        return jsonify(error=str(exc)), 400
+    return jsonify(page)
+
+
+@bp.route('/employees/<int:employee_id>/payrolls')
+def employee_payroll_history(employee_id):
+    if 'user_id' not in session:
+        flash('Harap login terlebih dahulu.', 'warning')
+        return redirect(url_for('auth.login'))
+    if session.get('role') != 'admin':
+        flash('Tidak memiliki akses.', 'danger')
+        return redirect(url_for('reports.index'))
+
+    emp = Employee.query.get_or_404(employee_id)
+    history = Payroll.query.filter_by(employee_id=employee_id).order_by(Payroll.pay_period.desc()).all()
+    return render_template('employee_payroll_history.html', employee=emp, payrolls=history)
+
+
+@bp.route('/employees/<int:employee_id>/archive', methods=['POST'])
+def set_employee_inactive(employee_id):
+    if 'user_id' not in session or session.get('role') != 'admin':
+        flash('Tidak memiliki akses.', 'danger')
+        return redirect(url_for('auth.login'))
+
+    emp = Employee.query.get_or_404(employee_id)
+    emp.status = 'inactive'
+    db.session.commit()
+    flash('Karyawan berhasil diarsipkan.', 'success')
+    return redirect(url_for('employees.employees'))
+
+
+@bp.route('/employees/<int:employee_id>/activate', methods=['POST'])
+def set_employee_active(employee_id):
+    if 'user_id' not in session or session.get('role') != 'admin':
+        flash('Tidak memiliki akses.', 'danger')
+        return redirect(url_for('auth.login'))
+
+    emp = Employee.query.get_or_404(employee_id)
+    emp.status = 'active'
+    db.session.commit()
+    flash('Status karyawan diubah menjadi aktif.', 'success')
+    return redirect(url_for('employees.employees_archive'))
+
+
+# Contoh Route untuk menambah karyawan baru
+@bp.route('/add_employee', methods=['POST'])
+def add_employee():
+    if 'user_id' not in session or session.get('role') != 'admin':
+        flash('Tidak memiliki akses.', 'danger')
+        return redirect(url_for('reports.index'))
+    
+    name = request.form.get('name')
+    position = request.form.get('position')
+    address = request.form.get('address')
+    phone = request.form.get('phone')
+    no_rek = request.form.get('no_rek')  # <-- baru
+    bank_name = request.form.get('bank_name')
+    hire_date_str = request.form.get('hire_date')  # "2025-03-10" (YYYY-MM-DD)
+
+    # 1) Dapatkan ID terakhir, siapkan auto increment
+    last_employee = Employee.query.order_by(Employee.id.desc()).first()
+    if last_employee:
+        next_id = last_employee.id + 1
+    else:
+        next_id = 1
+    
+    # 2) Generate NIK (misal "EMP0001")
+    new_nik = f"EMP{next_id:04d}"
+
+    # 3) Parse hire_date (jika user isi)
+    parsed_hire_date = None
+    if hire_date_str:
+        try:
+            parsed_hire_date = datetime.strptime(hire_date_str, "%Y-%m-%d").date()
+        except ValueError:
+            # Jika format tanggal salah
+            parsed_hire_date = None
+
+    # 4) Buat objek Employee baru
+    new_emp = Employee(
+        nik=new_nik,
+        name=name,
+        position=position,
+        address=address,
+        phone=phone,
+        no_rek=no_rek,          # <-- baru
+        bank_name=bank_name,
+        hire_date=parsed_hire_date
+    )
+    
+    db.session.add(new_emp)
+    db.session.commit()
+    
+    flash('Karyawan baru berhasil ditambahkan.', 'success')
+    return redirect(url_for('employees.employees'))
+
+
+@bp.route('/employees/import', methods=['POST'])
+def import_employees():
+    if 'user_id' not in session or session.get('role') != 'admin':
+        flash('Tidak memiliki akses.', 'danger')
+        return redirect(url_for('auth.login'))
+
+    upload = request.files.get('file')
+    if not upload or not upload.filename:
+        flash('File import wajib diunggah.', 'warning')
+        return redirect(url_for('employees.employees'))
+
+    _, ext = os.path.splitext(upload.filename)
+    ext = ext.lower()
+    if ext not in ('.xlsx', '.xls', '.csv'):
+        flash('Format file tidak didukung. Gunakan .xlsx, .xls, atau .csv.', 'danger')
+        return redirect(url_for('employees.employees'))
+
+    import pandas as pd
+
+    try:
+        if ext == '.csv':
+            df = pd.read_csv(upload)
+        else:
+            df = pd.read_excel(upload)
+    except Exception as exc:
+        flash(f'Gagal membaca file: {exc}', 'danger')
+        return redirect(url_for('employees.employees'))
+
+    if df.empty:
+        flash('File import kosong.', 'warning')
+        return redirect(url_for('employees.employees'))
+
+    def normalize_col(name):
+        return str(name).strip().lower()
+
+    df.columns = [normalize_col(c) for c in df.columns]
+    col_map = {
+        'nik': 'nik',
+        'nama': 'name',
+        'karyawan': 'name',
+        'jabatan': 'position',
+        'posisi': 'position',
+        'alamat': 'address',
+        'telepon': 'phone',
+        'telp': 'phone',
+        'no hp': 'phone',
+        'no. hp': 'phone',
+        'phone': 'phone',
+        'no rek': 'no_rek',
+        'no. rek': 'no_rek',
+        'no rekening': 'no_rek',
+        'no. rekening': 'no_rek',
+        'rekening': 'no_rek',
+        'nama bank': 'bank_name',
+        'bank': 'bank_name',
+        'tanggal masuk': 'hire_date',
+        'tgl masuk': 'hire_date',
+        'tgl. masuk': 'hire_date',
+        'hire date': 'hire_date',
+    }
+    rename_cols = {col: col_map[col] for col in df.columns if col in col_map}
+    df = df.rename(columns=rename_cols)
+
+    def clean_str(value):
+        if value is None:
+            return ""
+        if isinstance(value, float):
+            if pd.isna(value):
+                return ""
+            if value.is_integer():
+                value = int(value)
+        text = str(value).strip()
+        return "" if text.lower() == "nan" else text
+
+    def parse_date_value(value):
+        if value is None:
+            return None
+        if isinstance(value, float) and pd.isna(value):
+            return None
+        if isinstance(value, datetime):
+            return value.date()
+        if isinstance(value, date):
+            return value
+        parsed = pd.to_datetime(value, errors='coerce')
+        if pd.isna(parsed):
+            return None
+        return parsed.date()
+
+    update_existing = request.form.get('update_existing') == 'on'
+    max_id = db.session.query(sa.func.max(Employee.id)).scalar() or 0
+    next_id = max_id + 1
+
+    created = 0
+    updated = 0
+    skipped = 0
+
+    try:
+        for _, row in df.iterrows():
+            name = clean_str(row.get('name'))
+            nik = clean_str(row.get('nik'))
+            if not name:
+                skipped += 1
+                continue
+
+            if not nik:
+                nik = f"EMP{next_id:04d}"
+                next_id += 1
+
+            emp = Employee.query.filter_by(nik=nik).first()
+            if emp:
+                if not update_existing:
+                    skipped += 1
+                    continue
+                position = clean_str(row.get('position'))
+                address = clean_str(row.get('address'))
+                phone = clean_str(row.get('phone'))
+                no_rek = clean_str(row.get('no_rek'))
+                bank_name = clean_str(row.get('bank_name'))
+                hire_date = parse_date_value(row.get('hire_date'))
+
+                emp.name = name
+                if position:
+                    emp.position = position
+                if address:
+                    emp.address = address
+                if phone:
+                    emp.phone = phone
+                if no_rek:
+                    emp.no_rek = no_rek
+                if bank_name:
+                    emp.bank_name = bank_name
+                if hire_date:
+                    emp.hire_date = hire_date
+                updated += 1
+                continue
+
+            emp = Employee(
+                nik=nik,
+                name=name,
+                position=clean_str(row.get('position')) or None,
+                address=clean_str(row.get('address')) or None,
+                phone=clean_str(row.get('phone')) or None,
+                no_rek=clean_str(row.get('no_rek')) or None,
+                bank_name=clean_str(row.get('bank_name')) or None,
+                hire_date=parse_date_value(row.get('hire_date')),
+            )
+            db.session.add(emp)
+            created += 1
+
+        db.session.commit()
+    except Exception as exc:
+        db.session.rollback()
+        flash(f'Gagal import data: {exc}', 'danger')
+        return redirect(url_for('employees.employees'))
+
+    flash(f'Import selesai. Dibuat: {created}, diperbarui: {updated}, dilewati: {skipped}.', 'success')
+    return redirect(url_for('employees.employees'))
+
+
+@bp.route('/edit_employee/<int:employee_id>', methods=['GET', 'POST'])
+def edit_employee(employee_id):
+    if 'user_id' not in session or session.get('role') != 'admin':
+        flash('Tidak memiliki akses.', 'danger')
+        return redirect(url_for('auth.login'))
+
+    emp = Employee.query.get_or_404(employee_id)
+
+    if request.method == 'GET':
+        return render_template('edit_employee.html', emp=emp)
+
+    # POST: update data
+    emp.name = request.form.get('name')
+    emp.position = request.form.get('position')
+    emp.phone = request.form.get('phone')
+    emp.address = request.form.get('address')
+    emp.no_rek = request.form.get('no_rek')  # <-- baru
+    emp.bank_name = request.form.get('bank_name')
+
+    hire_date_str = request.form.get('hire_date')
+    if hire_date_str:
+        try:
+            emp.hire_date = datetime.strptime(hire_date_str, "%Y-%m-%d").date()
+        except ValueError:
+            emp.hire_date = None
+
+    # NIK bisa dibiarkan read-only, jadi tidak diupdate
+    # Jika ingin diupdate, lakukan:
+    # new_nik = request.form.get('nik')
+    # emp.nik = new_nik or emp.nik
+
+    db.session.commit()
+    flash('Data karyawan berhasil diperbarui.', 'success')
+    return redirect(url_for('employees.employees'))
+
+
+@bp.route('/delete_employee/<int:employee_id>')
+def delete_employee(employee_id):
+    if 'user_id' not in session or session.get('role') != 'admin':
+        flash('Tidak memiliki akses.', 'danger')
+        return redirect(url_for('auth.login'))
+
+    emp = Employee.query.get_or_404(employee_id)
+
+    has_approved = Payroll.query.filter_by(employee_id=employee_id, status='approved').first()
+    if has_approved:
+        flash('Tidak dapat menghapus karyawan dengan payroll yang sudah disetujui.', 'warning')
+        return redirect(url_for('employees.employees'))
+    
+    # Hapus terlebih dahulu semua data payroll yang terkait dengan karyawan ini
+    payrolls = Payroll.query.filter_by(employee_id=employee_id).all()
+    for payroll in payrolls:
+        db.session.delete(payroll)
+    
+    # assignment komponen kompensasi milik karyawan ini ikut dihapus
+    if EmployeeCompensation.query.filter_by(employee_id=employee_id).delete(synchronize_session=False):
+        invalidate_compensation_cache()
+
+    # Setelah payroll terkait dihapus, hapus data karyawan
+    db.session.delete(emp)
+    try:
+        db.session.commit()
+    except sa.exc.IntegrityError:
+        # mis. masih ada pinjaman atau angsuran yang terhubung ke payroll
+        db.session.rollback()
+        flash('Karyawan masih memiliki data pinjaman/angsuran dan tidak dapat dihapus.', 'warning')
+        return redirect(url_for('employees.employees'))
+    
+    flash('Data karyawan beserta payroll terkait berhasil dihapus.', 'success')
+    return redirect(url_for('employees.employees'))
+
+
+@bp.route('/employee_profile')
+def employee_profile():
+    if 'user_id' not in session:
+        flash("Harap login terlebih dahulu.", "danger")
+        return redirect(url_for("auth.login"))
+    # Cari record Employee berdasarkan user_id
+    employee = Employee.query.filter_by(user_id=session.get("user_id")).first()
+    if not employee:
+        flash("Data karyawan tidak ditemukan. Silakan hubungi admin.", "danger")
+        return redirect(url_for("loans.employee_dashboard"))
+    return render_template("employee_profile.html", employee=employee)
+
+
+@bp.route('/update_profile', methods=['GET', 'POST'])
+def update_profile():
+    if 'user_id' not in session:
+        flash("Harap login terlebih dahulu.", "danger")
+        return redirect(url_for("auth.login"))
+    
+    employee = Employee.query.filter_by(user_id=session.get("user_id")).first()
+    if not employee:
+        flash("Data karyawan tidak ditemukan.", "danger")
+        return redirect(url_for("loans.employee_dashboard"))
+    
+    if request.method == 'POST':
+        # Update data profil
+        employee.name = request.form.get('name')
+        employee.position = request.form.get('position')
+        employee.address = request.form.get('address')
+        employee.phone = request.form.get('phone')
+        hire_date_str = request.form.get('hire_date')
+        if hire_date_str:
+            try:
+                employee.hire_date = datetime.strptime(hire_date_str, "%Y-%m-%d").date()
+            except ValueError:
+                employee.hire_date = None
+
+        # Proses file upload foto
+        if 'photo' in request.files:
+            file = request.files['photo']
+            if file and file.filename:
+                filename = secure_filename(file.filename)
+                upload_path = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
+                file.save(upload_path)
+                employee.photo = filename  # simpan nama file ke database
+
+        db.session.commit()
+        flash("Profil berhasil diperbarui.", "success")
+        return redirect(url_for("employees.employee_profile"))
+    
+    return render_template("update_profile.html", employee=employee)
@@ -0,0 +1,330 @@
+"""Blueprint pinjaman: pengajuan, pembayaran angsuran, persetujuan, dashboard karyawan."""
+from datetime import datetime, timezone
+
+from flask import Blueprint, render_template, request, redirect, url_for, session, flash
+from sqlalchemy.orm import joinedload
+
+from payroll.audit import log_action, log_actions
+from payroll.extensions import db
+from payroll.models import Employee, Loan, Payment, User
+from payroll.services.employee_summary import ListPage, employee_summary, mark_employee_summary_dirty
+from payroll.services.loans import (
+    allocate_payment,
+    batch_set_payment_status,
+    cancel_loan_schedule,
+    generate_loan_schedule,
+    release_payment,
+    set_payment_status,
+    submit_payment,
+)
+
+
+bp = Blueprint('loans', __name__)
+
+
+# === ROUTE UNTUK PENGAJUAN PINJAMAN (Karyawan) ===
+@bp.route('/apply_loan', methods=['GET', 'POST'])
+def apply_loan():
+    if 'user_id' not in session:
+        flash('Harap login terlebih dahulu.', 'warning')
+        return redirect(url_for('auth.login'))
+    
+    # Ambil record Employee berdasarkan user_id
+    employee = Employee.query.filter_by(user_id=session.get('user_id')).first()
+    if not employee:
+        flash('Anda belum terdaftar sebagai karyawan. Silakan hubungi admin.', 'danger')
+        return redirect(url_for('loans.employee_dashboard'))
+    
+    # Cek apakah terdapat pinjaman aktif (status selain 'completed')
+    active_loan = Loan.query.filter(
+        Loan.employee_id == employee.id,
+        Loan.status.in_(('pending', 'approved'))
+    ).first()
+    if active_loan:
+        flash('Anda masih memiliki pinjaman yang belum lunas. Harap lunasi pinjaman sebelumnya sebelum mengajukan pinjaman baru.', 'warning')
+        return redirect(url_for('loans.loans'))
+    
+    if request.method == 'POST':
+        try:
+            amount = float(request.form.get('amount'))
+            tenor = int(request.form.get('tenor'))
+            interest_rate = float(request.form.get('interest_rate', 0))
+        except (ValueError, TypeError):
+            flash('Data yang dimasukkan tidak valid.', 'danger')
+            return redirect(url_for('loans.apply_loan'))
+        
+        reason = request.form.get('reason')
+        
+        # Hitung total pinjaman dan cicilan per bulan
+        total_amount = amount + (amount * (interest_rate / 100))
+        installment = total_amount / tenor
+        
+        new_loan = Loan(
+            employee_id=employee.id,  # gunakan Employee.id, bukan session.get('user_id')
+            amount=amount,
+            tenor=tenor,
+            interest_rate=interest_rate,
+            installment=installment,
+            reason=reason,
+            status="pending"
+        )
+        db.session.add(new_loan)
+        mark_employee_summary_dirty(employee.id)
+        db.session.commit()
+        log_action('apply_loan', 'loan', new_loan.id)
+        flash('Pengajuan pinjaman berhasil diajukan dan menunggu persetujuan.', 'success')
+        return redirect(url_for('loans.loans'))
+    
+    # Kirim data employee ke template agar nama karyawan bisa ditampilkan
+    return render_template('apply_loan.html', employee=employee)
+
+
+@bp.route('/pay_loan/<int:loan_id>', methods=['POST'])
+def pay_loan(loan_id):
+    if 'user_id' not in session:
+        flash('Harap login terlebih dahulu.', 'warning')
+        return redirect(url_for('auth.login'))
+    
+    employee = Employee.query.filter_by(user_id=session.get('user_id')).first()
+    if not employee:
+        flash('Data karyawan tidak ditemukan.', 'danger')
+        return redirect(url_for('loans.employee_dashboard'))
+    
+    loan = Loan.query.get_or_404(loan_id)
+    if loan.employee_id != employee.id:
+        flash('Anda tidak memiliki akses ke pinjaman ini.', 'danger')
+        return redirect(url_for('loans.employee_dashboard'))
+    
+    try:
+        # Hilangkan titik pemisah ribuan agar konversi float benar
+        payment_input = request.form.get('payment_amount')
+        payment_amount = float(payment_input.replace('.', ''))
+    except (TypeError, ValueError):
+        flash('Jumlah pembayaran tidak valid.', 'danger')
+        return redirect(url_for('loans.employee_dashboard'))
+    
+    if payment_amount <= 0:
+        flash('Jumlah pembayaran harus lebih dari 0.', 'danger')
+        return redirect(url_for('loans.employee_dashboard'))
+    
+    # Sertakan jumlah yang sudah disubmit (pending maupun approved) agar tidak terjadi double submission;
+    # dicek atomik terhadap paid_amount + pending_amount pinjaman.
+    if submit_payment(loan, payment_amount) is None:
+        flash('Jumlah pembayaran melebihi sisa hutang.', 'danger')
+        return redirect(url_for('loans.employee_dashboard'))
+    mark_employee_summary_dirty(employee.id)
+    db.session.commit()
+    
+    flash('Pembayaran telah diajukan, menunggu persetujuan admin.', 'success')
+    return redirect(url_for('loans.employee_dashboard'))
+
+
+@bp.route('/approve_payment/<int:payment_id>')
+def approve_payment(payment_id):
+    if 'user_id' not in session or session.get('role') != 'admin':
+        flash('Tidak memiliki akses.', 'danger')
+        return redirect(url_for('auth.login'))
+    
+    payment = Payment.query.get_or_404(payment_id)
+    if set_payment_status(payment, 'approved'):
+        allocate_payment(payment)
+        loan = payment.loan
+        if loan.paid_amount >= loan.total_amount:
+            loan.status = 'completed'
+        mark_employee_summary_dirty(loan.employee_id)
+    db.session.commit()
+    log_action('approve_payment', 'payment', payment.id)
+    
+    flash('Pembayaran telah disetujui.', 'success')
+    return redirect(url_for('loans.loans'))
+
+
+@bp.route('/reject_payment/<int:payment_id>')
+def reject_payment(payment_id):
+    if 'user_id' not in session or session.get('role') != 'admin':
+        flash('Tidak memiliki akses.', 'danger')
+        return redirect(url_for('auth.login'))
+    
+    payment = Payment.query.get_or_404(payment_id)
+    if set_payment_status(payment, 'rejected'):
+        release_payment(payment)
+        mark_employee_summary_dirty(payment.loan.employee_id)
+    db.session.commit()
+    
+    flash('Pembayaran telah ditolak. Silakan minta user untuk melakukan pembayaran ulang.', 'warning')
+    return redirect(url_for('loans.loans'))
+
+
+@bp.route('/payments/batch', methods=['POST'])
+def batch_payments():
+    if 'user_id' not in session or session.get('role') != 'admin':
+        flash('Tidak memiliki akses.', 'danger')
+        return redirect(url_for('auth.login'))
+
+    action = request.form.get('action')
+    status = {'approve': 'approved', 'reject': 'rejected'}.get(action)
+    payment_ids, until = None, None
+    if request.form.get('scope') == 'until':
+        try:
+            until = datetime.strptime(request.form.get('until', ''), '%Y-%m-%d').date()
+        except ValueError:
+            flash('Tanggal batas tidak valid.', 'danger')
+            return redirect(url_for('loans.loans'))
+    else:
+        payment_ids = request.form.getlist('payment_ids', type=int)
+        if not payment_ids:
+            flash('Pilih minimal satu pembayaran.', 'warning')
+            return redirect(url_for('loans.loans'))
+    if status is None:
+        flash('Aksi tidak dikenal.', 'danger')
+        return redirect(url_for('loans.loans'))
+
+    try:
+        processed = batch_set_payment_status(status, payment_ids=payment_ids, until=until)
+    except ValueError as exc:
+        db.session.rollback()
+        flash(str(exc), 'danger')
+        return redirect(url_for('loans.loans'))
+    for employee_id in {row['employee_id'] for row in processed}:
+        mark_employee_summary_dirty(employee_id)
+    log_actions(f'batch_{action}_payment', 'payment', [row['payment_id'] for row in processed],
+                f'{len(processed)} pembayaran')
+    db.session.commit()
+
+    verb = 'disetujui' if status == 'approved' else 'ditolak'
+    flash(f'{len(processed)} pembayaran {verb}.', 'success' if processed else 'info')
+    return redirect(url_for('loans.loans'))
+
+
+@bp.route('/loan_payments/<int:loan_id>')
+def loan_payments(loan_id):
+    if 'user_id' not in session:
+        flash('Harap login terlebih dahulu.', 'warning')
+        return redirect(url_for('auth.login'))
+    loan = Loan.query.get_or_404(loan_id)
+    # Jika pengguna bukan admin, pastikan pinjaman tersebut milik karyawan yang sedang login
+    if session.get('role') != 'admin':
+        employee = Employee.query.filter_by(user_id=session.get('user_id')).first()
+        if loan.employee_id != employee.id:
+            flash('Anda tidak memiliki akses ke data ini.', 'danger')
+            return redirect(url_for('loans.employee_dashboard'))
+    return render_template('loan_payments.html', loan=loan)
+
+
+@bp.route('/delete_loan/<int:loan_id>')
+def delete_loan(loan_id):
+    # Hanya admin yang dapat menghapus data pinjaman
+    if 'user_id' not in session or session.get('role') != 'admin':
+        flash('Tidak memiliki akses.', 'danger')
+        return redirect(url_for('auth.login'))
+    
+    loan = Loan.query.get_or_404(loan_id)
+    if loan.status in ('approved', 'completed'):
+        flash('Pinjaman yang sudah disetujui/lunas tidak bisa dihapus. Tolong nonaktifkan atau biarkan sebagai arsip.', 'warning')
+        return redirect(url_for('loans.loans'))
+
+    for pay in list(loan.payments):
+        db.session.delete(pay)
+
+    db.session.delete(loan)
+    mark_employee_summary_dirty(loan.employee_id)
+    db.session.commit()
+    flash('Data pinjaman berhasil dihapus.', 'success')
+    return redirect(url_for('loans.loans'))
+
+
+# === ROUTE UNTUK MELIHAT PENGAJUAN PINJAMAN ===
+@bp.route('/loans')
+def loans():
+    if 'user_id' not in session:
+        flash('Harap login terlebih dahulu.', 'warning')
+        return redirect(url_for('auth.login'))
+
+    # ==== ADMIN ====
+    if session.get('role') == 'admin':
+        loan_list        = Loan.query.order_by(Loan.application_date.desc()).all()
+        pending_payments = Payment.query.filter_by(status='pending')\
+                                        .options(joinedload(Payment.loan).joinedload(Loan.employee))\
+                                        .order_by(Payment.payment_date.desc()).all()
+        users_list       = User.query.order_by(User.id).all()          # ← ambil data user
+
+        return render_template('loans.html',
+                               loans=loan_list,
+                               pending_payments=pending_payments,
+                               users=users_list)                      # ← kirim ke template
+
+    # ==== USER (karyawan) ====
+    employee = Employee.query.filter_by(user_id=session.get('user_id')).first()
+    if not employee:
+        flash('Data karyawan tidak ditemukan.', 'danger')
+        return redirect(url_for('loans.employee_dashboard'))
+
+    loan_list = Loan.query.filter_by(employee_id=employee.id)\
+                          .order_by(Loan.application_date.desc()).all()
+    return render_template('loans.html', loans=loan_list, employee=employee)
+
+
+# === ROUTE UNTUK MENYETUJUI/PENOLAKAN PINJAMAN (Admin) ===
+@bp.route('/approve_loan/<int:loan_id>')
+def approve_loan(loan_id):
+    if 'user_id' not in session or session.get('role') != 'admin':
+        flash('Tidak memiliki akses.', 'danger')
+        return redirect(url_for('auth.login'))
+    
+    loan = Loan.query.get_or_404(loan_id)
+    loan.status = 'approved'
+    loan.approval_date = datetime.now(timezone.utc)   # timezone-aware
+    generate_loan_schedule(loan)
+    mark_employee_summary_dirty(loan.employee_id)
+    db.session.commit()
+    log_action('approve_loan', 'loan', loan.id)
+    flash('Pinjaman disetujui.', 'success')
+    return redirect(url_for('loans.loans'))
+
+
+@bp.route('/reject_loan/<int:loan_id>')
+def reject_loan(loan_id):
+    if 'user_id' not in session or session.get('role') != 'admin':
+        flash('Tidak memiliki akses.', 'danger')
+        return redirect(url_for('auth.login'))
+    
+    loan = Loan.query.get_or_404(loan_id)
+    loan.status = 'rejected'
+    loan.approval_date = datetime.now(timezone.utc)
+    cancel_loan_schedule(loan)
+    mark_employee_summary_dirty(loan.employee_id)
+    db.session.commit()
+    log_action('reject_loan', 'loan', loan.id)
+    flash('Pinjaman ditolak.', 'warning')
+    return redirect(url_for('loans.loans'))
+
+
+@bp.route('/employee_dashboard')
+def employee_dashboard():
+    if 'user_id' not in session:
+        flash('Harap login terlebih dahulu.', 'warning')
+        return redirect(url_for('auth.login'))
+    if session.get('role') == 'admin':
+        return redirect(url_for('reports.dashboard'))
+
+    employee = Employee.query.filter_by(user_id=session.get('user_id')).first()
+    if not employee:
+        flash('Data karyawan tidak ditemukan. Silakan hubungi admin.', 'danger')
+        return redirect(url_for('auth.login'))
+    
+    # pinjaman, total, dan histori pembayaran dari ringkasan (2 query, di-cache per karyawan)
+    summary = employee_summary(employee.id)
+
+    # ====== PAGINATION UNTUK ARSIP ANGSURAN ======
+    page = request.args.get('page', 1, type=int)
+    per_page = 5  # jumlah baris per halaman, silakan sesuaikan
+    archived_payments_paginate = ListPage(summary['archived_payments'], page, per_page)
+
+    return render_template(
+        'employee_dashboard.html',
+        employee=employee,
+        loans=summary['loans'],
+        active_payments=summary['active_payments'],
+        archived_payments=archived_payments_paginate.items,  # Data di halaman sekarang
+        archived_pagination=archived_payments_paginate  # Objek untuk bikin link Next/Prev
+    )
@@ -0,0 +1,645 @@
+"""Blueprint payroll: daftar/tambah/edit payroll, workflow persetujuan, master komponen."""
+from datetime import datetime, timezone
+
+from flask import Blueprint, render_template, request, redirect, url_for, session, flash
+
+from payroll.audit import log_action
+from payroll.extensions import db
+from payroll.models import CompensationComponent, Employee, EmployeeCompensation, Payroll
+from payroll.services.compensation import get_component_totals, invalidate_compensation_cache
+from payroll.services.employee_summary import mark_employee_summary_dirty
+from payroll.services.loans import approved_payments, post_payments_to_payroll, release_payroll_installments
+from payroll.services.search import employee_search_filter
+from payroll.services.trends import schedule_trends_refresh
+from payroll.utils import (
+    compute_bpjs_kesehatan,
+    compute_bpjs_ketenagakerjaan,
+    compute_pph21,
+    months_of_service,
+    parse_currency,
+    parse_period_to_date,
+)
+
+
+bp = Blueprint('payroll', __name__)
+
+
+PAYROLL_SORTS = {
+    '':         (Payroll.id.desc(),),
+    'thp_desc': (Payroll.take_home_pay.desc(), Payroll.id.desc()),
+    'thp_asc':  (Payroll.take_home_pay.asc(), Payroll.id.asc()),
+}
+
+
+@bp.route('/payrolls')
+def payrolls():
+    if 'user_id' not in session or session.get('role') != 'admin':
+        flash('Anda tidak memiliki hak akses.', 'danger')
+        return redirect(url_for('auth.login'))
+
+    # ------- parameter filter lama -------
+    keyword   = request.args.get('keyword', '').strip()
+    pay_month = request.args.get('pay_period', '').strip()
+
+    # ------- parameter pagination baru -------
+    page      = request.args.get('page', 1, type=int)
+    per_page  = request.args.get('per_page', 10, type=int)
+    if per_page not in (10, 50, 100):          # fallback aman
+        per_page = 10
+
+    # ------- urut & filter take home pay (kolom tersimpan + indeks) -------
+    sort    = request.args.get('sort', '').strip()
+    min_thp = request.args.get('min_thp', '').strip()
+    max_thp = request.args.get('max_thp', '').strip()
+    if sort not in PAYROLL_SORTS:
+        sort = ''
+
+    # ------- query dasar -------
+    query = Payroll.query.join(Employee)
+    if keyword:
+        query = query.filter(employee_search_filter(keyword))
+    if pay_month:
+        query = query.filter(Payroll.in_period(pay_month))
+    if min_thp:
+        query = query.filter(Payroll.take_home_pay >= parse_currency(min_thp))
+    if max_thp:
+        query = query.filter(Payroll.take_home_pay <= parse_currency(max_thp))
+
+    draft_count = query.filter(Payroll.status == 'draft').count()
+    submitted_count = query.filter(Payroll.status == 'submitted').count()
+    rejected_count = query.filter(Payroll.status == 'rejected').count()
+
+    pagination   = query.order_by(*PAYROLL_SORTS[sort]).paginate(
+                       page=page, per_page=per_page, error_out=False)
+    payrolls_pag = pagination.items
+
+    # parameter filter yang dibawa link pagination
+    filter_args = {'keyword': keyword, 'pay_period': pay_month,
+                   'sort': sort, 'min_thp': min_thp, 'max_thp': max_thp}
+
+    return render_template('payrolls.html',
+                           payrolls   = payrolls_pag,
+                           pagination = pagination,
+                           per_page   = per_page,
+                           filter_args = filter_args,
+                           draft_count = draft_count,
+                           submitted_count = submitted_count,
+                           rejected_count = rejected_count)
+
+
+# === ADD PAYROLL BARU === ----------------------------------------------------
+@bp.route('/add_payroll', methods=['GET', 'POST'])
+def add_payroll():
+    # ---------- otorisasi ----------
+    if 'user_id' not in session:
+        flash('Harap login terlebih dahulu.', 'warning')
+        return redirect(url_for('auth.login'))
+    if session.get('role') != 'admin':
+        flash('Anda tidak memiliki hak akses.', 'danger')
+        return redirect(url_for('reports.index'))
+
+    # ============================= POST (submit form) =========================
+    if request.method == 'POST':
+        auto_calc = request.form.get('auto_calc') == 'on'
+
+        # nilai form dasar
+        employee_id  = int(request.form['employee_id'])
+        pay_period   = request.form['pay_period']
+        end_date     = parse_period_to_date(pay_period)
+
+        gaji_pokok           = parse_currency(request.form.get('gaji_pokok'))
+        bpjs_ketenagakerjaan = parse_currency(request.form.get('bpjs_ketenagakerjaan'))
+        bpjs_kesehatan       = parse_currency(request.form.get('bpjs_kesehatan'))
+        pph21                = parse_currency(request.form.get('pph21'))
+        tunjangan_makan      = parse_currency(request.form.get('tunjangan_makan'))
+        tunjangan_transport  = parse_currency(request.form.get('tunjangan_transport'))
+        tunjangan_lainnya    = parse_currency(request.form.get('tunjangan_lainnya'))
+        potongan_gaji        = parse_currency(request.form.get('potongan_gaji'))
+        upah_lembur          = parse_currency(request.form.get('upah_lembur'))
+        alpha                = int(request.form.get('alpha') or 0)
+
+        # -------- THR --------
+        emp       = Employee.query.get(employee_id)
+        thr_value = 0.0
+        if request.form.get('is_thr') == 'on' and emp and end_date:
+            months = months_of_service(emp.hire_date, end_date)
+            thr_value = gaji_pokok if months >= 12 else (months / 12.0) * gaji_pokok
+
+        gross_income = (
+            gaji_pokok
+            + tunjangan_makan
+            + tunjangan_transport
+            + tunjangan_lainnya
+            + upah_lembur
+            + thr_value
+        )
+        if auto_calc:
+            bpjs_ketenagakerjaan = compute_bpjs_ketenagakerjaan(gaji_pokok)
+            bpjs_kesehatan = compute_bpjs_kesehatan(gaji_pokok)
+            pph21 = compute_pph21(gross_income, bpjs_ketenagakerjaan + bpjs_kesehatan)
+
+        # -------- validasi duplikasi payroll periode --------
+        existing = Payroll.query.filter_by(employee_id=employee_id, pay_period=pay_period).first()
+        if existing:
+            flash('Payroll untuk karyawan dan periode tersebut sudah ada.', 'danger')
+            return redirect(url_for('payroll.add_payroll', employee_id=employee_id))
+
+        # -------- buat payroll --------
+        payroll = Payroll(
+            employee_id          = employee_id,
+            pay_period           = pay_period,
+            gaji_pokok           = gaji_pokok,
+            bpjs_ketenagakerjaan = bpjs_ketenagakerjaan,
+            bpjs_kesehatan       = bpjs_kesehatan,
+            tunjangan_makan      = tunjangan_makan,
+            tunjangan_transport  = tunjangan_transport,
+            tunjangan_lainnya    = tunjangan_lainnya,
+            potongan_gaji        = potongan_gaji,
+            alpha                = alpha,
+            hutang               = 0,                   # diisi setelah angsuran diposting
+            upah_lembur          = upah_lembur,
+            thr                  = thr_value,
+            pph21                = pph21,
+            loan_deduction       = 0,                   # sudah tidak dipakai
+            status               = 'draft'
+        )
+        db.session.add(payroll)
+        db.session.flush()  # dapatkan payroll.id sebelum insert junction
+
+        # -------- posting angsuran terpilih (terkunci) + update progres --------
+        selected_payments = request.form.getlist('payments')            # ["12", "18", ...]
+        payroll.hutang = post_payments_to_payroll(payroll, selected_payments)
+
+        db.session.commit()
+        log_action('create_payroll', 'payroll', payroll.id, f'periode={pay_period}')
+        flash('Data payroll berhasil ditambahkan.', 'success')
+        return redirect(url_for('payroll.payrolls'))
+
+    # ============================= GET (form awal / ganti karyawan) ===========
+    # daftar karyawan diambil lewat typeahead /api/employees
+    selected_emp_id = request.args.get('employee_id', type=int)
+    selected_emp    = db.session.get(Employee, selected_emp_id) if selected_emp_id else None
+    payment_list    = approved_payments(selected_emp_id, request.args.get('pay_period')) if selected_emp_id else []
+    master_default  = get_component_totals(selected_emp_id, request.args.get('pay_period') or '') if selected_emp_id else None
+
+    return render_template(
+        'add_payroll.html',
+        selected_emp     = selected_emp,
+        payment_choices  = payment_list,
+        selected_emp_id  = selected_emp_id,
+        master_default   = master_default
+    )
+
+
+@bp.route('/edit_payroll/<int:payroll_id>', methods=['GET', 'POST'])
+def edit_payroll(payroll_id):
+    if 'user_id' not in session or session.get('role') != 'admin':
+        flash('Tidak memiliki akses.', 'danger')
+        return redirect(url_for('auth.login'))
+    
+    payroll = Payroll.query.get_or_404(payroll_id)
+
+    if payroll.status != 'draft':
+        flash('Payroll yang sudah diajukan/terkunci tidak dapat diedit.', 'warning')
+        return redirect(url_for('payroll.payslip', payroll_id=payroll.id))
+    
+    if request.method == 'GET':
+        return render_template('edit_payroll.html', payroll=payroll)
+    
+    # POST: proses data form
+    employee_id = request.form.get('employee_id', type=int)
+    pay_period = request.form.get('pay_period')  # misal "2025-03"
+    if not employee_id:
+        flash('Pilih karyawan terlebih dahulu.', 'danger')
+        return redirect(url_for('payroll.edit_payroll', payroll_id=payroll.id))
+
+    dup = Payroll.query.filter(
+        Payroll.employee_id == employee_id,
+        Payroll.pay_period == pay_period,
+        Payroll.id != payroll.id
+    ).first()
+    if dup:
+        flash('Payroll untuk karyawan dan periode tersebut sudah ada.', 'danger')
+        return redirect(url_for('payroll.edit_payroll', payroll_id=payroll.id))
+
+    # Konversi pay_period -> end_date
+    end_date = parse_period_to_date(pay_period)  # date(2025, 3, 1) atau None
+
+    auto_calc = request.form.get('auto_calc') == 'on'
+    gaji_pokok = parse_currency(request.form.get('gaji_pokok'))
+    
+    # Ambil data karyawan
+    emp = Employee.query.get(employee_id)
+
+    # THR logic
+    is_thr = request.form.get('is_thr')  # "on" or None
+    thr_value = 0.0
+    if is_thr == "on" and emp and end_date:
+        # Hitung masa kerja
+        masa_kerja = months_of_service(emp.hire_date, end_date)
+        if masa_kerja >= 12:
+            thr_value = gaji_pokok
+        else:
+            thr_value = (masa_kerja / 12.0) * gaji_pokok
+    
+    # Update payroll
+    payroll.employee_id = employee_id
+    payroll.pay_period = pay_period
+    payroll.gaji_pokok = gaji_pokok
+    payroll.thr = thr_value  # simpan hasil THR
+
+    # BPJS
+    bpjs_ketenagakerjaan = parse_currency(request.form.get('bpjs_ketenagakerjaan'))
+    bpjs_kesehatan = parse_currency(request.form.get('bpjs_kesehatan'))
+    pph21 = parse_currency(request.form.get('pph21'))
+
+    # Tunjangan makan
+    tunjangan_makan = parse_currency(request.form.get('tunjangan_makan'))
+    payroll.tunjangan_makan = tunjangan_makan
+
+    # Tunjangan transport
+    tunjangan_transport = parse_currency(request.form.get('tunjangan_transport'))
+    payroll.tunjangan_transport = tunjangan_transport
+
+    # Tunjangan lainnya
+    tunjangan_lainnya = parse_currency(request.form.get('tunjangan_lainnya'))
+    payroll.tunjangan_lainnya = tunjangan_lainnya
+
+    # Potongan gaji
+    potongan_gaji = parse_currency(request.form.get('potongan_gaji'))
+    payroll.potongan_gaji = potongan_gaji
+
+    # Alpha
+    alpha = int(request.form.get('alpha') or 0)
+    payroll.alpha = alpha
+
+    # Upah lembur
+    upah_lembur = parse_currency(request.form.get('upah_lembur'))
+    payroll.upah_lembur = upah_lembur
+
+    gross_income = (
+        gaji_pokok
+        + tunjangan_makan
+        + tunjangan_transport
+        + tunjangan_lainnya
+        + upah_lembur
+        + thr_value
+    )
+    if auto_calc:
+        bpjs_ketenagakerjaan = compute_bpjs_ketenagakerjaan(gaji_pokok)
+        bpjs_kesehatan = compute_bpjs_kesehatan(gaji_pokok)
+        pph21 = compute_pph21(gross_income, bpjs_ketenagakerjaan + bpjs_kesehatan)
+
+    payroll.bpjs_ketenagakerjaan = bpjs_ketenagakerjaan
+    payroll.bpjs_kesehatan = bpjs_kesehatan
+    payroll.pph21 = pph21
+
+    db.session.commit()
+    log_action('update_payroll', 'payroll', payroll.id, f'periode={pay_period}')
+    flash('Data payroll berhasil diupdate.', 'success')
+    return redirect(url_for('payroll.payslip', payroll_id=payroll.id))
+
+
+@bp.route('/delete_payroll/<int:payroll_id>')
+def delete_payroll(payroll_id):
+    if 'user_id' not in session or session.get('role') != 'admin':
+        flash('Tidak memiliki akses.', 'danger')
+        return redirect(url_for('auth.login'))
+
+    payroll = Payroll.query.get_or_404(payroll_id)
+
+    if payroll.status != 'draft':
+        flash('Payroll yang sudah diajukan/terkunci tidak dapat dihapus.', 'warning')
+        return redirect(url_for('payroll.payrolls'))
+
+    # --- kembalikan status tiap angsuran ---
+    for pl in payroll.installments:
+        pay  = pl.payment
+        loan = pl.loan
+
+        # 1) balikan Payment             → approved
+        pay.status = 'approved'
+
+        # 2) mundurkan progres pinjaman
+        if loan.installments_paid > 0:
+            loan.installments_paid -= 1
+        if loan.status == 'completed':
+            loan.status = 'approved'  # aktif lagi kalau belum lunas
+
+    if payroll.installments:
+        mark_employee_summary_dirty(payroll.employee_id)
+    release_payroll_installments(payroll.id)
+    db.session.delete(payroll)
+    db.session.commit()
+    log_action('delete_payroll', 'payroll', payroll.id)
+    flash('Payroll dihapus & angsuran dikembalikan.', 'success')
+    return redirect(url_for('payroll.payrolls'))
+
+
+@bp.route('/payslip/<int:payroll_id>')
+def payslip(payroll_id):
+    # Pastikan hanya admin/login user
+    if 'user_id' not in session:
+        flash('Tidak memiliki akses.', 'danger')
+        return redirect(url_for('auth.login'))
+
+    payroll = Payroll.query.get_or_404(payroll_id)
+    # admin selalu boleh, user hanya jika payroll milik dirinya
+    if session.get('role') != 'admin':
+        emp = Employee.query.filter_by(user_id=session.get('user_id')).first()
+        if not emp or payroll.employee_id != emp.id:
+            flash('Tidak memiliki akses ke slip ini.', 'danger')
+            return redirect(url_for('loans.employee_dashboard'))
+
+    return render_template('payslip.html', payroll=payroll)
+
+
+@bp.route('/payrolls/<int:payroll_id>/submit', methods=['POST'])
+def submit_payroll(payroll_id):
+    if 'user_id' not in session or session.get('role') != 'admin':
+        flash('Tidak memiliki akses.', 'danger')
+        return redirect(url_for('auth.login'))
+
+    payroll = Payroll.query.get_or_404(payroll_id)
+    if payroll.status == 'approved':
+        flash('Payroll sudah disetujui.', 'info')
+        return redirect(url_for('payroll.payrolls'))
+    if payroll.status == 'submitted':
+        flash('Payroll sudah diajukan.', 'info')
+        return redirect(url_for('payroll.payrolls'))
+    if payroll.status != 'draft':
+        flash('Payroll harus dikembalikan ke draft sebelum diajukan.', 'warning')
+        return redirect(url_for('payroll.payrolls'))
+
+    payroll.status = 'submitted'
+    payroll.submitted_by = session.get('user_id')
+    payroll.submitted_at = datetime.now(timezone.utc)
+    payroll.reject_reason = None
+    db.session.commit()
+    log_action('submit_payroll', 'payroll', payroll.id, f'submitted_by={payroll.submitted_by}')
+    flash('Payroll berhasil diajukan untuk persetujuan.', 'success')
+    return redirect(url_for('payroll.payrolls'))
+
+
+@bp.route('/payrolls/<int:payroll_id>/reject', methods=['POST'])
+def reject_payroll(payroll_id):
+    if 'user_id' not in session or session.get('role') != 'admin':
+        flash('Tidak memiliki akses.', 'danger')
+        return redirect(url_for('auth.login'))
+
+    payroll = Payroll.query.get_or_404(payroll_id)
+    if payroll.status != 'submitted':
+        flash('Payroll hanya bisa ditolak saat status menunggu.', 'warning')
+        return redirect(url_for('payroll.payrolls'))
+
+    reason = (request.form.get('reject_reason') or '').strip()
+    if not reason:
+        flash('Alasan penolakan wajib diisi.', 'warning')
+        return redirect(url_for('payroll.payrolls'))
+
+    payroll.status = 'rejected'
+    payroll.reject_reason = reason
+    db.session.commit()
+    log_action('reject_payroll', 'payroll', payroll.id, f'reason={reason}')
+    flash('Payroll ditolak.', 'warning')
+    return redirect(url_for('payroll.payrolls'))
+
+
+@bp.route('/payrolls/<int:payroll_id>/revert', methods=['POST'])
+def revert_payroll(payroll_id):
+    if 'user_id' not in session or session.get('role') != 'admin':
+        flash('Tidak memiliki akses.', 'danger')
+        return redirect(url_for('auth.login'))
+
+    payroll = Payroll.query.get_or_404(payroll_id)
+    if payroll.status not in ('submitted', 'rejected'):
+        flash('Payroll tidak dapat dikembalikan ke draft.', 'warning')
+        return redirect(url_for('payroll.payrolls'))
+
+    payroll.status = 'draft'
+    payroll.submitted_by = None
+    payroll.submitted_at = None
+    payroll.reject_reason = None
+    db.session.commit()
+    log_action('revert_payroll', 'payroll', payroll.id, 'reverted_to_draft')
+    flash('Payroll dikembalikan ke draft.', 'success')
+    return redirect(url_for('payroll.payrolls'))
+
+
+@bp.route('/payrolls/<int:payroll_id>/approve', methods=['POST'])
+def approve_payroll(payroll_id):
+    if 'user_id' not in session or session.get('role') != 'admin':
+        flash('Tidak memiliki akses.', 'danger')
+        return redirect(url_for('auth.login'))
+
+    payroll = Payroll.query.get_or_404(payroll_id)
+    if payroll.status == 'approved':
+        flash('Payroll sudah disetujui.', 'info')
+        return redirect(url_for('payroll.payrolls'))
+    if payroll.status != 'submitted':
+        flash('Payroll harus diajukan terlebih dahulu.', 'warning')
+        return redirect(url_for('payroll.payrolls'))
+
+    payroll.status = 'approved'
+    payroll.approved_by = session.get('user_id')
+    payroll.approved_at = datetime.now(timezone.utc)
+    db.session.commit()
+    log_action('approve_payroll', 'payroll', payroll.id, f'approved_by={payroll.approved_by}')
+    schedule_trends_refresh()
+    flash('Payroll telah disetujui dan dikunci.', 'success')
+    return redirect(url_for('payroll.payrolls'))
+
+
+@bp.route('/payrolls/bulk_approve', methods=['POST'])
+def bulk_approve_payrolls():
+    if 'user_id' not in session or session.get('role') != 'admin':
+        flash('Tidak memiliki akses.', 'danger')
+        return redirect(url_for('auth.login'))
+
+    ids = request.form.getlist('payroll_ids')
+    if not ids:
+        flash('Tidak ada payroll yang dipilih.', 'warning')
+        return redirect(url_for('payroll.payrolls'))
+
+    # hanya approve yang sudah diajukan
+    to_approve = Payroll.query.filter(Payroll.id.in_(ids), Payroll.status == 'submitted').all()
+    for p in to_approve:
+        p.status = 'approved'
+        p.approved_by = session.get('user_id')
+        p.approved_at = datetime.now(timezone.utc)
+        log_action('approve_payroll', 'payroll', p.id, 'bulk')
+    db.session.commit()
+    if to_approve:
+        schedule_trends_refresh()
+
+    flash(f'{len(to_approve)} payroll berhasil disetujui.', 'success')
+    return redirect(url_for('payroll.payrolls'))
+
+
+@bp.route('/components', methods=['GET', 'POST'])
+def components():
+    if 'user_id' not in session or session.get('role') != 'admin':
+        flash('Tidak memiliki akses.', 'danger')
+        return redirect(url_for('auth.login'))
+
+    if request.method == 'POST':
+        code = (request.form.get('code') or '').strip()
+        name = request.form.get('name')
+        comp_type = request.form.get('comp_type')
+        calc_type = request.form.get('calc_type', 'fixed')
+        default_value = float(request.form.get('default_value') or 0)
+
+        if not code or not name or comp_type not in ('gaji_pokok','tunjangan','potongan'):
+            flash('Data komponen tidak valid.', 'danger')
+            return redirect(url_for('payroll.components'))
+
+        exists = CompensationComponent.query.filter_by(code=code).first()
+        if exists:
+            flash('Kode komponen sudah ada.', 'danger')
+            return redirect(url_for('payroll.components'))
+
+        comp = CompensationComponent(
+            code=code, name=name, comp_type=comp_type,
+            calc_type=calc_type, default_value=default_value, active=True
+        )
+        db.session.add(comp)
+        invalidate_compensation_cache()
+        db.session.commit()
+        flash('Komponen berhasil ditambahkan.', 'success')
+        return redirect(url_for('payroll.components'))
+
+    comps = CompensationComponent.query.order_by(CompensationComponent.created_at.desc()).all()
+    return render_template('components.html', components=comps)
+
+
+@bp.route('/components/<int:comp_id>/toggle', methods=['POST'])
+def toggle_component(comp_id):
+    if 'user_id' not in session or session.get('role') != 'admin':
+        flash('Tidak memiliki akses.', 'danger')
+        return redirect(url_for('auth.login'))
+    comp = CompensationComponent.query.get_or_404(comp_id)
+    comp.active = not comp.active
+    invalidate_compensation_cache()
+    db.session.commit()
+    flash('Status komponen diperbarui.', 'success')
+    return redirect(url_for('payroll.components'))
+
+
+@bp.route('/components/<int:comp_id>/edit', methods=['GET', 'POST'])
+def edit_component(comp_id):
+    if 'user_id' not in session or session.get('role') != 'admin':
+        flash('Tidak memiliki akses.', 'danger')
+        return redirect(url_for('auth.login'))
+    comp = CompensationComponent.query.get_or_404(comp_id)
+    if request.method == 'POST':
+        code = (request.form.get('code') or '').strip()
+        name = request.form.get('name')
+        comp_type = request.form.get('comp_type')
+        calc_type = request.form.get('calc_type', 'fixed')
+        default_value = float(request.form.get('default_value') or 0)
+
+        if not code or not name or comp_type not in ('gaji_pokok','tunjangan','potongan'):
+            flash('Data komponen tidak valid.', 'danger')
+            return redirect(url_for('payroll.edit_component', comp_id=comp_id))
+
+        duplicate = CompensationComponent.query.filter(
+            CompensationComponent.code == code,
+            CompensationComponent.id != comp_id
+        ).first()
+        if duplicate:
+            flash('Kode komponen sudah dipakai.', 'danger')
+            return redirect(url_for('payroll.edit_component', comp_id=comp_id))
+
+        comp.code = code
+        comp.name = name
+        comp.comp_type = comp_type
+        comp.calc_type = calc_type
+        comp.default_value = default_value
+        invalidate_compensation_cache()
+        db.session.commit()
+        flash('Komponen berhasil diupdate.', 'success')
+        return redirect(url_for('payroll.components'))
+
+    return render_template('edit_component.html', comp=comp)
+
+
+@bp.route('/components/<int:comp_id>/delete', methods=['POST'])
+def delete_component(comp_id):
+    if 'user_id' not in session or session.get('role') != 'admin':
+        flash('Tidak memiliki akses.', 'danger')
+        return redirect(url_for('auth.login'))
+
+    comp = CompensationComponent.query.get_or_404(comp_id)
+    linked = EmployeeCompensation.query.filter_by(component_id=comp_id).first()
+    if linked:
+        flash('Komponen sudah dipakai karyawan, tidak dapat dihapus. Nonaktifkan saja.', 'warning')
+        return redirect(url_for('payroll.components'))
+
+    db.session.delete(comp)
+    invalidate_compensation_cache()
+    db.session.commit()
+    flash('Komponen dihapus.', 'success')
+    return redirect(url_for('payroll.components'))
+
+
+@bp.route('/employees/<int:employee_id>/components', methods=['GET', 'POST'])
+def employee_components(employee_id):
+    if 'user_id' not in session or session.get('role') != 'admin':
+        flash('Tidak memiliki akses.', 'danger')
+        return redirect(url_for('auth.login'))
+
+    emp = Employee.query.get_or_404(employee_id)
+    comps = CompensationComponent.query.filter_by(active=True).order_by(CompensationComponent.name).all()
+
+    if request.method == 'POST':
+        comp_id = request.form.get('component_id', type=int)
+        value = request.form.get('value')
+        start_period = request.form.get('start_period') or None
+        comp = CompensationComponent.query.get(comp_id)
+        if not comp:
+            flash('Komponen tidak ditemukan.', 'danger')
+            return redirect(url_for('payroll.employee_components', employee_id=employee_id))
+
+        existing = EmployeeCompensation.query.filter_by(
+            employee_id=employee_id, component_id=comp_id, start_period=start_period
+        ).first()
+        if existing:
+            flash('Komponen sudah di-assign dengan periode tersebut.', 'warning')
+            return redirect(url_for('payroll.employee_components', employee_id=employee_id))
+
+        assign = EmployeeCompensation(
+            employee_id=employee_id,
+            component_id=comp_id,
+            value=float(value) if value else None,
+            start_period=start_period,
+            active=True
+        )
+        db.session.add(assign)
+        invalidate_compensation_cache()
+        db.session.commit()
+        flash('Komponen karyawan berhasil ditambahkan.', 'success')
+        return redirect(url_for('payroll.employee_components', employee_id=employee_id))
+
+    assigned = (EmployeeCompensation.query
+                .filter_by(employee_id=employee_id)
+                .join(CompensationComponent)
+                .order_by(CompensationComponent.comp_type, EmployeeCompensation.start_period.desc())
+                .all())
+    return render_template('employee_components.html',
+                           employee=emp,
+                           components=comps,
+                           assigned=assigned)
+
+
+@bp.route('/employees/components/<int:assign_id>/toggle', methods=['POST'])
+def toggle_employee_component(assign_id):
+    if 'user_id' not in session or session.get('role') != 'admin':
+        flash('Tidak memiliki akses.', 'danger')
+        return redirect(url_for('auth.login'))
+
+    assign = EmployeeCompensation.query.get_or_404(assign_id)
+    assign.active = not assign.active
+    invalidate_compensation_cache()
+    db.session.commit()
+    flash('Status komponen karyawan diperbarui.', 'success')
+    return redirect(url_for('payroll.employee_components', employee_id=assign.employee_id))
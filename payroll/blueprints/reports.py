@@ -0,0 +1,481 @@
+"""Blueprint laporan: beranda, dashboard, dan ekspor (payroll, kepatuhan, bank, karyawan).
+
+pandas dan pdfkit di-import di dalam route ekspor saja agar start worker ringan.
+"""
+import io
+import os
+import tempfile
+import zipfile
+from datetime import datetime, date
+
+import sqlalchemy as sa
+from flask import (Blueprint, Response, render_template, request, redirect, url_for, session, flash, make_response,
+                   send_file, stream_with_context)
+from sqlalchemy import func
+
+from payroll.database import replica_route
+from payroll.extensions import db
+from payroll.models import Employee, Loan, Payment, Payroll
+from payroll.services.analytics_export import write_facts
+from payroll.services.bank_files import write_bank_files
+from payroll.services.report_export import bank_export_query, compliance_report_query, iter_csv
+from payroll.services.search import employee_search_filter
+from payroll.services.trends import load_trends, refresh_trends_snapshot, schedule_trends_refresh
+from payroll.utils import get_pdfkit_config
+
+
+bp = Blueprint('reports', __name__)
+
+# file ekspor (CSV/zip) di memori sampai ukuran ini, selebihnya ke file sementara
+REPORT_SPOOL_BYTES = 8 * 1024 * 1024
+
+
+@bp.route('/')
+@replica_route
+def index():
+    total_employees = Employee.query.count()
+    active_employees = Employee.query.filter_by(status='active').count()
+    inactive_employees = Employee.query.filter_by(status='inactive').count()
+
+    now = datetime.now()
+    month_start = date(now.year, now.month, 1)
+    hires_this_month = Employee.query.filter(Employee.hire_date >= month_start).count()
+
+    # max(period_start) dibaca dari indeks, bukan scan seluruh pay_period
+    latest_start = db.session.query(func.max(Payroll.period_start)).scalar()
+    latest_period = latest_start.strftime('%Y-%m') if latest_start else None
+    payroll_total = 0
+    payroll_approved = 0
+    payroll_draft = 0
+    payroll_take_home = 0
+    payroll_deductions = 0
+    if latest_period:
+        payroll_total = Payroll.query.filter(Payroll.period_start == latest_start).count()
+        payroll_approved = Payroll.query.filter(
+            Payroll.period_start == latest_start,
+            Payroll.status == 'approved'
+        ).count()
+        payroll_draft = Payroll.query.filter(
+            Payroll.period_start == latest_start,
+            Payroll.status != 'approved'
+        ).count()
+        payroll_take_home = db.session.query(
+            func.sum(Payroll.take_home_pay)
+        ).filter(Payroll.period_start == latest_start).scalar() or 0
+        payroll_deductions = db.session.query(
+            func.sum(Payroll.total_deductions)
+        ).filter(Payroll.period_start == latest_start).scalar() or 0
+
+    payroll_approved_pct = int(round((payroll_approved / payroll_total) * 100)) if payroll_total else 0
+
+    loans_active = Loan.query.filter(Loan.status == 'approved').count()
+    loans_pending = Loan.query.filter(Loan.status == 'pending').count()
+    loans_completed = Loan.query.filter(Loan.status == 'completed').count()
+    loan_total = db.session.query(
+        func.sum(Loan.amount + (Loan.amount * Loan.interest_rate / 100))
+    ).filter(Loan.status == 'approved').scalar() or 0
+    loan_outstanding = db.session.query(
+        func.sum(Loan.remaining)
+    ).filter(Loan.status == 'approved').scalar() or 0
+    loan_paid = max(loan_total - loan_outstanding, 0)
+    loan_paid_pct = int(round((loan_paid / loan_total) * 100)) if loan_total else 0
+
+    payments_pending = Payment.query.filter(Payment.status == 'pending').count()
+
+    latest_period_label = "Belum ada payroll"
+    if latest_period:
+        try:
+            year, month = latest_period.split('-')
+            month_names = [
+                "Januari", "Februari", "Maret", "April", "Mei", "Juni",
+                "Juli", "Agustus", "September", "Oktober", "November", "Desember"
+            ]
+            month_index = int(month) - 1
+            if 0 <= month_index < len(month_names):
+                latest_period_label = f"{month_names[month_index]} {year}"
+            else:
+                latest_period_label = latest_period
+        except ValueError:
+            latest_period_label = latest_period
+
+    active_pct = int(round((active_employees / total_employees) * 100)) if total_employees else 0
+
+    return render_template(
+        'index.html',
+        total_employees=total_employees,
+        active_employees=active_employees,
+        inactive_employees=inactive_employees,
+        active_pct=active_pct,
+        hires_this_month=hires_this_month,
+        latest_period=latest_period,
+        latest_period_label=latest_period_label,
+        payroll_total=payroll_total,
+        payroll_approved=payroll_approved,
+        payroll_draft=payroll_draft,
+        payroll_take_home=payroll_take_home,
+        payroll_deductions=payroll_deductions,
+        payroll_approved_pct=payroll_approved_pct,
+        loans_active=loans_active,
+        loans_pending=loans_pending,
+        loans_completed=loans_completed,
+        loan_total=loan_total,
+        loan_outstanding=loan_outstanding,
+        loan_paid_pct=loan_paid_pct,
+        payments_pending=payments_pending
+    )
+
+
+@bp.route('/dashboard')
+@replica_route
+def dashboard():
+    # Pastikan hanya user yang sudah login bisa mengakses
+    if 'user_id' not in session:
+        flash('Harap login terlebih dahulu.', 'warning')
+        return redirect(url_for('auth.login'))
+    if session.get('role') != 'admin':
+        flash('Anda tidak memiliki hak akses ke halaman ini.', 'danger')
+        return redirect(url_for('reports.index'))
+
+    # Total karyawan
+    total_employee = Employee.query.count()
+    
+    # Tentukan periode bulan berjalan dalam format "YYYY-MM"
+    now = datetime.now()
+    current_period = now.strftime("%Y-%m")
+    current_year = now.strftime("%Y")
+    current_month = now.month
+    # rentang tanggal di period_start (ber-indeks), bukan substr/cast pay_period
+    month_start = date(now.year, now.month, 1)
+    year_start = date(now.year, 1, 1)
+    in_current_period = Payroll.period_start == month_start
+    in_ytd = sa.and_(Payroll.period_start >= year_start, Payroll.period_start <= month_start)
+
+    # Total Gaji yang Dibayarkan (misal: jumlah gaji pokok dari payroll bulan ini)
+    total_gaji = db.session.query(func.sum(Payroll.gaji_pokok)).filter(in_current_period).scalar() or 0
+    
+    # Total Potongan (misalnya: potongan_gaji + hutang + (alpha * (gaji_pokok/30)))
+    total_potongan = db.session.query(
+        func.sum(Payroll.potongan_gaji + Payroll.hutang + (Payroll.alpha * (Payroll.gaji_pokok/30)))
+    ).filter(in_current_period).scalar() or 0
+
+    # Rata-rata Take Home Pay
+    avg_take_home = db.session.query(func.avg(Payroll.take_home_pay)).filter(in_current_period).scalar() or 0
+
+    # Akumulasi Januari s.d periode aktif (tahun berjalan) dengan filter tahun tegas
+    total_gaji_ytd = db.session.query(func.sum(Payroll.gaji_pokok)).filter(in_ytd).scalar() or 0
+    total_potongan_ytd = db.session.query(
+        func.sum(Payroll.potongan_gaji + Payroll.hutang + (Payroll.alpha * (Payroll.gaji_pokok/30)))
+    ).filter(in_ytd).scalar() or 0
+    avg_take_home_ytd = db.session.query(func.avg(Payroll.take_home_pay)).filter(in_ytd).scalar() or 0
+
+    # Ringkasan per bulan (tahun berjalan)
+    agg_rows = db.session.query(
+        Payroll.period_start,
+        func.sum(Payroll.gaji_pokok),
+        func.sum(Payroll.potongan_gaji + Payroll.hutang + (Payroll.alpha * (Payroll.gaji_pokok/30))),
+        func.avg(Payroll.take_home_pay)
+    ).filter(
+        Payroll.in_year(now.year)
+    ).group_by(Payroll.period_start).all()
+
+    agg_map = {row[0].strftime("%Y-%m"): row for row in agg_rows}
+    month_names = ["Januari", "Februari", "Maret", "April", "Mei", "Juni",
+                   "Juli", "Agustus", "September", "Oktober", "November", "Desember"]
+    monthly_data = []
+    for m in range(1, current_month + 1):
+        period = f"{current_year}-{m:02d}"
+        row = agg_map.get(period)
+        gaji = float(row[1]) if row else 0.0
+        potongan = float(row[2]) if row else 0.0
+        avg_thp_month = float(row[3]) if row else 0.0
+        monthly_data.append({
+            "period": period,
+            "label": month_names[m-1],
+            "gaji": gaji,
+            "potongan": potongan,
+            "avg_thp": avg_thp_month
+        })
+
+    return render_template('dashboard.html',
+                           total_employee=total_employee,
+                           total_gaji=total_gaji,
+                           total_potongan=total_potongan,
+                           avg_take_home=avg_take_home,
+                           total_gaji_ytd=total_gaji_ytd,
+                           total_potongan_ytd=total_potongan_ytd,
+                           avg_take_home_ytd=avg_take_home_ytd,
+                           current_period=current_period,
+                           current_year=current_year,
+                           monthly_data=monthly_data)
+
+
+@bp.route('/dashboard/trends')
+def trends():
+    """Tren multi-tahun dari snapshot Parquet (tidak menyentuh database)."""
+    if 'user_id' not in session or session.get('role') != 'admin':
+        flash('Tidak memiliki akses.', 'danger')
+        return redirect(url_for('auth.login'))
+
+    data = load_trends()
+    if data is None:
+        schedule_trends_refresh()
+    return render_template('trends.html', trends=data)
+
+
+@bp.route('/dashboard/trends/refresh', methods=['POST'])
+def refresh_trends():
+    if 'user_id' not in session or session.get('role') != 'admin':
+        flash('Tidak memiliki akses.', 'danger')
+        return redirect(url_for('auth.login'))
+
+    refresh_trends_snapshot()
+    flash('Snapshot tren diperbarui.', 'success')
+    return redirect(url_for('reports.trends'))
+
+
+# Export Payroll
+@bp.route('/export/payrolls/<string:file_format>')
+@replica_route
+def export_payrolls(file_format):
+    # --- otorisasi ---
+    if 'user_id' not in session or session.get('role') != 'admin':
+        flash('Tidak memiliki akses.', 'danger')
+        return redirect(url_for('auth.login'))
+
+    # --- ambil filter yg sama dgn halaman /payrolls ---
+    keyword          = request.args.get('keyword', '').strip()
+    pay_period       = request.args.get('pay_period', '').strip()
+
+    query = Payroll.query.join(Employee)
+    if keyword:
+        query = query.filter(employee_search_filter(keyword))
+    if pay_period:
+        query = query.filter(Payroll.in_period(pay_period))
+
+    payrolls = query.all()          # <-- sekarang sudah ter-filter
+
+    # --- siapkan data dict - sama seperti sebelumnya ---
+    data = [{
+        'ID'                    : p.id,
+        'Karyawan'              : p.employee.name,
+        'Periode'               : p.pay_period,
+        'Gaji Pokok'            : p.gaji_pokok,
+        'BPJS Ketenagakerjaan'  : p.bpjs_ketenagakerjaan,
+        'BPJS Kesehatan'        : p.bpjs_kesehatan,
+        'Tunjangan Makan'       : p.tunjangan_makan,
+        'Tunjangan Transport'   : p.tunjangan_transport,
+        'Tunjangan Lainnya'     : p.tunjangan_lainnya,
+        'THR'                   : p.thr,
+        'PPH21'                 : p.pph21,
+        'Potongan Gaji'         : p.potongan_gaji,
+        'Alpha'                 : p.alpha,
+        'Total Potongan'        : p.total_deductions,
+        'Upah Lembur'           : p.upah_lembur,
+        'Take Home Pay'         : p.take_home_pay,
+    } for p in payrolls]
+
+    # --- EXPORT EXCEL ---
+    if file_format == 'excel':
+        import pandas as pd
+
+        df      = pd.DataFrame(data)
+        output  = io.BytesIO()
+        with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
+            df.to_excel(writer, index=False, sheet_name='Payrolls')
+        output.seek(0)
+        response = make_response(output.read())
+        response.headers['Content-Disposition'] = 'attachment; filename=payrolls.xlsx'
+        response.headers['Content-Type']        = ('application/vnd.openxmlformats-'
+                                                   'officedocument.spreadsheetml.sheet')
+        return response
+
+    # --- EXPORT PDF ---
+    elif file_format == 'pdf':
+        rendered = render_template('export_payrolls_pdf.html', payrolls=payrolls)
+        config = get_pdfkit_config()
+        if not config:
+            flash('Export PDF gagal: wkhtmltopdf tidak ditemukan. '
+                  'Install wkhtmltopdf dan/atau set environment WKHTMLTOPDF_PATH.', 'danger')
+            return redirect(url_for('payroll.payrolls',
+                                    keyword=keyword,
+                                    pay_period=pay_period))
+        import pdfkit
+
+        pdf      = pdfkit.from_string(rendered, False, configuration=config)
+        response = make_response(pdf)
+        response.headers['Content-Disposition'] = 'attachment; filename=payrolls.pdf'
+        response.headers['Content-Type']        = 'application/pdf'
+        return response
+
+    flash('Format tidak didukung.', 'warning')
+    return redirect(url_for('payroll.payrolls'))
+
+
+def _csv_download(query_factory, pay_period, filename):
+    chunks = iter_csv(query_factory, pay_period)
+    # potongan pertama diambil sebelum header terkirim: query gagal (atau replica
+    # down) masih ditangani replica_route/errorhandler seperti biasa
+    first = next(chunks, b'')
+
+    def generate():
+        yield first
+        yield from chunks
+
+    return Response(stream_with_context(generate()), mimetype='text/csv',
+                    headers={'Content-Disposition': f'attachment; filename={filename}'})
+
+
+@bp.route('/reports/compliance')
+@replica_route
+def compliance_report():
+    if 'user_id' not in session or session.get('role') != 'admin':
+        flash('Tidak memiliki akses.', 'danger')
+        return redirect(url_for('auth.login'))
+
+    pay_period = request.args.get('pay_period', '').strip()
+    if not pay_period:
+        flash('Periode wajib diisi untuk laporan kepatuhan.', 'warning')
+        return redirect(url_for('payroll.payrolls'))
+
+    return _csv_download(compliance_report_query, pay_period, f'compliance_{pay_period}.csv')
+
+
+@bp.route('/reports/bank_export')
+@replica_route
+def bank_export():
+    if 'user_id' not in session or session.get('role') != 'admin':
+        flash('Tidak memiliki akses.', 'danger')
+        return redirect(url_for('auth.login'))
+
+    pay_period = request.args.get('pay_period', '').strip()
+    file_format = request.args.get('file_format', 'csv').lower()
+    if not pay_period:
+        flash('Periode wajib diisi untuk ekspor bank.', 'warning')
+        return redirect(url_for('payroll.payrolls'))
+
+    if file_format != 'excel':
+        return _csv_download(bank_export_query, pay_period, f'bank_export_{pay_period}.csv')
+
+    import pandas as pd
+
+    connection = db.session.connection()
+    df = pd.read_sql(bank_export_query(pay_period, connection.dialect.name), connection)
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
+        df.to_excel(writer, index=False, sheet_name='Bank Export')
+    output.seek(0)
+    resp = make_response(output.read())
+    resp.headers['Content-Disposition'] = f'attachment; filename=bank_export_{pay_period}.xlsx'
+    resp.headers['Content-Type'] = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    return resp
+
+
+@bp.route('/reports/bank_files')
+@replica_route
+def bank_files():
+    """Zip file transfer massal per bank (payroll approved) beserta total kontrol."""
+    if 'user_id' not in session or session.get('role') != 'admin':
+        flash('Tidak memiliki akses.', 'danger')
+        return redirect(url_for('auth.login'))
+
+    pay_period = request.args.get('pay_period', '').strip()
+    if not pay_period:
+        flash('Periode wajib diisi untuk file transfer bank.', 'warning')
+        return redirect(url_for('payroll.payrolls'))
+
+    output = tempfile.SpooledTemporaryFile(max_size=REPORT_SPOOL_BYTES)
+    try:
+        write_bank_files(pay_period, output)
+    except ValueError as exc:
+        output.close()
+        flash(str(exc), 'danger')
+        return redirect(url_for('payroll.payrolls'))
+    output.seek(0)
+    return send_file(output, mimetype='application/zip', as_attachment=True,
+                     download_name=f'bank_files_{pay_period}.zip')
+
+
+@bp.route('/reports/analytics_export')
+@replica_route
+def analytics_export():
+    """Zip dataset Parquet (payroll, pinjaman, pembayaran) berpartisi pay_period."""
+    if 'user_id' not in session or session.get('role') != 'admin':
+        flash('Tidak memiliki akses.', 'danger')
+        return redirect(url_for('auth.login'))
+
+    pay_period = request.args.get('pay_period', '').strip() or None
+    output = tempfile.SpooledTemporaryFile(max_size=REPORT_SPOOL_BYTES)
+    with tempfile.TemporaryDirectory(prefix='payroll_parquet_') as root:
+        try:
+            write_facts(root, pay_period)
+        except ValueError as exc:
+            output.close()
+            flash(str(exc), 'danger')
+            return redirect(url_for('payroll.payrolls'))
+        # parquet sudah terkompresi; zip hanya sebagai wadah
+        with zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_STORED) as archive:
+            for directory, _, files in os.walk(root):
+                for name in sorted(files):
+                    path = os.path.join(directory, name)
+                    archive.write(path, os.path.relpath(path, root))
+    output.seek(0)
+    return send_file(output, mimetype='application/zip', as_attachment=True,
+                     download_name=f"payroll_parquet_{pay_period or 'all'}.zip")
+
+
+# Export Employee
+@bp.route('/export/employees/<string:file_format>')
+@replica_route
+def export_employees(file_format):
+    if 'user_id' not in session or session.get('role') != 'admin':
+        flash('Tidak memiliki akses.', 'danger')
+        return redirect(url_for('auth.login'))
+    
+    employees = Employee.query.all()
+    data = []
+    for emp in employees:
+        data.append({
+            'ID': emp.id,
+            'NIK': emp.nik,
+            'Nama': emp.name,
+            'Jabatan': emp.position,
+            'Alamat': emp.address,
+            'Telepon': emp.phone,
+            'No. Rekening'  : emp.no_rek,  # <-- baru
+            'Nama Bank'     : emp.bank_name,
+            'Tanggal Masuk': emp.hire_date.strftime("%d/%m/%Y") if emp.hire_date else ''
+        })
+    
+    if file_format == 'excel':
+        import pandas as pd
+
+        df = pd.DataFrame(data)
+        output = io.BytesIO()
+        writer = pd.ExcelWriter(output, engine='xlsxwriter')
+        df.to_excel(writer, index=False, sheet_name='Employees')
+        writer.save()
+        output.seek(0)
+        response = make_response(output.read())
+        response.headers['Content-Disposition'] = 'attachment; filename=employees.xlsx'
+        response.headers['Content-Type'] = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        return response
+
+    elif file_format == 'pdf':
+        # Render template khusus untuk export PDF karyawan (buat file export_employees_pdf.html)
+        rendered = render_template('export_employees_pdf.html', employees=employees)
+        config = get_pdfkit_config()
+        if not config:
+            flash('Export PDF gagal: wkhtmltopdf tidak ditemukan. '
+                  'Install wkhtmltopdf dan/atau set environment WKHTMLTOPDF_PATH.', 'danger')
+            return redirect(url_for('employees.employees'))
+        import pdfkit
+
+        pdf = pdfkit.from_string(rendered, False, configuration=config)
+        response = make_response(pdf)
+        response.headers['Content-Disposition'] = 'attachment; filename=employees.pdf'
+        response.headers['Content-Type'] = 'application/pdf'
+        return response
+
+    else:
+        flash('Format tidak didukung.', 'warning')
+        return redirect(url_for('employees.employees'))
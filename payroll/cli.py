@@ -0,0 +1,185 @@
+"""Perintah CLI `flask ...` untuk pemeliharaan database dan data."""
+import time
+
+import click
+from flask.cli import AppGroup
+
+from payroll import partitions, synthetic
+from payroll.database import run_sqlite_maintenance, sqlite_file_url
+from payroll.extensions import db
+from payroll.services import analytics_export
+from payroll.services.loans import reconcile_loan_totals
+from payroll.utils import parse_period_to_date
+
+partitions_cli = AppGroup('partitions', help="Partisi tahunan tabel payroll (Postgres).")
+loans_cli = AppGroup('loans', help="Pemeliharaan data pinjaman.")
+analytics_cli = AppGroup('analytics', help="Ekspor Parquet fakta payroll untuk analitik.")
+data_cli = AppGroup('data', help="Data sintetis untuk uji beban.")
+sqlite_cli = AppGroup('sqlite', help="Pemeliharaan database SQLite.")
+
+
+def _run(func, *args):
+    try:
+        with db.engine.begin() as conn:
+            return func(conn, *args)
+    except partitions.PartitionError as exc:
+        raise click.ClickException(str(exc))
+
+
+@partitions_cli.command('enable')
+def enable_partitions():
+    """Ubah tabel payroll menjadi tabel berpartisi per tahun."""
+    if _run(partitions.enable_partitioning):
+        click.echo("Tabel payroll sekarang dipartisi per tahun.")
+    else:
+        click.echo("Tabel payroll sudah dipartisi.")
+
+
+@partitions_cli.command('disable')
+def disable_partitions():
+    """Kembalikan payroll menjadi tabel biasa."""
+    if _run(partitions.disable_partitioning):
+        click.echo("Tabel payroll dikembalikan menjadi tabel biasa.")
+    else:
+        click.echo("Tabel payroll tidak dipartisi.")
+
+
+@partitions_cli.command('ensure')
+@click.option('--years-ahead', default=partitions.DEFAULT_YEARS_AHEAD, show_default=True,
+              help="Jumlah tahun ke depan yang disiapkan.")
+@click.option('--from-year', type=int, help="Tahun awal (default: tahun berjalan).")
+def ensure_partitions(years_ahead, from_year):
+    """Buat partisi yang belum ada (jalankan terjadwal, mis. bulanan)."""
+    created = _run(partitions.ensure_partitions, years_ahead, from_year)
+    if created:
+        click.echo("Partisi dibuat: " + ", ".join(partitions.partition_name(y) for y in created))
+    else:
+        click.echo("Semua partisi sudah tersedia.")
+
+
+@partitions_cli.command('list')
+def list_partitions():
+    """Tampilkan partisi payroll yang terpasang."""
+    if not _run(partitions.is_partitioned):
+        click.echo("Tabel payroll tidak dipartisi.")
+        return
+    for item in _run(partitions.list_partitions):
+        click.echo(f"{item['name']:<16} {item['bounds']:<56} {item['tablespace']:<16} ~{item['rows']} baris")
+
+
+@partitions_cli.command('archive')
+@click.argument('year', type=int)
+@click.option('--tablespace', required=True, help="Tablespace tujuan (storage murah).")
+def archive_partition(year, tablespace):
+    """Pindahkan partisi YEAR ke tablespace lain (tetap bisa di-query)."""
+    _run(partitions.archive_partition, year, tablespace)
+    click.echo(f"{partitions.partition_name(year)} dipindah ke tablespace {tablespace}.")
+
+
+@partitions_cli.command('detach')
+@click.argument('year', type=int)
+@click.confirmation_option(prompt="Payroll tahun tsb tidak akan tampil lagi di aplikasi. Lanjutkan?")
+def detach_partition(year):
+    """Lepas partisi YEAR dari payroll menjadi tabel mandiri."""
+    moved = _run(partitions.detach_partition, year)
+    click.echo(f"{partitions.partition_name(year)} dilepas; {moved} baris payroll_loan "
+               f"dipindah ke {partitions.LOAN_ARCHIVE_TABLE}.")
+
+
+@loans_cli.command('reconcile')
+@click.option('--dry-run', is_flag=True, help="Hanya laporkan pinjaman yang menyimpang.")
+def reconcile_loans(dry_run):
+    """Hitung ulang paid_amount/pending_amount pinjaman dari tabel payment."""
+    loan_ids = reconcile_loan_totals(dry_run=dry_run)
+    if dry_run:
+        db.session.rollback()
+    else:
+        db.session.commit()
+    if not loan_ids:
+        click.echo("Semua total pinjaman sudah sesuai.")
+        return
+    verb = "menyimpang" if dry_run else "diperbaiki"
+    click.echo(f"{len(loan_ids)} pinjaman {verb}: " + ", ".join(str(i) for i in loan_ids))
+
+
+@analytics_cli.command('snapshot')
+@click.option('--out', type=click.Path(file_okay=False), help="Direktori snapshot (default ANALYTICS_SNAPSHOT_DIR).")
+@click.option('--retention', type=int, help="Jumlah snapshot yang disimpan (default ANALYTICS_SNAPSHOT_RETENTION).")
+def analytics_snapshot(out, retention):
+    """Tulis snapshot Parquet seluruh fakta (jalankan terjadwal, mis. harian)."""
+    path = analytics_export.write_snapshot(out, retention)
+    click.echo(f"Snapshot ditulis ke {path}")
+
+
+@analytics_cli.command('export')
+@click.argument('out', type=click.Path(file_okay=False))
+@click.option('--pay-period', help="Batasi ke satu periode YYYY-MM.")
+def analytics_export_cmd(out, pay_period):
+    """Tulis dataset Parquet berpartisi pay_period ke direktori OUT."""
+    try:
+        counts = analytics_export.write_facts(out, pay_period)
+    except ValueError as exc:
+        raise click.ClickException(str(exc))
+    for fact, periods in counts.items():
+        click.echo(f"{fact:<9} {sum(periods.values())} baris, {len(periods)} periode")
+
+
+@data_cli.command('generate')
+@click.option('--employees', default=1000, show_default=True, help="Jumlah karyawan.")
+@click.option('--months', default=12, show_default=True, help="Jumlah periode payroll per karyawan.")
+@click.option('--seed', default=0, show_default=True, help="Seed acak (data deterministik per seed).")
+@click.option('--end-period', help="Periode terakhir YYYY-MM (default: bulan berjalan).")
+@click.option('--loan-ratio', default=0.3, show_default=True, help="Porsi karyawan yang punya pinjaman.")
+@click.option('--chunk-size', default=synthetic.DEFAULT_CHUNK_SIZE, show_default=True,
+              help="Baris per batch COPY/insert.")
+def generate_data(employees, months, seed, end_period, loan_ratio, chunk_size):
+    """Bangkitkan karyawan, payroll, pinjaman, pembayaran, dan audit log sintetis."""
+    end = parse_period_to_date(end_period) if end_period else None
+    if end_period and end is None:
+        raise click.BadParameter("format YYYY-MM", param_hint='--end-period')
+    started = time.perf_counter()
+    try:
+        with db.engine.begin() as conn:
+            counts = synthetic.generate(conn, employees, months, seed=seed, end_period=end,
+                                        loan_ratio=loan_ratio, chunk_size=chunk_size,
+                                        progress=lambda n: click.echo(f"  {n} karyawan...", err=True))
+    except (ValueError, partitions.PartitionError) as exc:
+        raise click.ClickException(str(exc))
+    for table, count in counts.items():
+        if count:
+            click.echo(f"{table:<24} {count:>10} baris")
+    click.echo(f"Selesai dalam {time.perf_counter() - started:.1f} dtk.")
+
+
+def _sqlite_engine():
+    if db.engine.dialect.name != "sqlite" or not sqlite_file_url(db.engine.url):
+        raise click.ClickException("Database utama bukan file SQLite.")
+    return db.engine
+
+
+@sqlite_cli.command('optimize')
+def sqlite_optimize():
+    """PRAGMA optimize, incremental_vacuum, dan checkpoint WAL (juga dijalankan worker otomatis)."""
+    result = run_sqlite_maintenance(_sqlite_engine())
+    click.echo(f"Halaman bebas: {result['freelist_before']} -> {result['freelist_after']}")
+    if "wal_checkpoint" in result:
+        click.echo(f"Checkpoint WAL: {result['wal_checkpoint']['checkpointed']} frame")
+
+
+@sqlite_cli.command('vacuum')
+def sqlite_vacuum():
+    """VACUUM penuh dan aktifkan auto_vacuum=INCREMENTAL (perlu sekali untuk file lama)."""
+    engine = _sqlite_engine()
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.exec_driver_sql("VACUUM")
+        mode = conn.exec_driver_sql("PRAGMA auto_vacuum").scalar()
+    click.echo(f"VACUUM selesai; auto_vacuum={mode} (2 = incremental).")
+
+
+def register_cli(app):
+    app.cli.add_command(partitions_cli)
+    app.cli.add_command(loans_cli)
+    app.cli.add_command(analytics_cli)
+    app.cli.add_command(data_cli)
+    app.cli.add_command(sqlite_cli)
@@ -0,0 +1,186 @@
+"""Konfigurasi aplikasi dari environment (.env dibaca oleh create_app)."""
+import os
+
+import sqlalchemy as sa
+
+from payroll.database import InstrumentedQueuePool, sqlite_file_url
+from payroll.extensions import REPLICA_BIND_KEY
+
+
+BASE_DIR = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+
+
+def normalize_database_url(url):
+    if url.startswith("postgres://"):
+        url = "postgresql://" + url[len("postgres://"):]
+    return url
+
+
+def get_database_uri():
+    url = os.getenv("DATABASE_URL") or os.getenv("SQLALCHEMY_DATABASE_URI")
+    if url:
+        return normalize_database_url(url)
+    return "sqlite:///" + os.path.join(BASE_DIR, "payroll.db")
+
+
+def get_replica_uri():
+    url = os.getenv("DATABASE_REPLICA_URL")
+    return normalize_database_url(url) if url else None
+
+
+def build_session_params(url):
+    """Parameter sesi Postgres dari env: DB_SEARCH_PATH dan DB_STATEMENT_TIMEOUT_MS."""
+    if sa.engine.make_url(url).get_backend_name() != "postgresql":
+        return {}
+    params = {}
+    search_path = os.getenv("DB_SEARCH_PATH")
+    if search_path:
+        params["search_path"] = search_path
+    statement_timeout = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+    if statement_timeout > 0:
+        params["statement_timeout"] = str(statement_timeout)
+    return params
+
+
+def pgbouncer_enabled():
+    return os.getenv("DB_PGBOUNCER") == "1"
+
+
+def parse_bank_file_formats(value):
+    """'BCA:fixed,MANDIRI:delimited' -> {'BCA': 'fixed', 'MANDIRI': 'delimited'}."""
+    mapping = {}
+    for item in (value or "").split(","):
+        bank, sep, fmt = item.partition(":")
+        if sep and bank.strip() and fmt.strip():
+            mapping[bank.strip().upper()] = fmt.strip().lower()
+    return mapping
+
+
+def build_sqlite_pragmas():
+    """
+    PRAGMA yang dijalankan di setiap koneksi baru ke file SQLite (mode performa).
+    WAL membuat pembaca tidak memblokir penulis (thread backup vs request web);
+    synchronous=NORMAL aman dengan WAL (hanya transaksi terakhir yang bisa hilang
+    saat listrik mati, file tidak korup). SQLITE_PERFORMANCE_MODE=0 = pragma bawaan.
+    """
+    if os.getenv("SQLITE_PERFORMANCE_MODE", "1") != "1":
+        return {}
+    return {
+        # busy_timeout duluan agar penggantian journal_mode ikut menunggu lock
+        "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+        # auto_vacuum hanya berlaku untuk file baru dan harus sebelum journal_mode
+        # (WAL langsung menulis header file); file lama: `flask sqlite vacuum`
+        "auto_vacuum": "INCREMENTAL",
+        "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+        "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+        "foreign_keys": "ON" if os.getenv("SQLITE_FOREIGN_KEYS", "1") == "1" else "OFF",
+        # nilai negatif = KiB (default 64 MiB per koneksi)
+        "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-65536")),
+        "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+        "temp_store": "MEMORY",
+    }
+
+
+def build_engine_options(url):
+    """
+    Susun SQLALCHEMY_ENGINE_OPTIONS dari env:
+    - DB_POOL_SIZE (5), DB_MAX_OVERFLOW (10), DB_POOL_TIMEOUT detik (30),
+      DB_POOL_RECYCLE detik (1800), DB_POOL_PRE_PING (1)
+    - parameter sesi Postgres (lihat build_session_params) dikirim saat connect
+    - DB_PGBOUNCER=1 untuk PgBouncer mode transaction pooling: parameter sesi
+      tidak dikirim saat connect (ditolak PgBouncer / hilang antar transaksi),
+      tapi di-SET LOCAL tiap awal transaksi (database.apply_session_params); prepared
+      statement server-side dimatikan untuk driver psycopg3.
+    """
+    parsed = sa.engine.make_url(url)
+    options = {}
+
+    if parsed.get_backend_name() != "sqlite" or sqlite_file_url(url):
+        options.update({
+            "poolclass": InstrumentedQueuePool,
+            "pool_size": max(1, int(os.getenv("DB_POOL_SIZE", "5"))),
+            "max_overflow": max(0, int(os.getenv("DB_MAX_OVERFLOW", "10"))),
+            "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+            "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+            "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "1") == "1",
+        })
+
+    if parsed.get_backend_name() != "postgresql":
+        return options
+
+    connect_args = {}
+    session_params = build_session_params(url)
+    if pgbouncer_enabled():
+        if parsed.get_driver_name() == "psycopg":
+            connect_args["prepare_threshold"] = None
+    elif session_params:
+        connect_args["options"] = " ".join(
+            f"-c{key}={value}" for key, value in session_params.items()
+        )
+    if connect_args:
+        options["connect_args"] = connect_args
+    return options
+
+
+def load_config(app, overrides=None):
+    """Isi app.config dari env; `overrides` (dict) dipakai test/skrip."""
+    app.secret_key = "secretkey123"  # Ganti dengan yang lebih aman
+
+    db_url = get_database_uri()
+    app.config['SQLALCHEMY_DATABASE_URI'] = db_url
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = build_engine_options(db_url)
+    app.config['DB_PGBOUNCER'] = pgbouncer_enabled()
+    app.config['DB_SESSION_PARAMS'] = build_session_params(db_url) if pgbouncer_enabled() else {}
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+
+    # --- Read replica (opsional) ---
+    app.config['REPLICA_MAX_LAG_SECONDS'] = float(os.getenv("DATABASE_REPLICA_MAX_LAG_SECONDS", "5"))
+    app.config['REPLICA_HEALTH_TTL_SECONDS'] = float(os.getenv("DATABASE_REPLICA_HEALTH_TTL_SECONDS", "10"))
+    replica_url = get_replica_uri()
+    if replica_url:
+        app.config['SQLALCHEMY_BINDS'] = {
+            REPLICA_BIND_KEY: {"url": replica_url, **build_engine_options(replica_url)},
+        }
+
+    # PRAGMA SQLite (hanya untuk database file) dan pemeliharaan berkala oleh worker latar
+    app.config['SQLITE_PRAGMAS'] = build_sqlite_pragmas()
+    # PRAGMA optimize + incremental_vacuum + checkpoint WAL tiap N jam; 0 = nonaktif
+    app.config['SQLITE_MAINTENANCE_INTERVAL_HOURS'] = float(os.getenv("SQLITE_MAINTENANCE_INTERVAL_HOURS", "24"))
+
+    # statistik query per request (header Server-Timing, log & tabel query lambat di /admin/server_status)
+    app.config['SQL_INSTRUMENTATION'] = os.getenv("SQL_INSTRUMENTATION", "1") == "1"
+    # query >= batas ini (ms) dicatat sebagai query lambat; -1 = nonaktif
+    app.config['SQL_SLOW_QUERY_MS'] = float(os.getenv("SQL_SLOW_QUERY_MS", "200"))
+    app.config['SQL_SLOW_QUERY_TOP'] = int(os.getenv("SQL_SLOW_QUERY_TOP", "20"))
+    # peringatan di log jika satu request menjalankan query sebanyak ini atau lebih; 0 = nonaktif
+    app.config['SQL_QUERY_COUNT_WARN'] = int(os.getenv("SQL_QUERY_COUNT_WARN", "100"))
+
+    # profiler on-demand admin (?_profile=1|sample), lihat payroll/profiling.py; opt-in
+    app.config['PROFILER_ENABLED'] = os.getenv("PROFILER_ENABLED", "0") == "1"
+    app.config['PROFILE_DIR'] = os.getenv("PROFILE_DIR", os.path.join(BASE_DIR, "profiles"))
+    app.config['PROFILE_KEEP'] = int(os.getenv("PROFILE_KEEP", "50"))
+    app.config['PROFILE_SAMPLE_INTERVAL_MS'] = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "5"))
+
+    # umur maksimum snapshot kompensasi per periode (detik) di tiap worker
+    app.config['COMPENSATION_CACHE_TTL_SECONDS'] = float(os.getenv("COMPENSATION_CACHE_TTL_SECONDS", "300"))
+    # umur maksimum ringkasan pinjaman per karyawan (dashboard karyawan) di tiap worker
+    app.config['EMPLOYEE_SUMMARY_CACHE_TTL_SECONDS'] = float(os.getenv("EMPLOYEE_SUMMARY_CACHE_TTL_SECONDS", "60"))
+
+    # file transfer massal per bank (lihat services/bank_files.py)
+    app.config['BANK_FILE_FORMATS'] = parse_bank_file_formats(os.getenv("BANK_FILE_FORMATS"))
+    app.config['BANK_FILE_DEFAULT_FORMAT'] = os.getenv("BANK_FILE_DEFAULT_FORMAT", "csv")
+    app.config['BANK_FILE_COMPANY_CODE'] = os.getenv("BANK_FILE_COMPANY_CODE", "PAYROLL")
+
+    # snapshot Parquet fakta payroll/pinjaman/pembayaran (lihat services/analytics_export.py)
+    app.config['ANALYTICS_SNAPSHOT_DIR'] = os.getenv("ANALYTICS_SNAPSHOT_DIR", os.path.join(BASE_DIR, "analytics"))
+    app.config['ANALYTICS_SNAPSHOT_RETENTION'] = int(os.getenv("ANALYTICS_SNAPSHOT_RETENTION", "7"))
+    # 0 = tanpa snapshot otomatis (tetap bisa `flask analytics snapshot` dari cron)
+    app.config['ANALYTICS_SNAPSHOT_INTERVAL_HOURS'] = float(os.getenv("ANALYTICS_SNAPSHOT_INTERVAL_HOURS", "0"))
+    # snapshot tren (/dashboard/trends) diperbarui di latar setiap payroll di-approve
+    app.config['TRENDS_REFRESH_ON_APPROVE'] = os.getenv("TRENDS_REFRESH_ON_APPROVE", "1") == "1"
+
+    app.config['UPLOAD_FOLDER'] = os.path.join(BASE_DIR, 'static/uploads')
+    app.config['AUTO_BACKUP_WORKER'] = True
+
+    if overrides:
+        app.config.update(overrides)
@@ -0,0 +1,407 @@
+"""Pool koneksi terinstrumentasi, statistik query per request, parameter sesi Postgres,
+PRAGMA/pemeliharaan SQLite, dan routing read replica."""
+import contextlib
+import functools
+import logging
+import threading
+import time
+
+import sqlalchemy as sa
+from flask import current_app, g, has_request_context, request, session
+from sqlalchemy.pool import QueuePool
+
+from payroll.extensions import db, RoutingSession, REPLICA_BIND_KEY
+from payroll.utils import utcnow
+
+
+pool_stats_lock = threading.Lock()
+pool_stats = {
+    "checkouts": 0,
+    "timeouts": 0,
+    "wait_total": 0.0,
+    "wait_max": 0.0,
+}
+
+sql_stats_lock = threading.Lock()
+slow_queries = {}   # (route, statement) -> statistik query lambat
+route_query_stats = {}   # route -> jumlah request/query/waktu DB
+SLOW_QUERY_KEEP = 200   # entri yang disimpan sebelum dipangkas ke yang paling lambat
+STATEMENT_PREVIEW = 500
+UNMATCHED_ROUTE = "<unmatched>"
+
+sql_logger = logging.getLogger("payroll.sql")
+
+sqlite_maintenance_lock = threading.Lock()
+sqlite_maintenance_state = {"last_run": None, "last_result": None}
+
+replica_health_lock = threading.Lock()
+replica_health = {"checked_at": 0.0, "ok": False, "lag": None, "error": None}
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool yang mencatat lama menunggu koneksi (checkout) dari pool."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except sa.exc.TimeoutError:
+            with pool_stats_lock:
+                pool_stats["timeouts"] += 1
+            raise
+        waited = time.perf_counter() - started
+        with pool_stats_lock:
+            pool_stats["checkouts"] += 1
+            pool_stats["wait_total"] += waited
+            pool_stats["wait_max"] = max(pool_stats["wait_max"], waited)
+        return conn
+
+
+def get_pool_stats():
+    pool = db.engine.pool
+    with pool_stats_lock:
+        stats = dict(pool_stats)
+    checkouts = stats["checkouts"]
+    return {
+        "pool_class": type(pool).__name__,
+        "size": pool.size() if hasattr(pool, "size") else None,
+        "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else None,
+        "checked_in": pool.checkedin() if hasattr(pool, "checkedin") else None,
+        # overflow() negatif berarti slot pool_size belum terpakai semua
+        "overflow": max(pool.overflow(), 0) if hasattr(pool, "overflow") else None,
+        "max_overflow": getattr(pool, "_max_overflow", None),
+        "checkouts": checkouts,
+        "timeouts": stats["timeouts"],
+        "wait_avg_ms": (stats["wait_total"] / checkouts * 1000) if checkouts else 0.0,
+        "wait_max_ms": stats["wait_max"] * 1000,
+        "pgbouncer": current_app.config.get('DB_PGBOUNCER', False),
+    }
+
+
+def current_route():
+    if not has_request_context():
+        return "(latar)"
+    # URL tanpa rule (404) digabung satu kunci agar path acak tidak menumpuk di statistik
+    rule = request.url_rule.rule if request.url_rule else UNMATCHED_ROUTE
+    return f"{request.method} {rule}"
+
+
+def parameter_shape(parameters, executemany=False):
+    """Bentuk parameter tanpa nilainya (bisa berisi data pribadi): '{a, b}', '(3 param)', '250 x {a}'."""
+    if executemany and isinstance(parameters, (list, tuple)):
+        first = parameter_shape(parameters[0]) if parameters else "-"
+        return f"{len(parameters)} x {first}"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(sorted(str(key) for key in parameters)) + "}" if parameters else "-"
+    if isinstance(parameters, (list, tuple)):
+        return f"({len(parameters)} param)" if parameters else "-"
+    return "-"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(app, conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started"].pop()
+    elapsed = time.perf_counter() - started
+    if has_request_context():
+        g.sql_count = g.get("sql_count", 0) + 1
+        g.sql_time = g.get("sql_time", 0.0) + elapsed
+
+    threshold_ms = app.config['SQL_SLOW_QUERY_MS']
+    elapsed_ms = elapsed * 1000
+    if threshold_ms < 0 or elapsed_ms < threshold_ms:
+        return
+    route = current_route()
+    shape = parameter_shape(parameters, executemany)
+    sql_logger.warning("Query lambat %.1f ms di %s: %s | parameter %s",
+                       elapsed_ms, route, " ".join(statement.split())[:STATEMENT_PREVIEW], shape)
+    key = (route, statement)
+    with sql_stats_lock:
+        entry = slow_queries.get(key)
+        if entry is None:
+            entry = slow_queries[key] = {"route": route, "statement": statement, "count": 0,
+                                         "total_ms": 0.0, "max_ms": 0.0}
+        entry["count"] += 1
+        entry["total_ms"] += elapsed_ms
+        entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+        entry["params"] = shape
+        entry["last_at"] = utcnow()
+        if len(slow_queries) > SLOW_QUERY_KEEP:
+            keep = sorted(slow_queries.items(), key=lambda item: item[1]["max_ms"], reverse=True)
+            slow_queries.clear()
+            slow_queries.update(keep[:SLOW_QUERY_KEEP // 2])
+
+
+def _discard_query_timer(exception_context):
+    # query gagal: after_cursor_execute tidak dipanggil, buang waktu mulainya
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_started"):
+        conn.info["query_started"].pop()
+
+
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    g.sql_count = 0
+    g.sql_time = 0.0
+
+
+def record_request_stats(response):
+    """Header Server-Timing (db + app) dan akumulasi jumlah query per route."""
+    started = g.get("request_started")
+    if started is None:
+        return response
+    total_ms = (time.perf_counter() - started) * 1000
+    count, db_ms = g.get("sql_count", 0), g.get("sql_time", 0.0) * 1000
+    response.headers.add("Server-Timing", f'db;dur={db_ms:.2f};desc="{count} query"')
+    response.headers.add("Server-Timing", f"app;dur={total_ms:.2f}")
+
+    route = current_route()
+    warn_at = current_app.config['SQL_QUERY_COUNT_WARN']
+    if warn_at and count >= warn_at:
+        sql_logger.warning("%s menjalankan %d query (%.1f ms di database).", route, count, db_ms)
+    with sql_stats_lock:
+        stats = route_query_stats.setdefault(route, {"route": route, "requests": 0, "queries": 0,
+                                                      "max_queries": 0, "db_ms": 0.0})
+        stats["requests"] += 1
+        stats["queries"] += count
+        stats["max_queries"] = max(stats["max_queries"], count)
+        stats["db_ms"] += db_ms
+    return response
+
+
+def get_sql_stats(limit=None):
+    """Top-N query lambat (menurut waktu maks) dan route dengan rata-rata query terbanyak."""
+    limit = limit or current_app.config['SQL_SLOW_QUERY_TOP']
+    with sql_stats_lock:
+        slow = [dict(entry) for entry in slow_queries.values()]
+        routes = [dict(stats) for stats in route_query_stats.values()]
+    slow.sort(key=lambda entry: entry["max_ms"], reverse=True)
+    for entry in slow:
+        entry["avg_ms"] = entry["total_ms"] / entry["count"]
+    for stats in routes:
+        stats["avg_queries"] = stats["queries"] / stats["requests"]
+        stats["avg_db_ms"] = stats["db_ms"] / stats["requests"]
+    routes.sort(key=lambda stats: stats["avg_queries"], reverse=True)
+    return {"slow_queries": slow[:limit], "routes": routes[:limit],
+            "threshold_ms": current_app.config['SQL_SLOW_QUERY_MS']}
+
+
+def reset_sql_stats():
+    with sql_stats_lock:
+        slow_queries.clear()
+        route_query_stats.clear()
+
+
+def instrument_engine(app, engine):
+    sa.event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    sa.event.listen(engine, "after_cursor_execute", functools.partial(_after_cursor_execute, app))
+    sa.event.listen(engine, "handle_error", _discard_query_timer)
+
+
+def apply_session_params(params, conn):
+    # Mode PgBouncer: parameter sesi hanya berlaku di dalam transaksi berjalan.
+    for key, value in params.items():
+        conn.exec_driver_sql("SELECT set_config(%(key)s, %(value)s, true)", {"key": key, "value": value})
+
+
+def sqlite_file_url(url):
+    """True untuk SQLite berbasis file (bukan in-memory)."""
+    parsed = sa.engine.make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database not in (None, "", ":memory:")
+
+
+def apply_sqlite_pragmas(pragmas, dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        for key, value in pragmas.items():
+            cursor.execute(f"PRAGMA {key}={value}")
+    finally:
+        cursor.close()
+
+
+def sqlite_pragma_status(engine):
+    """Nilai PRAGMA yang sedang berlaku (untuk /admin/server_status)."""
+    names = ("journal_mode", "synchronous", "foreign_keys", "busy_timeout", "cache_size", "mmap_size", "auto_vacuum")
+    with engine.connect() as conn:
+        return {name: conn.exec_driver_sql(f"PRAGMA {name}").scalar() for name in names}
+
+
+def run_sqlite_maintenance(engine):
+    """
+    PRAGMA optimize (statistik planner), incremental_vacuum (bila auto_vacuum=INCREMENTAL)
+    dan checkpoint WAL agar file -wal tidak terus membesar. Return ringkasan.
+    """
+    result = {}
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA optimize")
+        result["freelist_before"] = conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+        if conn.exec_driver_sql("PRAGMA auto_vacuum").scalar() == 2:
+            # lewat executescript: sqlite3.execute hanya menjalankan satu langkah (= satu halaman)
+            conn.connection.driver_connection.executescript("PRAGMA incremental_vacuum")
+        result["freelist_after"] = conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+        if conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal":
+            busy, log_frames, checkpointed = conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)").one()
+            result["wal_checkpoint"] = {"busy": busy, "log": log_frames, "checkpointed": checkpointed}
+        conn.commit()
+    return result
+
+
+def run_scheduled_sqlite_maintenance(app):
+    """Dipanggil worker otomatis: pemeliharaan SQLite tiap SQLITE_MAINTENANCE_INTERVAL_HOURS."""
+    hours = app.config.get('SQLITE_MAINTENANCE_INTERVAL_HOURS', 0)
+    if hours <= 0 or not sqlite_maintenance_lock.acquire(blocking=False):
+        return None
+    try:
+        last_run = sqlite_maintenance_state["last_run"]
+        if last_run is not None and time.monotonic() - last_run < hours * 3600:
+            return None
+        with app.app_context():
+            engines = [engine for engine in db.engines.values()
+                       if engine.dialect.name == "sqlite" and sqlite_file_url(engine.url)]
+            results = {str(engine.url.database): run_sqlite_maintenance(engine) for engine in engines}
+        sqlite_maintenance_state.update(last_run=time.monotonic(), last_result=results)
+        return results
+    finally:
+        sqlite_maintenance_lock.release()
+
+
+def check_replica_health(force=False):
+    """
+    Cek (dengan cache REPLICA_HEALTH_TTL_SECONDS) apakah replica bisa dipakai:
+    koneksi hidup dan lag replikasi <= REPLICA_MAX_LAG_SECONDS.
+    Lag hanya bisa diukur di Postgres (pg_last_xact_replay_timestamp);
+    backend lain (mis. dua file SQLite) dianggap tanpa lag.
+    """
+    engine = db.engines.get(REPLICA_BIND_KEY)
+    if engine is None:
+        return dict(replica_health, ok=False, error="Replica tidak dikonfigurasi.")
+
+    now = time.monotonic()
+    with replica_health_lock:
+        if not force and now - replica_health["checked_at"] < current_app.config['REPLICA_HEALTH_TTL_SECONDS']:
+            return dict(replica_health)
+
+    ok, lag, error = False, None, None
+    try:
+        with engine.connect() as conn:
+            if engine.dialect.name == "postgresql":
+                lag = conn.execute(sa.text(
+                    "SELECT CASE WHEN pg_is_in_recovery() "
+                    "THEN COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) "
+                    "ELSE 0 END"
+                )).scalar()
+                lag = float(lag or 0)
+            else:
+                conn.execute(sa.text("SELECT 1"))
+                lag = 0.0
+        max_lag = current_app.config['REPLICA_MAX_LAG_SECONDS']
+        ok = lag <= max_lag
+        if not ok:
+            error = f"Lag replica {lag:.1f} detik melebihi batas {max_lag:.1f} detik."
+    except Exception as exc:
+        error = str(exc)
+
+    with replica_health_lock:
+        replica_health.update(checked_at=now, ok=ok, lag=lag, error=error)
+        return dict(replica_health)
+
+
+def mark_replica_down(error):
+    with replica_health_lock:
+        replica_health.update(checked_at=time.monotonic(), ok=False, error=str(error))
+
+
+def recently_wrote():
+    # Read-your-writes: user yang baru menulis tetap dibaca dari primary.
+    if not has_request_context():
+        return False
+    last_write = session.get('db_last_write')
+    return bool(last_write) and time.time() - last_write < current_app.config['REPLICA_MAX_LAG_SECONDS']
+
+
+@contextlib.contextmanager
+def read_from_replica():
+    """
+    Query baca di dalam blok diarahkan ke replica bila sehat, selain itu tetap
+    ke primary. Nilai yang di-yield menandakan apakah replica dipakai.
+    """
+    previous = g.get('db_route')
+    active = not recently_wrote() and check_replica_health()["ok"]
+    if active:
+        # transaksi baca sebelumnya (jika ada) ditutup agar tidak tercampur
+        db.session.rollback()
+        g.db_route = REPLICA_BIND_KEY
+    try:
+        yield active
+    finally:
+        if active:
+            db.session.rollback()
+        g.db_route = previous
+
+
+def replica_route(view):
+    """
+    Dekorator untuk route baca-saja (laporan/ekspor/dashboard). Jika replica
+    gagal di tengah request, replica ditandai down dan view diulang di primary.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        with read_from_replica() as routed:
+            if not routed:
+                return view(*args, **kwargs)
+            try:
+                return view(*args, **kwargs)
+            except (sa.exc.OperationalError, sa.exc.InterfaceError) as exc:
+                current_app.logger.warning("Replica gagal, fallback ke primary: %s", exc)
+                mark_replica_down(exc)
+        db.session.rollback()
+        return view(*args, **kwargs)
+    return wrapper
+
+
+@sa.event.listens_for(RoutingSession, "after_flush")
+def track_flush_write(db_session, flush_context):
+    if has_request_context():
+        g.db_wrote = True
+
+
+@sa.event.listens_for(RoutingSession, "do_orm_execute")
+def track_bulk_write(orm_execute_state):
+    if (orm_execute_state.is_update or orm_execute_state.is_delete) and has_request_context():
+        g.db_wrote = True
+
+
+def remember_last_write(response):
+    if g.get('db_wrote') and replica_configured():
+        session['db_last_write'] = time.time()
+    return response
+
+
+def replica_configured():
+    return REPLICA_BIND_KEY in current_app.config.get('SQLALCHEMY_BINDS', {})
+
+
+def init_database(app):
+    """Pasang listener engine (statistik query, PRAGMA SQLite, parameter sesi PgBouncer) dan hook routing replica."""
+    app.after_request(remember_last_write)
+    pragmas = app.config.get('SQLITE_PRAGMAS')
+    if pragmas:
+        with app.app_context():
+            for engine in db.engines.values():
+                if engine.dialect.name == "sqlite" and sqlite_file_url(engine.url):
+                    sa.event.listen(engine, "connect", functools.partial(apply_sqlite_pragmas, pragmas))
+    if app.config['SQL_INSTRUMENTATION']:
+        app.before_request(start_request_timer)
+        app.after_request(record_request_stats)
+        with app.app_context():
+            for engine in db.engines.values():
+                instrument_engine(app, engine)
+    params = app.config.get('DB_SESSION_PARAMS')
+    if not params:
+        return
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.name == "postgresql":
+                sa.event.listen(engine, "begin", functools.partial(apply_session_params, params))
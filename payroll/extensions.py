@@ -0,0 +1,27 @@
+"""Instance ekstensi Flask (db, migrate) yang di-init oleh create_app()."""
+from flask import g, has_app_context
+from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session as FlaskSQLAlchemySession
+
+
+REPLICA_BIND_KEY = "replica"
+
+
+class RoutingSession(FlaskSQLAlchemySession):
+    """
+    Session yang mengarahkan query baca ke read replica bila konteks aktif
+    meminta (lihat read_from_replica). Flush/tulis selalu ke primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None
+                and not self._flushing
+                and has_app_context()
+                and g.get('db_route') == REPLICA_BIND_KEY):
+            engine = self._db.engines.get(REPLICA_BIND_KEY)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
@@ -0,0 +1,395 @@
+"""Model database."""
+from datetime import date, datetime, timezone
+
+import sqlalchemy as sa
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import object_session, validates
+from sqlalchemy.orm.util import identity_key
+
+from payroll.extensions import db, RoutingSession
+from payroll.utils import utcnow, parse_period_to_date
+
+
+class User(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    fullname = db.Column(db.String(100), nullable=False)
+    email = db.Column(db.String(120), unique=True, nullable=False)
+    password = db.Column(db.String(200), nullable=False)
+    role = db.Column(db.String(50), default='user')  # misal 'admin' atau 'user'
+
+
+class BackupSettings(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    enabled = db.Column(db.Boolean, nullable=False, default=False)
+    interval_hours = db.Column(db.Integer, nullable=False, default=24)
+    retention_count = db.Column(db.Integer, nullable=False, default=7)
+    next_run_at = db.Column(db.DateTime, nullable=True)
+    last_run_at = db.Column(db.DateTime, nullable=True)
+    last_status = db.Column(db.String(20), nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+    last_backup_file = db.Column(db.String(255), nullable=True)
+
+
+class CacheVersion(db.Model):
+    # versi cache bersama antar worker; lihat payroll/services/cache_versions.py
+    __tablename__ = 'cache_version'
+    name = db.Column(db.String(100), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=True)
+
+
+class Employee(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, nullable=True)
+    nik = db.Column(db.String(20), unique=True, nullable=False)
+    name = db.Column(db.String(100), nullable=False)
+    position = db.Column(db.String(100), nullable=True)
+
+    # Informasi tambahan
+    address = db.Column(db.String(255), nullable=True)
+    phone = db.Column(db.String(50), nullable=True)
+
+    # ⬇⬇ Tambahkan baris ini ⬇⬇
+    no_rek = db.Column(db.String(50), nullable=True)  # Nomor rekening karyawan
+    bank_name = db.Column(db.String(100), nullable=True)  # Nama bank
+
+    hire_date = db.Column(db.Date, nullable=True)
+    photo = db.Column(db.String(255), nullable=True)
+    status = db.Column(db.String(20), default='active')  # active/inactive
+
+    # urutan keyset direktori karyawan (/api/employees)
+    __table_args__ = (db.Index('ix_employee_name_id', 'name', 'id'),)
+
+
+# Rumus kolom tersimpan payroll (GENERATED ALWAYS AS ... STORED); sama dengan
+# hybrid take_home_pay/total_deductions di bawah.
+PAYROLL_TOTAL_DEDUCTIONS_SQL = (
+    "potongan_gaji + hutang + alpha * (gaji_pokok / 30.0) + loan_deduction"
+    " + bpjs_ketenagakerjaan + bpjs_kesehatan + pph21"
+)
+PAYROLL_TAKE_HOME_PAY_SQL = (
+    "gaji_pokok + tunjangan_makan + tunjangan_transport + tunjangan_lainnya + upah_lembur + thr"
+    f" - ({PAYROLL_TOTAL_DEDUCTIONS_SQL})"
+)
+
+
+class Payroll(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    employee_id = db.Column(db.Integer, db.ForeignKey('employee.id'), nullable=False)
+    pay_period = db.Column(db.String(7), nullable=True)
+    # tanggal 1 dari pay_period; diisi otomatis (lihat _sync_period_start) untuk filter rentang ber-indeks
+    period_start = db.Column(db.Date, nullable=True, index=True)
+    gaji_pokok = db.Column(db.Float, default=0)
+    bpjs_ketenagakerjaan = db.Column(db.Float, default=0)
+    bpjs_kesehatan = db.Column(db.Float, default=0)
+    tunjangan_makan = db.Column(db.Float, default=0)
+    tunjangan_transport = db.Column(db.Float, default=0)
+    tunjangan_lainnya = db.Column(db.Float, default=0)
+    potongan_gaji = db.Column(db.Float, default=0)
+    alpha = db.Column(db.Integer, default=0)
+    hutang = db.Column(db.Float, default=0)
+    upah_lembur = db.Column(db.Float, default=0)
+    thr = db.Column(db.Float, default=0)
+    pph21 = db.Column(db.Float, default=0)
+    loan_deduction = db.Column(db.Float, default=0)  # Kolom baru untuk potongan pinjaman
+    installments = db.relationship('PayrollLoan', backref='payroll', cascade='all, delete-orphan')
+    employee = db.relationship('Employee', backref=db.backref('payrolls', lazy=True))
+    status = db.Column(db.String(20), default='draft')  # draft/submitted/approved/rejected
+    approved_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    approved_at = db.Column(db.DateTime, nullable=True)
+    submitted_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    submitted_at = db.Column(db.DateTime, nullable=True)
+    reject_reason = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=utcnow)
+
+    # Dihitung database saat insert/update; dipakai SUM/AVG/ORDER BY lewat hybrid.
+    stored_total_deductions = db.Column('total_deductions', db.Float,
+                                        sa.Computed(PAYROLL_TOTAL_DEDUCTIONS_SQL, persisted=True))
+    stored_take_home_pay = db.Column('take_home_pay', db.Float,
+                                     sa.Computed(PAYROLL_TAKE_HOME_PAY_SQL, persisted=True),
+                                     index=True)
+
+    # Level instance dihitung di Python (nilai selalu sesuai form yang belum di-flush);
+    # level query membaca kolom tersimpan sehingga bisa diindeks dan diurutkan.
+    @hybrid_property
+    def take_home_pay(self):
+        pendapatan = (
+            self.gaji_pokok
+            + self.tunjangan_makan
+            + self.tunjangan_transport
+            + self.tunjangan_lainnya
+            + self.upah_lembur
+            + self.thr
+        )
+        potongan_alpha = self.alpha * (self.gaji_pokok / 30.0)
+        total_potongan = (
+            self.potongan_gaji
+            + self.hutang
+            + potongan_alpha
+            + self.loan_deduction
+            + self.bpjs_ketenagakerjaan
+            + self.bpjs_kesehatan
+            + self.pph21
+        )
+        return pendapatan - total_potongan
+
+    @take_home_pay.expression
+    def take_home_pay(cls):
+        return cls.stored_take_home_pay
+    # ----- TOTAL POTONGAN UNTUK TABEL PAYROLL ----- 
+    
+    @hybrid_property
+    def total_deductions(self):
+            pot_alpha = self.alpha * (self.gaji_pokok / 30.0)
+            return (
+                self.potongan_gaji
+                + self.hutang
+                + pot_alpha
+                + self.loan_deduction
+                + self.bpjs_ketenagakerjaan
+                + self.bpjs_kesehatan
+                + self.pph21
+            )
+
+    @total_deductions.expression
+    def total_deductions(cls):
+        return cls.stored_total_deductions
+
+    @validates('pay_period')
+    def _sync_period_start(self, key, value):
+        self.period_start = parse_period_to_date(value)
+        # salinan periode di payroll_loan dipakai FK komposit saat payroll dipartisi
+        for item in self.installments:
+            item.payroll_period_start = self.period_start
+        return value
+
+    @hybrid_property
+    def pay_period_date(self):
+        return self.period_start or parse_period_to_date(self.pay_period)
+
+    @pay_period_date.expression
+    def pay_period_date(cls):
+        return cls.period_start
+
+    @classmethod
+    def in_period(cls, pay_period):
+        """Filter satu periode (YYYY-MM) lewat period_start agar memakai indeks."""
+        period_start = parse_period_to_date(pay_period)
+        if period_start is None:
+            return cls.pay_period == pay_period
+        return cls.period_start == period_start
+
+    @classmethod
+    def in_year(cls, year):
+        """Filter satu tahun sebagai rentang tanggal (bukan substr pay_period)."""
+        year = int(year)
+        return sa.and_(cls.period_start >= date(year, 1, 1), cls.period_start < date(year + 1, 1, 1))
+
+
+# === MODEL PINJAMAN ===
+class Loan(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    employee_id = db.Column(db.Integer, db.ForeignKey('employee.id'), nullable=False)
+    amount = db.Column(db.Float, nullable=False)  # Pokok pinjaman
+    tenor = db.Column(db.Integer, nullable=False)  # dalam bulan
+    interest_rate = db.Column(db.Float, default=0.0)  # dalam persentase
+    # Perhitungan cicilan: (amount + (amount * interest_rate/100)) / tenor
+    installment = db.Column(db.Float, nullable=False)  
+    status = db.Column(db.String(20), default="pending")  # pending, approved, rejected, completed
+    application_date = db.Column(db.DateTime, default=datetime.now(timezone.utc))
+    approval_date = db.Column(db.DateTime, nullable=True)
+    reason = db.Column(db.Text, nullable=True)
+    
+    # Field baru: jumlah angsuran yang telah dibayar
+    installments_paid = db.Column(db.Integer, default=0)
+
+    # Total berjalan pembayaran (approved + posted) dan pending; diubah atomik oleh
+    # services.loans.set_payment_status/submit_payment, dicek `flask loans reconcile`.
+    paid_amount = db.Column(db.Float, nullable=False, default=0, server_default='0')
+    pending_amount = db.Column(db.Float, nullable=False, default=0, server_default='0')
+
+    @hybrid_property
+    def total_amount(self):
+        return self.amount + (self.amount * (self.interest_rate or 0) / 100)
+
+    @total_amount.expression
+    def total_amount(cls):
+        return cls.amount + (cls.amount * sa.func.coalesce(cls.interest_rate, 0) / 100)
+
+    @hybrid_property
+    def remaining(self):
+        return max(self.total_amount - (self.paid_amount or 0), 0)
+
+    @remaining.expression
+    def remaining(cls):
+        return cls.total_amount - cls.paid_amount
+
+    # ----- TOTAL CICILAN YANG SUDAH DIBAYAR -----
+    @hybrid_property
+    def paid_installment(self):
+        """
+        Jumlah kumulatif pembayaran (approved + posted) yang sudah diterima.
+        Jika belum pernah bayar, kembalikan 0.
+        """
+        return self.paid_amount or 0
+
+    @paid_installment.expression
+    def paid_installment(cls):
+        return cls.paid_amount
+
+    employee = db.relationship('Employee', backref=db.backref('loans', lazy=True))
+
+
+class Payment(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    loan_id = db.Column(db.Integer, db.ForeignKey('loan.id'), nullable=False)
+    payment_date = db.Column(db.DateTime, default=datetime.now(timezone.utc))
+    # active_history: nilai lama selalu dimuat agar total pinjaman bisa dikoreksi saat berubah
+    payment_amount = db.column_property(db.Column(db.Float, nullable=False), active_history=True)
+    status = db.column_property(db.Column(db.String(20), default='pending'),  # status: pending, approved
+                                active_history=True)
+
+    loan = db.relationship('Loan', backref=db.backref('payments', lazy=True, cascade="all, delete-orphan"))
+
+
+# ----- paid_amount / pending_amount pinjaman mengikuti setiap transisi Payment -----
+PAID_PAYMENT_STATUSES = ('approved', 'posted')
+_LOAN_TOTALS_TOUCHED = 'loan_totals_touched'
+
+
+def loan_total_deltas(status, amount, sign=1):
+    """Kontribusi satu payment ke (paid_amount, pending_amount) pinjaman."""
+    amount = (amount or 0) * sign
+    if status in PAID_PAYMENT_STATUSES:
+        return amount, 0.0
+    if status == 'pending':
+        return 0.0, amount
+    return 0.0, 0.0
+
+
+def bump_loan_totals(connection, loan_id, paid=0.0, pending=0.0):
+    """UPDATE loan SET paid_amount = paid_amount + :x, ... (atomik di database)."""
+    if not paid and not pending:
+        return
+    loan = Loan.__table__
+    connection.execute(
+        loan.update()
+        .where(loan.c.id == loan_id)
+        .values(paid_amount=loan.c.paid_amount + paid, pending_amount=loan.c.pending_amount + pending)
+    )
+
+
+def _touch_loan(target, loan_id):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_LOAN_TOTALS_TOUCHED, set()).add(loan_id)
+
+
+@sa.event.listens_for(Payment, 'after_insert')
+def _payment_inserted(mapper, connection, target):
+    bump_loan_totals(connection, target.loan_id, *loan_total_deltas(target.status, target.payment_amount))
+    _touch_loan(target, target.loan_id)
+
+
+def _previous_value(state, key):
+    history = state.attrs[key].history
+    return history.deleted[0] if history.deleted else getattr(state.object, key)
+
+
+@sa.event.listens_for(Payment, 'after_update')
+def _payment_updated(mapper, connection, target):
+    state = sa.inspect(target)
+    if not any(state.attrs[key].history.has_changes() for key in ('status', 'payment_amount', 'loan_id')):
+        return
+    old_loan = _previous_value(state, 'loan_id')
+    old_deltas = loan_total_deltas(_previous_value(state, 'status'), _previous_value(state, 'payment_amount'), sign=-1)
+    bump_loan_totals(connection, old_loan, *old_deltas)
+    bump_loan_totals(connection, target.loan_id, *loan_total_deltas(target.status, target.payment_amount))
+    _touch_loan(target, old_loan)
+    _touch_loan(target, target.loan_id)
+
+
+@sa.event.listens_for(Payment, 'after_delete')
+def _payment_deleted(mapper, connection, target):
+    bump_loan_totals(connection, target.loan_id, *loan_total_deltas(target.status, target.payment_amount, sign=-1))
+    _touch_loan(target, target.loan_id)
+
+
+@sa.event.listens_for(RoutingSession, 'after_flush_postexec')
+def _expire_loan_totals(session, flush_context):
+    # nilai di database sudah berubah lewat UPDATE atomik; muat ulang saat diakses
+    for loan_id in session.info.pop(_LOAN_TOTALS_TOUCHED, ()):
+        loan = session.identity_map.get(identity_key(Loan, loan_id))
+        if loan is not None:
+            session.expire(loan, ['paid_amount', 'pending_amount'])
+
+
+class PayrollLoan(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    payroll_id = db.Column(db.Integer, db.ForeignKey('payroll.id'), nullable=False)
+    # = payroll.period_start; bagian dari FK ke payroll berpartisi (lihat payroll/partitions.py)
+    payroll_period_start = db.Column(db.Date, nullable=True)
+    loan_id    = db.Column(db.Integer, db.ForeignKey('loan.id'),  nullable=False)
+    payment_id = db.Column(db.Integer, db.ForeignKey('payment.id'), nullable=False)  # NEW
+    installment_number = db.Column(db.Integer, nullable=False)
+    amount = db.Column(db.Float, nullable=False)
+
+    loan    = db.relationship('Loan')
+    payment = db.relationship('Payment')
+
+
+class LoanSchedule(db.Model):
+    """Jadwal angsuran pinjaman, satu baris per cicilan; dibuat saat pinjaman disetujui."""
+    __tablename__ = 'loan_schedule'
+    __table_args__ = (
+        db.UniqueConstraint('loan_id', 'installment_number', name='uq_loan_schedule_number'),
+        db.Index('ix_loan_schedule_status_due', 'status', 'due_period'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    loan_id = db.Column(db.Integer, db.ForeignKey('loan.id'), nullable=False)
+    employee_id = db.Column(db.Integer, db.ForeignKey('employee.id'), nullable=False, index=True)
+    installment_number = db.Column(db.Integer, nullable=False)
+    due_period = db.Column(db.Date, nullable=False)  # tanggal 1 bulan jatuh tempo
+    amount = db.Column(db.Float, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='open')  # open / paid
+    payment_id = db.Column(db.Integer, db.ForeignKey('payment.id'), nullable=True, unique=True)
+    # tanpa FK: payroll bisa dipartisi (PK komposit), lihat payroll/partitions.py
+    payroll_id = db.Column(db.Integer, nullable=True, index=True)
+
+    loan = db.relationship('Loan', backref=db.backref(
+        'schedule', lazy=True, cascade='all, delete-orphan', order_by='LoanSchedule.installment_number'))
+    payment = db.relationship('Payment')
+
+
+class CompensationComponent(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    code = db.Column(db.String(50), unique=True, nullable=False)
+    name = db.Column(db.String(120), nullable=False)
+    comp_type = db.Column(db.String(20), nullable=False)  # gaji_pokok / tunjangan / potongan
+    calc_type = db.Column(db.String(20), default='fixed')  # fixed / percentage
+    default_value = db.Column(db.Float, default=0)
+    active = db.Column(db.Boolean, default=True)
+    created_at = db.Column(db.DateTime, default=utcnow)
+
+
+class EmployeeCompensation(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    employee_id = db.Column(db.Integer, db.ForeignKey('employee.id'), nullable=False)
+    component_id = db.Column(db.Integer, db.ForeignKey('compensation_component.id'), nullable=False)
+    value = db.Column(db.Float, nullable=True)  # jika None gunakan default component
+    start_period = db.Column(db.String(7), nullable=True)  # "YYYY-MM"
+    active = db.Column(db.Boolean, default=True)
+
+    component = db.relationship('CompensationComponent')
+    employee = db.relationship('Employee')
+
+
+class AuditLog(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    action = db.Column(db.String(100), nullable=False)
+    entity_type = db.Column(db.String(100), nullable=False)
+    entity_id = db.Column(db.Integer, nullable=False)
+    details = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=utcnow)
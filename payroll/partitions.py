@@ -0,0 +1,280 @@
+"""Partisi tahunan tabel payroll di Postgres (opsional).
+
+Tabel payroll diubah menjadi tabel `PARTITION BY RANGE (period_start)` dengan
+satu partisi per tahun (payroll_y2025, payroll_y2026, ...). Query per periode
+/tahun hanya menyentuh partisi terkait dan vacuum berjalan per partisi, jadi
+tetap cepat berapa pun panjang riwayatnya.
+
+- Primary key menjadi (id, period_start); id tetap dari sequence yang sama.
+- payroll_loan mereferensikan (payroll_id, payroll_period_start) dengan
+  ON UPDATE CASCADE, sehingga perpindahan periode payroll ikut terbawa.
+- Partisi tahun berikutnya dibuat lebih awal lewat `flask partitions ensure`
+  (jalankan terjadwal); insert ke tahun tanpa partisi akan ditolak database.
+- Tahun lama bisa dipindah ke tablespace murah (`archive`) atau dilepas dari
+  tabel induk (`detach`) beserta baris payroll_loan-nya.
+
+Butuh Postgres 15+ (UPDATE lintas partisi yang direferensikan foreign key).
+"""
+from datetime import date
+
+import sqlalchemy as sa
+
+PARENT_TABLE = 'payroll'
+LOAN_TABLE = 'payroll_loan'
+LOAN_ARCHIVE_TABLE = 'payroll_loan_archive'
+LOAN_FK_NAME = 'payroll_loan_payroll_period_fkey'
+DEFAULT_YEARS_AHEAD = 2
+MIN_SERVER_VERSION = 150000
+
+
+class PartitionError(RuntimeError):
+    pass
+
+
+def partition_name(year):
+    return f"{PARENT_TABLE}_y{int(year)}"
+
+
+def _year_bounds(year):
+    return date(int(year), 1, 1), date(int(year) + 1, 1, 1)
+
+
+def _require_postgres(conn):
+    if conn.dialect.name != 'postgresql':
+        raise PartitionError("Partisi payroll hanya didukung di Postgres.")
+
+
+def is_partitioned(conn):
+    if conn.dialect.name != 'postgresql':
+        return False
+    return conn.execute(sa.text(
+        "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:t)"
+    ), {"t": PARENT_TABLE}).first() is not None
+
+
+def partition_child_tables(conn):
+    """Nama tabel partisi (anak) di schema aktif; kosong jika bukan Postgres."""
+    if conn.dialect.name != 'postgresql':
+        return set()
+    return set(conn.execute(sa.text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relkind = 'p' AND p.relnamespace = to_regnamespace(current_schema())"
+    )).scalars())
+
+
+def list_partitions(conn):
+    """Partisi payroll yang terpasang: [{name, bounds, tablespace, rows}] urut nama."""
+    _require_postgres(conn)
+    rows = conn.execute(sa.text(
+        "SELECT c.relname AS name, pg_get_expr(c.relpartbound, c.oid) AS bounds, "
+        "       COALESCE(t.spcname, 'pg_default') AS tablespace, "
+        "       GREATEST(c.reltuples, 0)::bigint AS rows "
+        "FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "LEFT JOIN pg_tablespace t ON t.oid = c.reltablespace "
+        "WHERE i.inhparent = to_regclass(:t) ORDER BY c.relname"
+    ), {"t": PARENT_TABLE}).mappings().all()
+    return [dict(r) for r in rows]
+
+
+def _create_partition(conn, year):
+    start, end = _year_bounds(year)
+    conn.exec_driver_sql(
+        f'CREATE TABLE "{partition_name(year)}" PARTITION OF {PARENT_TABLE} '
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    )
+
+
+def ensure_partitions(conn, years_ahead=DEFAULT_YEARS_AHEAD, from_year=None):
+    """
+    Pastikan partisi tersedia dari from_year (default: tahun berjalan) sampai
+    tahun berjalan + years_ahead. Return daftar tahun yang baru dibuat.
+    """
+    _require_postgres(conn)
+    if not is_partitioned(conn):
+        raise PartitionError("Tabel payroll belum dipartisi (jalankan `flask partitions enable`).")
+    current = date.today().year
+    attached = {p["name"] for p in list_partitions(conn)}
+    created = []
+    for year in range(from_year or current, current + years_ahead + 1):
+        name = partition_name(year)
+        if name in attached:
+            continue
+        if conn.execute(sa.text("SELECT to_regclass(:n)"), {"n": name}).scalar():
+            raise PartitionError(f"Tabel {name} sudah ada tapi tidak terpasang (hasil detach?).")
+        _create_partition(conn, year)
+        created.append(year)
+    return created
+
+
+def _columns(conn, table, generated=False):
+    sql = ("SELECT column_name FROM information_schema.columns "
+           "WHERE table_schema = current_schema() AND table_name = :t")
+    if not generated:
+        sql += " AND is_generated = 'NEVER'"
+    return conn.execute(sa.text(sql + " ORDER BY ordinal_position"), {"t": table}).scalars().all()
+
+
+def _secondary_indexes(conn, table):
+    # pg_get_indexdef tabel partisi memakai "ON ONLY"; dibuang agar indeks menurun ke partisi
+    rows = conn.execute(sa.text(
+        "SELECT pg_get_indexdef(i.indexrelid) FROM pg_index i "
+        "WHERE i.indrelid = to_regclass(:t) AND NOT i.indisprimary"
+    ), {"t": table}).scalars().all()
+    return [r.replace(" ON ONLY ", " ON ") for r in rows]
+
+
+def _outgoing_fks(conn, table):
+    return conn.execute(sa.text(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = to_regclass(:t) AND contype = 'f'"
+    ), {"t": table}).all()
+
+
+def _incoming_fks(conn, table):
+    return conn.execute(sa.text(
+        "SELECT conrelid::regclass::text, conname FROM pg_constraint "
+        "WHERE confrelid = to_regclass(:t) AND contype = 'f' "
+        "AND conparentid = 0"
+    ), {"t": table}).all()
+
+
+def _rebuild_payroll(conn, partitioned):
+    """Salin payroll ke tabel baru (berpartisi atau biasa) lalu pasang ulang indeks & FK."""
+    conn.exec_driver_sql(f"LOCK TABLE {PARENT_TABLE}, {LOAN_TABLE} IN ACCESS EXCLUSIVE MODE")
+
+    incoming = _incoming_fks(conn, PARENT_TABLE)
+    foreign = sorted({t for t, _ in incoming if t != LOAN_TABLE})
+    if foreign:
+        raise PartitionError(f"Tabel lain mereferensikan payroll: {', '.join(foreign)}")
+
+    columns = ', '.join(f'"{c}"' for c in _columns(conn, PARENT_TABLE))
+    indexes = _secondary_indexes(conn, PARENT_TABLE)
+    outgoing = _outgoing_fks(conn, PARENT_TABLE)
+    years = conn.execute(sa.text(
+        f"SELECT DISTINCT extract(year FROM period_start)::int FROM {PARENT_TABLE} "
+        "WHERE period_start IS NOT NULL"
+    )).scalars().all()
+    sequence = conn.execute(sa.text("SELECT pg_get_serial_sequence(:t, 'id')"), {"t": PARENT_TABLE}).scalar()
+
+    for _, conname in incoming:
+        conn.exec_driver_sql(f'ALTER TABLE {LOAN_TABLE} DROP CONSTRAINT "{conname}"')
+    if sequence:
+        # sequence milik kolom id lama akan ikut terhapus bersama tabelnya
+        conn.exec_driver_sql(f"ALTER SEQUENCE {sequence} OWNED BY NONE")
+
+    old_table = f"{PARENT_TABLE}_old"
+    conn.exec_driver_sql(f"ALTER TABLE {PARENT_TABLE} RENAME TO {old_table}")
+    like = f"LIKE {old_table} INCLUDING DEFAULTS INCLUDING GENERATED INCLUDING COMMENTS"
+    if partitioned:
+        conn.exec_driver_sql(f"CREATE TABLE {PARENT_TABLE} ({like}) PARTITION BY RANGE (period_start)")
+        current = date.today().year
+        for year in range(min(years + [current]), current + DEFAULT_YEARS_AHEAD + 1):
+            _create_partition(conn, year)
+    else:
+        conn.exec_driver_sql(f"CREATE TABLE {PARENT_TABLE} ({like})")
+
+    conn.exec_driver_sql(f"INSERT INTO {PARENT_TABLE} ({columns}) SELECT {columns} FROM {old_table}")
+    conn.exec_driver_sql(f"DROP TABLE {old_table} CASCADE")
+
+    if partitioned:
+        conn.exec_driver_sql(f"ALTER TABLE {PARENT_TABLE} ALTER COLUMN period_start SET NOT NULL")
+        conn.exec_driver_sql(f"ALTER TABLE {PARENT_TABLE} ADD CONSTRAINT {PARENT_TABLE}_pkey "
+                             "PRIMARY KEY (id, period_start)")
+    else:
+        conn.exec_driver_sql(f"ALTER TABLE {PARENT_TABLE} ALTER COLUMN period_start DROP NOT NULL")
+        conn.exec_driver_sql(f"ALTER TABLE {PARENT_TABLE} ADD CONSTRAINT {PARENT_TABLE}_pkey PRIMARY KEY (id)")
+    for indexdef in indexes:
+        conn.exec_driver_sql(indexdef)
+    for conname, condef in outgoing:
+        conn.exec_driver_sql(f'ALTER TABLE {PARENT_TABLE} ADD CONSTRAINT "{conname}" {condef}')
+    if sequence:
+        conn.exec_driver_sql(f"ALTER SEQUENCE {sequence} OWNED BY {PARENT_TABLE}.id")
+
+    conn.exec_driver_sql(
+        f"UPDATE {LOAN_TABLE} pl SET payroll_period_start = p.period_start FROM {PARENT_TABLE} p "
+        "WHERE p.id = pl.payroll_id AND pl.payroll_period_start IS DISTINCT FROM p.period_start"
+    )
+    if partitioned:
+        conn.exec_driver_sql(f"ALTER TABLE {LOAN_TABLE} ALTER COLUMN payroll_period_start SET NOT NULL")
+        conn.exec_driver_sql(
+            f"ALTER TABLE {LOAN_TABLE} ADD CONSTRAINT {LOAN_FK_NAME} "
+            f"FOREIGN KEY (payroll_id, payroll_period_start) "
+            f"REFERENCES {PARENT_TABLE} (id, period_start) ON UPDATE CASCADE"
+        )
+        conn.exec_driver_sql(f"CREATE INDEX IF NOT EXISTS ix_payroll_loan_payroll_period "
+                             f"ON {LOAN_TABLE} (payroll_id, payroll_period_start)")
+    else:
+        conn.exec_driver_sql("DROP INDEX IF EXISTS ix_payroll_loan_payroll_period")
+        conn.exec_driver_sql(f"ALTER TABLE {LOAN_TABLE} ALTER COLUMN payroll_period_start DROP NOT NULL")
+        conn.exec_driver_sql(
+            f"ALTER TABLE {LOAN_TABLE} ADD CONSTRAINT {LOAN_TABLE}_payroll_id_fkey "
+            f"FOREIGN KEY (payroll_id) REFERENCES {PARENT_TABLE} (id)"
+        )
+
+
+def enable_partitioning(conn):
+    """Ubah payroll menjadi tabel berpartisi tahunan. Return False jika sudah berpartisi."""
+    _require_postgres(conn)
+    if is_partitioned(conn):
+        return False
+    version = conn.execute(sa.text("SHOW server_version_num")).scalar()
+    if int(version) < MIN_SERVER_VERSION:
+        raise PartitionError("Partisi payroll butuh Postgres 15 atau lebih baru.")
+    invalid = conn.execute(sa.text(
+        f"SELECT count(*) FROM {PARENT_TABLE} WHERE period_start IS NULL"
+    )).scalar()
+    if invalid:
+        raise PartitionError(f"{invalid} payroll belum punya period_start valid (periode bukan YYYY-MM).")
+    _rebuild_payroll(conn, partitioned=True)
+    return True
+
+
+def disable_partitioning(conn):
+    """Kembalikan payroll menjadi tabel biasa (partisi yang sudah di-detach tidak ikut)."""
+    _require_postgres(conn)
+    if not is_partitioned(conn):
+        return False
+    _rebuild_payroll(conn, partitioned=False)
+    return True
+
+
+def archive_partition(conn, year, tablespace):
+    """Pindahkan partisi satu tahun (beserta indeksnya) ke tablespace lain; tetap terpasang."""
+    _require_postgres(conn)
+    name = partition_name(year)
+    if name not in {p["name"] for p in list_partitions(conn)}:
+        raise PartitionError(f"Partisi {name} tidak ditemukan.")
+    conn.exec_driver_sql(f'ALTER TABLE "{name}" SET TABLESPACE "{tablespace}"')
+    for index in conn.execute(sa.text(
+        "SELECT indexrelid::regclass::text FROM pg_index WHERE indrelid = to_regclass(:n)"
+    ), {"n": name}).scalars():
+        conn.exec_driver_sql(f'ALTER INDEX {index} SET TABLESPACE "{tablespace}"')
+
+
+def detach_partition(conn, year):
+    """
+    Lepas partisi satu tahun dari payroll menjadi tabel mandiri (siap di-dump /
+    dipindah). Baris payroll_loan tahun tsb dipindah ke payroll_loan_archive
+    agar foreign key tidak menghalangi. Return jumlah baris payroll_loan yang dipindah.
+    """
+    _require_postgres(conn)
+    name = partition_name(year)
+    if name not in {p["name"] for p in list_partitions(conn)}:
+        raise PartitionError(f"Partisi {name} tidak ditemukan.")
+    start, end = _year_bounds(year)
+
+    conn.exec_driver_sql(
+        f"CREATE TABLE IF NOT EXISTS {LOAN_ARCHIVE_TABLE} (LIKE {LOAN_TABLE} INCLUDING DEFAULTS)"
+    )
+    columns = ', '.join(f'"{c}"' for c in _columns(conn, LOAN_ARCHIVE_TABLE))
+    moved = conn.execute(sa.text(
+        f"WITH moved AS (DELETE FROM {LOAN_TABLE} "
+        "WHERE payroll_period_start >= :start AND payroll_period_start < :end "
+        f"RETURNING {columns}) "
+        f"INSERT INTO {LOAN_ARCHIVE_TABLE} ({columns}) SELECT {columns} FROM moved"
+    ), {"start": start, "end": end}).rowcount
+    conn.exec_driver_sql(f'ALTER TABLE {PARENT_TABLE} DETACH PARTITION "{name}"')
+    return moved
@@ -0,0 +1,242 @@
+"""Profiler request on-demand untuk admin.
+
+Request admin dengan `?_profile=1` (atau header `X-Profile: 1`) dijalankan di
+bawah cProfile dan hasilnya (pstats) disimpan di PROFILE_DIR; `_profile=sample`
+memakai sampling profiler (stack thread request diambil tiap
+PROFILE_SAMPLE_INTERVAL_MS) dan disimpan sebagai JSON speedscope. Response
+streaming (mis. ekspor CSV) diprofil sampai response ditutup, bukan hanya sampai
+potongan pertama. Daftar profil ada di /admin/profiles. Profiler harus diaktifkan dengan PROFILER_ENABLED=1;
+tanpa itu hook tidak dipasang sama sekali.
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+
+from flask import current_app, g, request, session
+
+from payroll.utils import utcnow
+
+PROFILE_ID_RE = re.compile(r"^p\d{8}_\d{6}_\d{6}$")
+PROFILE_MODES = {"1": "cprofile", "cprofile": "cprofile", "sample": "sample"}
+EXTENSIONS = {"cprofile": ".prof", "sample": ".speedscope.json"}
+
+
+class StackSampler:
+    """Sampling profiler sederhana: ambil stack satu thread secara berkala dari thread lain."""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.frames = []
+        self.frame_index = {}
+        self.samples = []
+        self.weights = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-sampler", daemon=True)
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.elapsed = time.perf_counter() - self.started
+
+    def _frame_id(self, code):
+        key = (code.co_filename, code.co_name, code.co_firstlineno)
+        index = self.frame_index.get(key)
+        if index is None:
+            index = self.frame_index[key] = len(self.frames)
+            self.frames.append({"name": code.co_name, "file": code.co_filename, "line": code.co_firstlineno})
+        return index
+
+    def _run(self):
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            now = time.perf_counter()
+            stack = []
+            while frame is not None:
+                stack.append(self._frame_id(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                stack.reverse()   # speedscope: akar dulu
+                self.samples.append(stack)
+                self.weights.append((now - last) * 1000)
+            last = now
+
+    def speedscope(self, name):
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "payroll",
+            "activeProfileIndex": 0,
+            "shared": {"frames": self.frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": round(self.elapsed * 1000, 3),
+                "samples": self.samples,
+                "weights": [round(weight, 3) for weight in self.weights],
+            }],
+        }
+
+
+def profile_dir(app=None):
+    path = (app or current_app).config['PROFILE_DIR']
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def requested_mode():
+    """Mode profiler yang diminta request ini (None jika tidak diminta atau bukan admin)."""
+    value = request.args.get("_profile") or request.headers.get("X-Profile")
+    if not value or session.get('role') != 'admin':
+        return None
+    return PROFILE_MODES.get(value.lower())
+
+
+def start_profiler():
+    mode = requested_mode()
+    if mode is None:
+        return
+    g.profile_started = time.perf_counter()
+    g.profile_mode = mode
+    if mode == "sample":
+        interval = current_app.config['PROFILE_SAMPLE_INTERVAL_MS'] / 1000
+        g.profiler = StackSampler(threading.get_ident(), interval)
+        g.profiler.start()
+    else:
+        g.profiler = cProfile.Profile()
+        g.profiler.enable()
+
+
+def _halt(profiler, mode):
+    if mode == "sample":
+        profiler.stop()
+    else:
+        profiler.disable()
+
+
+def stop_profiler(response):
+    profiler = g.pop("profiler", None)
+    if profiler is None:
+        return response
+    created = utcnow()
+    mode, started = g.profile_mode, g.profile_started
+    rule = request.url_rule.rule if request.url_rule else request.path
+    meta = {
+        "id": "p" + created.strftime("%Y%m%d_%H%M%S_%f"),
+        "mode": mode,
+        "route": f"{request.method} {rule}",
+        "path": request.full_path.rstrip("?"),
+        "status": response.status_code,
+        "user_id": session.get('user_id'),
+        "created_at": created.isoformat(timespec="seconds"),
+    }
+    app = current_app._get_current_object()
+
+    def finish():
+        _halt(profiler, mode)
+        duration_ms = (time.perf_counter() - started) * 1000
+        with app.app_context():
+            try:
+                save_profile(profiler, meta, duration_ms)
+            except OSError:
+                app.logger.exception("Gagal menyimpan profil request.")
+                return False
+        return True
+
+    if response.is_streamed:
+        # body baru dibuat setelah after_request: profil berhenti saat response ditutup
+        response.call_on_close(finish)
+    elif not finish():
+        return response
+    response.headers["X-Profile-Id"] = meta["id"]
+    return response
+
+
+def discard_profiler(exc):
+    # request gagal sebelum after_request: pastikan profiler berhenti
+    profiler = g.pop("profiler", None)
+    if profiler is not None:
+        _halt(profiler, g.profile_mode)
+
+
+def save_profile(profiler, meta, duration_ms):
+    directory = profile_dir()
+    meta = dict(meta, duration_ms=round(duration_ms, 2), file=meta["id"] + EXTENSIONS[meta["mode"]])
+    target = os.path.join(directory, meta["file"])
+    if meta["mode"] == "sample":
+        with open(target, "w", encoding="utf-8") as handle:
+            json.dump(profiler.speedscope(f"{meta['route']} ({meta['id']})"), handle)
+    else:
+        profiler.dump_stats(target)
+    with open(os.path.join(directory, meta["id"] + ".json"), "w", encoding="utf-8") as handle:
+        json.dump(meta, handle)
+    prune_profiles(directory, current_app.config['PROFILE_KEEP'])
+    return meta["id"]
+
+
+def list_profiles(directory=None, route=None):
+    """Metadata profil tersimpan, terbaru dulu; `route` menyaring berdasarkan route."""
+    directory = directory or profile_dir()
+    profiles = []
+    for name in sorted(os.listdir(directory), reverse=True):
+        if not name.endswith(".json") or not PROFILE_ID_RE.match(name[:-5]):
+            continue
+        try:
+            with open(os.path.join(directory, name), encoding="utf-8") as handle:
+                meta = json.load(handle)
+        except (OSError, ValueError):
+            continue
+        if route and meta.get("route") != route:
+            continue
+        profiles.append(meta)
+    return profiles
+
+
+def get_profile(profile_id):
+    if not PROFILE_ID_RE.match(profile_id or ""):
+        return None
+    path = os.path.join(profile_dir(), profile_id + ".json")
+    if not os.path.isfile(path):
+        return None
+    with open(path, encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def profile_summary(meta, limit=40, sort="cumulative"):
+    """Ringkasan teks pstats (fungsi teratas) untuk profil cProfile."""
+    stream = io.StringIO()
+    stats = pstats.Stats(os.path.join(profile_dir(), meta["file"]), stream=stream)
+    stats.strip_dirs().sort_stats(sort).print_stats(limit)
+    return stream.getvalue()
+
+
+def prune_profiles(directory, keep):
+    for meta in list_profiles(directory)[keep:]:
+        for name in (meta["id"] + ".json", meta.get("file")):
+            if name:
+                try:
+                    os.remove(os.path.join(directory, name))
+                except FileNotFoundError:
+                    pass
+
+
+def init_profiler(app):
+    """Pasang hook profiler; tanpa PROFILER_ENABLED tidak ada hook sama sekali."""
+    if not app.config['PROFILER_ENABLED']:
+        return
+    app.before_request(start_profiler)
+    app.after_request(stop_profiler)
+    app.teardown_request(discard_profiler)
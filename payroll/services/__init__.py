@@ -0,0 +1 @@
+"""Service layer (logika bisnis yang dipakai lintas blueprint)."""
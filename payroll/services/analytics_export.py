@@ -0,0 +1,220 @@
+"""Ekspor fakta payroll, pinjaman, dan pembayaran ke Parquet (Arrow) untuk analitik.
+
+Tiap fakta dibaca dengan satu query ber-stream (yield_per) yang diurutkan per
+periode, lalu ditulis sekali jalan sebagai record batch Arrow ber-tipe ke dataset
+berpartisi gaya Hive::
+
+    <root>/payroll/pay_period=2025-05/part-0.parquet
+    <root>/loans/pay_period=2025-01/part-0.parquet      (periode pengajuan)
+    <root>/payments/pay_period=2025-02/part-0.parquet   (periode pembayaran)
+
+Dataset dibaca langsung dengan `pyarrow.dataset` / `pandas.read_parquet(root)`.
+Snapshot terjadwal ditulis ke ANALYTICS_SNAPSHOT_DIR (lihat write_snapshot).
+pyarrow di-import di dalam fungsi agar start worker tetap ringan.
+"""
+import os
+import shutil
+import threading
+import time
+from datetime import datetime, time as dt_time
+
+import sqlalchemy as sa
+from flask import current_app
+
+from payroll.database import read_from_replica
+from payroll.extensions import db
+from payroll.models import Employee, Loan, Payment, Payroll
+from payroll.utils import add_months, parse_period_to_date, utcnow
+
+RECORD_BATCH_SIZE = 10_000
+NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+SNAPSHOT_PREFIX = "snapshot_"
+_snapshot_lock = threading.Lock()
+
+
+def _month_bounds(pay_period):
+    start = parse_period_to_date(pay_period)
+    if start is None:
+        raise ValueError(f"Periode tidak valid: {pay_period}")
+    return datetime.combine(start, dt_time.min), datetime.combine(add_months(start, 1), dt_time.min)
+
+
+def _payroll_query(pay_period):
+    P = Payroll
+    query = (sa.select(P.pay_period, P.id, P.employee_id, Employee.nik, P.period_start, P.status,
+                       P.gaji_pokok, P.tunjangan_makan, P.tunjangan_transport, P.tunjangan_lainnya,
+                       P.upah_lembur, P.thr, P.bpjs_ketenagakerjaan, P.bpjs_kesehatan, P.pph21,
+                       P.potongan_gaji, P.hutang, P.alpha, P.loan_deduction,
+                       P.total_deductions, P.take_home_pay, P.approved_at)
+             .join(Employee, Employee.id == P.employee_id)
+             .order_by(P.period_start, P.id))
+    if pay_period:
+        query = query.where(P.in_period(pay_period))
+    return query
+
+
+def _loan_query(pay_period):
+    query = (sa.select(Loan.application_date, Loan.id, Loan.employee_id, Employee.nik, Loan.status,
+                       Loan.amount, Loan.tenor, Loan.interest_rate, Loan.installment,
+                       Loan.total_amount, Loan.paid_amount, Loan.pending_amount, Loan.remaining,
+                       Loan.application_date.label("applied_at"), Loan.approval_date)
+             .join(Employee, Employee.id == Loan.employee_id)
+             .order_by(Loan.application_date, Loan.id))
+    if pay_period:
+        start, end = _month_bounds(pay_period)
+        query = query.where(Loan.application_date >= start, Loan.application_date < end)
+    return query
+
+
+def _payment_query(pay_period):
+    query = (sa.select(Payment.payment_date, Payment.id, Payment.loan_id, Loan.employee_id,
+                       Payment.status, Payment.payment_amount, Payment.payment_date.label("paid_at"))
+             .join(Loan, Loan.id == Payment.loan_id)
+             .order_by(Payment.payment_date, Payment.id))
+    if pay_period:
+        start, end = _month_bounds(pay_period)
+        query = query.where(Payment.payment_date >= start, Payment.payment_date < end)
+    return query
+
+
+def _period_of_date(value):
+    return value.strftime("%Y-%m") if value else None
+
+
+# fakta -> (query(pay_period), kolom (nama, tipe) setelah kunci partisi, kunci partisi -> pay_period)
+FACTS = {
+    "payroll": (_payroll_query, [
+        ("payroll_id", "int"), ("employee_id", "int"), ("nik", "str"), ("period_start", "date"),
+        ("status", "str"), ("gaji_pokok", "float"), ("tunjangan_makan", "float"),
+        ("tunjangan_transport", "float"), ("tunjangan_lainnya", "float"), ("upah_lembur", "float"),
+        ("thr", "float"), ("bpjs_ketenagakerjaan", "float"), ("bpjs_kesehatan", "float"),
+        ("pph21", "float"), ("potongan_gaji", "float"), ("hutang", "float"), ("alpha", "int"),
+        ("loan_deduction", "float"), ("total_deductions", "float"), ("take_home_pay", "float"),
+        ("approved_at", "datetime"),
+    ], lambda key: key),
+    "loans": (_loan_query, [
+        ("loan_id", "int"), ("employee_id", "int"), ("nik", "str"), ("status", "str"),
+        ("amount", "float"), ("tenor", "int"), ("interest_rate", "float"), ("installment", "float"),
+        ("total_amount", "float"), ("paid_amount", "float"), ("pending_amount", "float"),
+        ("remaining", "float"), ("applied_at", "datetime"), ("approved_at", "datetime"),
+    ], _period_of_date),
+    "payments": (_payment_query, [
+        ("payment_id", "int"), ("loan_id", "int"), ("employee_id", "int"), ("status", "str"),
+        ("amount", "float"), ("paid_at", "datetime"),
+    ], _period_of_date),
+}
+
+
+def _arrow_schema(pa, columns):
+    types = {"int": pa.int64(), "float": pa.float64(), "str": pa.string(),
+             "date": pa.date32(), "datetime": pa.timestamp("us")}
+    return pa.schema([(name, types[kind]) for name, kind in columns])
+
+
+def write_fact(fact, root, pay_period=None, batch_size=RECORD_BATCH_SIZE):
+    """
+    Tulis ulang satu fakta ke `<root>/<fact>/pay_period=.../part-N.parquet`
+    (isi lama `<root>/<fact>` dihapus). Return {pay_period: jumlah_baris}.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    query_factory, columns, period_of = FACTS[fact]
+    schema = _arrow_schema(pa, columns)
+    shutil.rmtree(os.path.join(root, fact), ignore_errors=True)
+    result = db.session.execute(query_factory(pay_period), execution_options={"yield_per": batch_size})
+
+    counts = {}
+    buffer = []
+    writer = None
+    current = object()
+
+    def flush():
+        if buffer:
+            arrays = [pa.array(values, type=field.type) for values, field in zip(zip(*buffer), schema)]
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+            buffer.clear()
+
+    try:
+        for row in result:
+            period = period_of(row[0]) or NULL_PARTITION
+            if period != current:
+                flush()
+                if writer is not None:
+                    writer.close()
+                directory = os.path.join(root, fact, f"pay_period={period}")
+                os.makedirs(directory, exist_ok=True)
+                # periode yang sama bisa muncul lagi (mis. NULL di awal/akhir urutan): file baru
+                part = len([name for name in os.listdir(directory) if name.endswith(".parquet")])
+                writer = pq.ParquetWriter(os.path.join(directory, f"part-{part}.parquet"), schema)
+                current = period
+            buffer.append(row[1:])
+            counts[period] = counts.get(period, 0) + 1
+            if len(buffer) >= batch_size:
+                flush()
+        flush()
+    finally:
+        if writer is not None:
+            writer.close()
+    return counts
+
+
+def write_facts(root, pay_period=None):
+    """Tulis semua fakta; return {fakta: {pay_period: jumlah_baris}}."""
+    return {fact: write_fact(fact, root, pay_period) for fact in FACTS}
+
+
+def list_snapshots(snapshot_dir=None):
+    snapshot_dir = snapshot_dir or current_app.config["ANALYTICS_SNAPSHOT_DIR"]
+    try:
+        names = [entry.name for entry in os.scandir(snapshot_dir)
+                 if entry.is_dir() and entry.name.startswith(SNAPSHOT_PREFIX)
+                 and not entry.name.endswith(".tmp")]
+    except FileNotFoundError:
+        return []
+    return [os.path.join(snapshot_dir, name) for name in sorted(names, reverse=True)]
+
+
+def latest_snapshot(snapshot_dir=None):
+    snapshots = list_snapshots(snapshot_dir)
+    return snapshots[0] if snapshots else None
+
+
+def write_snapshot(snapshot_dir=None, retention=None):
+    """
+    Tulis seluruh fakta ke `snapshot_YYYYmmdd_HHMMSS/` di ANALYTICS_SNAPSHOT_DIR.
+    Ditulis ke direktori .tmp lalu di-rename agar pembaca tidak melihat snapshot
+    setengah jadi; snapshot lama melebihi `retention` dihapus.
+    """
+    snapshot_dir = snapshot_dir or current_app.config["ANALYTICS_SNAPSHOT_DIR"]
+    retention = max(1, int(retention or current_app.config["ANALYTICS_SNAPSHOT_RETENTION"]))
+    os.makedirs(snapshot_dir, exist_ok=True)
+    final = os.path.join(snapshot_dir, SNAPSHOT_PREFIX + utcnow().strftime("%Y%m%d_%H%M%S"))
+    staging = final + ".tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    try:
+        with read_from_replica():
+            write_facts(staging)
+        os.replace(staging, final)
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    for old in list_snapshots(snapshot_dir)[retention:]:
+        shutil.rmtree(old, ignore_errors=True)
+    return final
+
+
+def run_scheduled_snapshot(app):
+    """Dipanggil worker otomatis: tulis snapshot bila ANALYTICS_SNAPSHOT_INTERVAL_HOURS terlewati."""
+    hours = app.config.get("ANALYTICS_SNAPSHOT_INTERVAL_HOURS", 0)
+    if hours <= 0 or not _snapshot_lock.acquire(blocking=False):
+        return None
+    try:
+        with app.app_context():
+            latest = latest_snapshot()
+            if latest and time.time() - os.path.getmtime(latest) < hours * 3600:
+                return None
+            return write_snapshot()
+    finally:
+        _snapshot_lock.release()
@@ -0,0 +1,246 @@
+"""File transfer massal (bulk transfer) gaji per bank.
+
+Payroll approved satu periode dibaca dengan satu query join (di-stream, urut per
+bank) lalu ditulis sekali jalan ke file milik masing-masing bank. Format file
+dipilih per bank lewat BANK_FILE_FORMATS; bank yang tidak terdaftar memakai
+BANK_FILE_DEFAULT_FORMAT. Tiap file ditutup trailer berisi total kontrol: jumlah
+baris, total nominal, dan hash total nomor rekening (jumlah digit rekening,
+modulo 10^15) untuk dicocokkan bank saat upload.
+
+Format baru cukup didaftarkan dengan @register_bank_format.
+"""
+import csv
+import io
+import itertools
+import re
+import unicodedata
+import zipfile
+from datetime import date
+
+import sqlalchemy as sa
+from flask import current_app
+
+from payroll.extensions import db
+from payroll.models import Employee, Payroll
+
+BANK_FORMATS = {}
+STREAM_BATCH_SIZE = 1000
+ACCOUNT_HASH_MODULUS = 10 ** 15
+NO_BANK_KEY = ""
+
+
+def register_bank_format(cls):
+    BANK_FORMATS[cls.name] = cls
+    return cls
+
+
+def _ascii(value, upper=True):
+    text = unicodedata.normalize("NFKD", value or "").encode("ascii", "ignore").decode("ascii")
+    text = re.sub(r"[^A-Za-z0-9 .,\-/]", " ", text)
+    text = re.sub(r"\s+", " ", text).strip()
+    return text.upper() if upper else text
+
+
+def _digits(value):
+    return re.sub(r"\D", "", value or "")
+
+
+class ControlTotals:
+    def __init__(self):
+        self.count = 0
+        self.amount = 0
+        self.account_hash = 0
+
+    def add(self, account, amount):
+        self.count += 1
+        self.amount += amount
+        self.account_hash = (self.account_hash + int(_digits(account) or 0)) % ACCOUNT_HASH_MODULUS
+
+
+class BankFileFormat:
+    """Dasar format: header(), record() per baris, trailer() dengan total kontrol."""
+
+    name = None
+    extension = "txt"
+
+    def __init__(self, bank, pay_period, company_code, value_date):
+        self.bank = bank
+        self.pay_period = pay_period
+        self.company_code = company_code
+        self.value_date = value_date
+
+    def header(self):
+        return []
+
+    def record(self, seq, row):
+        raise NotImplementedError
+
+    def trailer(self, totals):
+        return []
+
+
+@register_bank_format
+class CsvFormat(BankFileFormat):
+    """CSV umum dengan baris judul dan baris TOTAL di akhir."""
+
+    name = "csv"
+    extension = "csv"
+
+    def _line(self, values):
+        buf = io.StringIO()
+        csv.writer(buf, lineterminator="").writerow(values)
+        return buf.getvalue()
+
+    def header(self):
+        return [self._line(["No", "No Rekening", "Nama", "NIK", "Jumlah Transfer", "Keterangan"])]
+
+    def record(self, seq, row):
+        return self._line([seq, row.no_rek, row.name, row.nik, row.amount, f"GAJI {self.pay_period}"])
+
+    def trailer(self, totals):
+        return [self._line(["TOTAL", totals.count, "", "", totals.amount, totals.account_hash])]
+
+
+@register_bank_format
+class DelimitedFormat(BankFileFormat):
+    """Pipe-delimited: H|perusahaan|periode|tanggal, D|..., T|jumlah|total|hash."""
+
+    name = "delimited"
+
+    def header(self):
+        return ["|".join(["H", self.company_code, self.pay_period.replace("-", ""),
+                          self.value_date.strftime("%Y%m%d"), self.bank])]
+
+    def record(self, seq, row):
+        return "|".join(["D", str(seq), _digits(row.no_rek), _ascii(row.name), str(row.amount),
+                         _ascii(row.nik), f"GAJI {self.pay_period}"])
+
+    def trailer(self, totals):
+        return ["|".join(["T", str(totals.count), str(totals.amount), str(totals.account_hash)])]
+
+
+@register_bank_format
+class FixedWidthFormat(BankFileFormat):
+    """Lebar tetap: header '0', detail '1', trailer '9'; nominal dalam sen, rata kanan nol."""
+
+    name = "fixed"
+    record_length = 100
+
+    def _pad(self, line):
+        return line[:self.record_length].ljust(self.record_length)
+
+    def header(self):
+        return [self._pad("0" + _ascii(self.company_code)[:10].ljust(10)
+                          + self.pay_period.replace("-", "")
+                          + self.value_date.strftime("%Y%m%d")
+                          + _ascii(self.bank)[:20].ljust(20))]
+
+    def record(self, seq, row):
+        return self._pad("1" + str(seq).zfill(6)
+                         + _digits(row.no_rek)[:20].ljust(20)
+                         + _ascii(row.name)[:35].ljust(35)
+                         + str(row.amount * 100).zfill(17)
+                         + _ascii(row.nik)[:20].ljust(20))
+
+    def trailer(self, totals):
+        return [self._pad("9" + str(totals.count).zfill(6)
+                          + str(totals.amount * 100).zfill(20)
+                          + str(totals.account_hash).zfill(15))]
+
+
+def transfer_rows_query(pay_period):
+    """Satu query join payroll+karyawan untuk periode, urut per bank lalu NIK."""
+    bank_key = sa.func.upper(sa.func.trim(sa.func.coalesce(Employee.bank_name, "")))
+    return (sa.select(bank_key.label("bank"), Employee.nik, Employee.name, Employee.no_rek,
+                      sa.func.round(Payroll.take_home_pay).label("amount"))
+            .join(Employee, Employee.id == Payroll.employee_id)
+            .where(Payroll.in_period(pay_period), Payroll.status == "approved")
+            .order_by(bank_key, Employee.nik, Payroll.id))
+
+
+def _format_for(bank):
+    formats = current_app.config.get("BANK_FILE_FORMATS") or {}
+    name = formats.get(bank) or current_app.config.get("BANK_FILE_DEFAULT_FORMAT", "csv")
+    if name not in BANK_FORMATS:
+        raise ValueError(f"Format file bank tidak dikenal: {name}")
+    return BANK_FORMATS[name]
+
+
+def _file_stem(bank, pay_period):
+    return f"{re.sub(r'[^A-Z0-9]+', '_', bank).strip('_') or 'BANK'}_{pay_period.replace('-', '')}"
+
+
+class _Row:
+    __slots__ = ("nik", "name", "no_rek", "amount")
+
+    def __init__(self, row):
+        self.nik = row.nik or ""
+        self.name = row.name or ""
+        self.no_rek = row.no_rek or ""
+        self.amount = int(row.amount or 0)
+
+
+def write_bank_files(pay_period, fileobj, value_date=None):
+    """
+    Tulis zip berisi satu file per bank ke `fileobj`, plus `control_totals.csv`.
+
+    Baris tanpa bank/rekening atau dengan nominal <= 0 tidak masuk file bank dan
+    dicatat di `exceptions.csv`. Return daftar ringkasan per bank
+    (bank, format, filename, count, amount, account_hash) dan jumlah pengecualian.
+    """
+    value_date = value_date or date.today()
+    company_code = current_app.config.get("BANK_FILE_COMPANY_CODE", "PAYROLL")
+    result = db.session.execute(
+        transfer_rows_query(pay_period).execution_options(yield_per=STREAM_BATCH_SIZE))
+
+    summary = []
+    exceptions = io.StringIO()
+    exception_writer = csv.writer(exceptions)
+    exception_writer.writerow(["Bank", "NIK", "Nama", "No Rekening", "Jumlah", "Alasan"])
+    exception_count = 0
+
+    with zipfile.ZipFile(fileobj, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for bank, rows in itertools.groupby(result, key=lambda r: r.bank):
+            fmt = None
+            totals = ControlTotals()
+            handle = None
+            for raw in rows:
+                row = _Row(raw)
+                reason = ("tanpa nama bank" if bank == NO_BANK_KEY else
+                          "tanpa nomor rekening" if not _digits(row.no_rek) else
+                          "nominal tidak positif" if row.amount <= 0 else None)
+                if reason:
+                    exception_writer.writerow([bank, row.nik, row.name, row.no_rek, row.amount, reason])
+                    exception_count += 1
+                    continue
+                if handle is None:
+                    fmt = _format_for(bank)(bank, pay_period, company_code, value_date)
+                    filename = f"{_file_stem(bank, pay_period)}.{fmt.extension}"
+                    handle = io.TextIOWrapper(archive.open(filename, "w"), encoding="ascii",
+                                              errors="replace", newline="\r\n")
+                    for line in fmt.header():
+                        handle.write(line + "\n")
+                totals.add(row.no_rek, row.amount)
+                handle.write(fmt.record(totals.count, row) + "\n")
+            if handle is None:
+                continue
+            for line in fmt.trailer(totals):
+                handle.write(line + "\n")
+            handle.close()
+            summary.append({"bank": bank, "format": fmt.name, "filename": filename,
+                            "count": totals.count, "amount": totals.amount,
+                            "account_hash": totals.account_hash})
+
+        control = io.StringIO()
+        writer = csv.writer(control)
+        writer.writerow(["Bank", "Format", "File", "Jumlah Baris", "Total Nominal", "Hash Rekening"])
+        for item in summary:
+            writer.writerow([item["bank"], item["format"], item["filename"], item["count"],
+                             item["amount"], item["account_hash"]])
+        writer.writerow(["TOTAL", "", "", sum(i["count"] for i in summary),
+                         sum(i["amount"] for i in summary), ""])
+        archive.writestr("control_totals.csv", control.getvalue())
+        if exception_count:
+            archive.writestr("exceptions.csv", exceptions.getvalue())
+
+    return summary, exception_count
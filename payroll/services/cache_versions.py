@@ -0,0 +1,48 @@
+"""Versi cache bersama antar worker (tabel cache_version).
+
+Cache di memori (snapshot kompensasi, ringkasan karyawan) hanya berlaku di satu
+proses. Setiap entri cache menyimpan versi yang dibaca *sebelum* datanya
+dibangun; saat dibaca lagi versinya dibandingkan dengan versi di database,
+sehingga perubahan dari worker lain langsung terlihat tanpa menunggu TTL.
+Versi dinaikkan di transaksi yang sama dengan perubahan datanya. Dalam satu
+request/app context versi hanya dibaca sekali (di-memo di `g`), karena cache ini
+dibaca per baris saat render/export.
+"""
+import sqlalchemy as sa
+from flask import g
+
+from payroll.extensions import db
+from payroll.models import CacheVersion
+from payroll.utils import utcnow
+
+
+def get_cache_version(name):
+    """Versi terkini `name` (0 jika belum pernah dinaikkan); dibaca dari primary sekali per request."""
+    versions = g.setdefault('cache_versions', {})
+    if name not in versions:
+        # bind eksplisit: replica bisa tertinggal sehingga versi lama terlihat berlaku
+        version = db.session.execute(
+            sa.select(CacheVersion.version).where(CacheVersion.name == name),
+            bind_arguments={"bind": db.engine},
+        ).scalar()
+        versions[name] = version or 0
+    return versions[name]
+
+
+def bump_cache_version(name):
+    """Naikkan versi `name` di transaksi berjalan; ikut commit/rollback bersama datanya."""
+    bump = (sa.update(CacheVersion)
+            .where(CacheVersion.name == name)
+            .values(version=CacheVersion.version + 1, updated_at=utcnow())
+            .execution_options(synchronize_session=False))
+    g.setdefault('cache_versions', {}).pop(name, None)
+    primary = {"bind": db.engine}
+    if db.session.execute(bump, bind_arguments=primary).rowcount:
+        return
+    try:
+        with db.session.begin_nested():
+            db.session.execute(sa.insert(CacheVersion).values(name=name, version=1, updated_at=utcnow()),
+                               bind_arguments=primary)
+    except sa.exc.IntegrityError:
+        # worker lain baru saja membuat barisnya
+        db.session.execute(bump, bind_arguments=primary)
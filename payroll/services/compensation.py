@@ -0,0 +1,141 @@
+"""Perhitungan komponen kompensasi (master gaji/tunjangan/potongan).
+
+Snapshot kompensasi per periode dihitung sekali di SQL untuk seluruh karyawan
+lalu di-cache per periode. invalidate_compensation_cache() dipanggil sebelum
+commit setiap kali master komponen atau assignment karyawan berubah: cache
+lokal dibuang dan versi bersama "compensation" dinaikkan, sehingga worker lain
+membangun ulang snapshot pada baca berikutnya. TTL
+(COMPENSATION_CACHE_TTL_SECONDS) tetap membatasi umur cache.
+"""
+import threading
+import time
+
+import sqlalchemy as sa
+from flask import current_app
+
+from payroll.extensions import db
+from payroll.models import CompensationComponent, EmployeeCompensation
+from payroll.services.cache_versions import bump_cache_version, get_cache_version
+from payroll.utils import parse_period_to_date
+
+_snapshot_lock = threading.Lock()
+_snapshot_cache = {}   # pay_period -> (dibuat_pada, versi, snapshot)
+_snapshot_generation = 0
+CACHE_VERSION_NAME = 'compensation'
+
+
+def _empty_totals():
+    return {"gaji_pokok": 0, "tunjangan": 0, "potongan": 0, "items": []}
+
+
+def _snapshot_query(pay_period):
+    EC, CC = EmployeeCompensation, CompensationComponent
+    raw_value = sa.func.coalesce(EC.value, CC.default_value, 0)
+
+    # assignment efektif: start_period terbaru yang <= periode (NULL = berlaku sejak awal)
+    ranked = (sa.select(
+                  EC.employee_id,
+                  CC.code, CC.name, CC.comp_type, CC.calc_type,
+                  raw_value.label('raw_value'),
+                  sa.func.row_number().over(
+                      partition_by=(EC.employee_id, EC.component_id),
+                      order_by=(sa.func.coalesce(EC.start_period, '').desc(), EC.id.desc()),
+                  ).label('rn'))
+              .join(CC, CC.id == EC.component_id)
+              .where(EC.active.is_(True),
+                     CC.active.is_(True),
+                     sa.or_(EC.start_period.is_(None), EC.start_period <= pay_period))
+              .subquery())
+
+    base = sa.func.sum(
+        sa.case((ranked.c.comp_type == 'gaji_pokok', ranked.c.raw_value), else_=0)
+    ).over(partition_by=ranked.c.employee_id)
+    value = sa.case(
+        (sa.and_(ranked.c.comp_type != 'gaji_pokok', ranked.c.calc_type == 'percentage'),
+         base * ranked.c.raw_value / 100.0),
+        else_=ranked.c.raw_value,
+    )
+    return (sa.select(ranked.c.employee_id, ranked.c.code, ranked.c.name,
+                      ranked.c.comp_type, ranked.c.calc_type, value.label('value'))
+            .where(ranked.c.rn == 1)
+            .order_by(ranked.c.employee_id, ranked.c.comp_type, ranked.c.code))
+
+
+def build_compensation_snapshot(pay_period):
+    """
+    Hitung snapshot kompensasi seluruh karyawan untuk periode (YYYY-MM):
+    {employee_id: {"gaji_pokok", "tunjangan", "potongan", "items": [...]}}.
+    - hanya nilai efektif terakhir per karyawan/komponen yang dipakai
+    - percentage dihitung dari total gaji pokok karyawan tsb
+    """
+    snapshot = {}
+    for row in db.session.execute(_snapshot_query(pay_period)).mappings():
+        totals = snapshot.setdefault(row['employee_id'], _empty_totals())
+        val = float(row['value'] or 0)
+        if row['comp_type'] == 'gaji_pokok':
+            totals['gaji_pokok'] += val
+            continue
+        if row['comp_type'] == 'tunjangan':
+            totals['tunjangan'] += val
+        elif row['comp_type'] == 'potongan':
+            totals['potongan'] += val
+        totals['items'].append({
+            "name": row['name'],
+            "code": row['code'],
+            "type": row['comp_type'],
+            "calc": row['calc_type'],
+            "value": val,
+        })
+    return snapshot
+
+
+def compensation_snapshot(pay_period):
+    """Snapshot kompensasi periode (dari cache jika masih berlaku)."""
+    ttl = current_app.config['COMPENSATION_CACHE_TTL_SECONDS']
+    now = time.monotonic()
+    # versi dibaca sebelum membangun: perubahan di tengah jalan membuat entri ini basi
+    version = get_cache_version(CACHE_VERSION_NAME)
+    with _snapshot_lock:
+        cached = _snapshot_cache.get(pay_period)
+        if cached and cached[1] == version and now - cached[0] < ttl:
+            return cached[2]
+        generation = _snapshot_generation
+
+    snapshot = build_compensation_snapshot(pay_period)
+    with _snapshot_lock:
+        # jangan simpan hasil yang dihitung sebelum invalidasi terakhir
+        if generation == _snapshot_generation:
+            _snapshot_cache[pay_period] = (now, version, snapshot)
+    return snapshot
+
+
+def clear_compensation_cache():
+    """Buang semua snapshot di proses ini saja."""
+    global _snapshot_generation
+    with _snapshot_lock:
+        _snapshot_generation += 1
+        _snapshot_cache.clear()
+
+
+def invalidate_compensation_cache():
+    """Buang snapshot di semua worker; panggil sebelum commit perubahan komponen/assignment."""
+    bump_cache_version(CACHE_VERSION_NAME)
+    clear_compensation_cache()
+
+
+def get_component_totals(employee_id, pay_period):
+    """
+    Hitung nilai default gaji/tunjangan/potongan berbasis master komponen
+    yang aktif untuk karyawan pada periode tertentu (YYYY-MM).
+    - comp_type: gaji_pokok, tunjangan, potongan
+    - calc_type: fixed (nilai apa adanya), percentage (persen dari total gaji pokok)
+    """
+    period_start = parse_period_to_date(pay_period)
+    if not period_start:
+        return _empty_totals()
+
+    totals = compensation_snapshot(period_start.strftime('%Y-%m')).get(employee_id)
+    if not totals:
+        return _empty_totals()
+    # salinan agar pemanggil tidak mengubah isi cache
+    return dict(totals, items=[dict(item) for item in totals['items']])
@@ -0,0 +1,127 @@
+"""Direktori karyawan: query ringan dengan keyset pagination untuk API JSON.
+
+Dipakai halaman daftar/arsip karyawan (muat bertahap) dan pemilih karyawan
+(typeahead) di form payroll, sehingga halaman tidak lagi merender seluruh
+karyawan sekaligus.
+"""
+import base64
+import json
+
+import sqlalchemy as sa
+
+from payroll.extensions import db
+from payroll.models import Employee
+from payroll.services.search import employee_search_filter
+from payroll.utils import serialize_value
+
+DIRECTORY_FIELDS = {
+    'id': Employee.id,
+    'nik': Employee.nik,
+    'name': Employee.name,
+    'position': Employee.position,
+    'phone': Employee.phone,
+    'address': Employee.address,
+    'no_rek': Employee.no_rek,
+    'bank_name': Employee.bank_name,
+    'hire_date': Employee.hire_date,
+    'status': Employee.status,
+}
+DEFAULT_FIELDS = ('id', 'nik', 'name', 'position')
+
+# urutan keyset; id selalu jadi pemutus agar urutan stabil
+SORT_KEYS = {
+    'name': ('name', 'id'),
+    'id': ('id',),
+}
+
+# tipe nilai cursor per kolom urutan (cursor datang dari klien, jadi diperiksa)
+CURSOR_TYPES = {
+    'id': int,
+    'name': str,
+}
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+
+def encode_cursor(values):
+    raw = json.dumps([serialize_value(v) for v in values]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor, sort_keys):
+    """Nilai cursor untuk `sort_keys`; ValueError bila rusak atau tidak cocok dengan urutannya."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise ValueError('cursor tidak valid')
+    if not isinstance(values, list) or len(values) != len(sort_keys):
+        raise ValueError('cursor tidak valid')
+    for key, value in zip(sort_keys, values):
+        # bool adalah subclass int di Python
+        if isinstance(value, bool) or not isinstance(value, CURSOR_TYPES[key]):
+            raise ValueError('cursor tidak valid')
+    return values
+
+
+def status_filter(status):
+    if status == 'active':
+        return sa.or_(Employee.status.is_(None), Employee.status == 'active')
+    if status == 'inactive':
+        return Employee.status == 'inactive'
+    if status == 'all':
+        return sa.true()
+    raise ValueError(f'status tidak dikenal: {status}')
+
+
+def prefix_filter(keyword):
+    escaped = keyword.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    pattern = f"{escaped}%"
+    return sa.or_(Employee.name.ilike(pattern, escape='\\'),
+                  Employee.nik.ilike(pattern, escape='\\'))
+
+
+def employee_directory(q=None, match='contains', status='active', fields=None,
+                       sort='name', limit=DEFAULT_LIMIT, after=None):
+    """
+    Ambil satu halaman direktori karyawan.
+    - q + match: 'contains' (nama/NIK/posisi/no. rek) atau 'prefix' (awal nama/NIK)
+    - fields: daftar kolom yang dikembalikan (proyeksi), default DEFAULT_FIELDS
+    - after: cursor dari halaman sebelumnya (next_cursor)
+    Return dict {items, next_cursor}; ValueError untuk parameter yang tidak valid.
+    """
+    fields = list(fields or DEFAULT_FIELDS)
+    unknown = [f for f in fields if f not in DIRECTORY_FIELDS]
+    if unknown:
+        raise ValueError(f"kolom tidak dikenal: {', '.join(unknown)}")
+    if sort not in SORT_KEYS:
+        raise ValueError(f'urutan tidak dikenal: {sort}')
+    if match not in ('contains', 'prefix'):
+        raise ValueError(f'mode pencarian tidak dikenal: {match}')
+    limit = max(1, min(int(limit or DEFAULT_LIMIT), MAX_LIMIT))
+
+    sort_keys = SORT_KEYS[sort]
+    columns = fields + [k for k in sort_keys if k not in fields]
+    query = (sa.select(*(DIRECTORY_FIELDS[c].label(c) for c in columns))
+             .where(status_filter(status)))
+
+    q = (q or '').strip()
+    if q:
+        query = query.where(prefix_filter(q) if match == 'prefix' else employee_search_filter(q))
+
+    if after:
+        values = decode_cursor(after, sort_keys)
+        key = sa.tuple_(*(DIRECTORY_FIELDS[k] for k in sort_keys))
+        query = query.where(key > sa.tuple_(*(sa.literal(v) for v in values)))
+
+    query = query.order_by(*(DIRECTORY_FIELDS[k] for k in sort_keys)).limit(limit + 1)
+    rows = db.session.execute(query).mappings().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1][k] for k in sort_keys])
+
+    items = [{f: serialize_value(row[f]) for f in fields} for row in rows]
+    return {'items': items, 'next_cursor': next_cursor}
@@ -0,0 +1,165 @@
+"""Ringkasan pinjaman karyawan untuk dashboard self-service.
+
+Seluruh data dashboard (pinjaman + total dibayar/sisa, histori pembayaran)
+dibangun dengan dua query agregat lalu di-cache per karyawan sebagai dict
+biasa. Perubahan pinjaman/pembayaran menandai karyawan lewat
+mark_employee_summary_dirty(), yang juga menaikkan versi bersama
+"employee_summary:<id>" di transaksi yang sama; cache lokal baru dibuang setelah
+commit sehingga request lain tidak sempat menyimpan data sebelum commit, dan
+worker lain membangun ulang karena versinya berbeda.
+TTL (EMPLOYEE_SUMMARY_CACHE_TTL_SECONDS) tetap membatasi umur cache.
+"""
+import math
+import threading
+import time
+
+import sqlalchemy as sa
+from flask import current_app
+
+from payroll.extensions import db, RoutingSession
+from payroll.models import Loan, Payment
+from payroll.services.cache_versions import bump_cache_version, get_cache_version
+
+PAID_STATUSES = ('approved', 'posted')
+_DIRTY_KEY = 'employee_summary_dirty'
+
+_summary_lock = threading.Lock()
+_summary_cache = {}   # employee_id -> (dibuat_pada, versi, summary)
+_summary_generation = 0
+
+
+class ListPage:
+    """Pagination list di memori dengan atribut yang sama seperti paginate() Flask-SQLAlchemy."""
+
+    def __init__(self, items, page, per_page):
+        self.total = len(items)
+        self.per_page = per_page
+        self.pages = math.ceil(self.total / per_page) if self.total else 0
+        self.page = max(1, page)
+        start = (self.page - 1) * per_page
+        self.items = items[start:start + per_page]
+
+    @property
+    def has_prev(self):
+        return self.page > 1
+
+    @property
+    def prev_num(self):
+        return self.page - 1 if self.has_prev else None
+
+    @property
+    def has_next(self):
+        return self.page < self.pages
+
+    @property
+    def next_num(self):
+        return self.page + 1 if self.has_next else None
+
+
+def build_employee_summary(employee_id):
+    """
+    Bangun ringkasan pinjaman satu karyawan:
+    {"loans": [...], "active_payments": [...], "archived_payments": [...]}.
+    - loans: urut tanggal pengajuan terbaru, dengan total, sisa, dan
+      daftar angsuran approved/posted (paid_installments)
+    - active/archived: pembayaran pinjaman yang belum/sudah completed
+    """
+    paid_amount = sa.case((Payment.status.in_(PAID_STATUSES), Payment.payment_amount), else_=0)
+    loan_rows = db.session.execute(
+        sa.select(Loan.id, Loan.amount, Loan.interest_rate, Loan.tenor, Loan.installment,
+                  Loan.status, Loan.application_date,
+                  sa.func.count(Payment.id).label('payment_count'),
+                  sa.func.coalesce(sa.func.sum(Payment.payment_amount), 0).label('payments_total'),
+                  sa.func.coalesce(sa.func.sum(paid_amount), 0).label('paid'))
+        .outerjoin(Payment, Payment.loan_id == Loan.id)
+        .where(Loan.employee_id == employee_id)
+        .group_by(Loan.id)
+        .order_by(Loan.application_date.desc(), Loan.id.desc())
+    ).mappings().all()
+
+    payment_rows = db.session.execute(
+        sa.select(Payment.id, Payment.loan_id, Payment.payment_amount, Payment.payment_date,
+                  Payment.status, Loan.status.label('loan_status'))
+        .join(Loan, Loan.id == Payment.loan_id)
+        .where(Loan.employee_id == employee_id)
+        .order_by(Payment.payment_date.desc(), Payment.id.desc())
+    ).mappings().all()
+
+    installments = {}
+    for row in reversed(payment_rows):
+        if row['status'] in PAID_STATUSES:
+            installments.setdefault(row['loan_id'], []).append(float(row['payment_amount']))
+
+    loans = []
+    for row in loan_rows:
+        total = row['amount'] + (row['amount'] * (row['interest_rate'] or 0) / 100)
+        loans.append(dict(
+            row,
+            total=total,
+            paid=float(row['paid']),
+            # sama seperti tampilan sebelumnya: semua pembayaran yang pernah diajukan
+            remaining=total - float(row['payments_total']),
+            paid_installments=installments.get(row['id'], []),
+        ))
+
+    payments = [dict(row) for row in payment_rows]
+    return {
+        "loans": loans,
+        "active_payments": [p for p in payments if p['loan_status'] != 'completed'],
+        "archived_payments": [p for p in payments if p['loan_status'] == 'completed'],
+    }
+
+
+def employee_summary(employee_id):
+    """Ringkasan pinjaman karyawan (dari cache jika masih berlaku)."""
+    ttl = current_app.config['EMPLOYEE_SUMMARY_CACHE_TTL_SECONDS']
+    now = time.monotonic()
+    version = get_cache_version(cache_version_name(employee_id))
+    with _summary_lock:
+        cached = _summary_cache.get(employee_id)
+        if cached and cached[1] == version and now - cached[0] < ttl:
+            return cached[2]
+        generation = _summary_generation
+
+    summary = build_employee_summary(employee_id)
+    with _summary_lock:
+        # jangan simpan hasil yang dihitung sebelum invalidasi terakhir
+        if generation == _summary_generation:
+            _summary_cache[employee_id] = (now, version, summary)
+    return summary
+
+
+def invalidate_employee_summary(employee_ids=None):
+    """Buang ringkasan karyawan tertentu (atau semua bila None)."""
+    global _summary_generation
+    with _summary_lock:
+        _summary_generation += 1
+        if employee_ids is None:
+            _summary_cache.clear()
+            return
+        for employee_id in employee_ids:
+            _summary_cache.pop(employee_id, None)
+
+
+def cache_version_name(employee_id):
+    return f'employee_summary:{employee_id}'
+
+
+def mark_employee_summary_dirty(employee_id):
+    """Tandai ringkasan karyawan untuk dibuang saat transaksi berjalan di-commit."""
+    dirty = db.session.info.setdefault(_DIRTY_KEY, set())
+    if employee_id not in dirty:
+        bump_cache_version(cache_version_name(employee_id))
+        dirty.add(employee_id)
+
+
+@sa.event.listens_for(RoutingSession, 'after_commit')
+def _invalidate_after_commit(db_session):
+    dirty = db_session.info.pop(_DIRTY_KEY, None)
+    if dirty:
+        invalidate_employee_summary(dirty)
+
+
+@sa.event.listens_for(RoutingSession, 'after_rollback')
+def _discard_after_rollback(db_session):
+    db_session.info.pop(_DIRTY_KEY, None)
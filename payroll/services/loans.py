@@ -0,0 +1,478 @@
+"""Logika pinjaman: jadwal angsuran, angsuran yang bisa diposting, dan posting ke payroll."""
+from datetime import timedelta
+
+import sqlalchemy as sa
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
+
+from payroll.extensions import db
+from payroll.models import (
+    PAID_PAYMENT_STATUSES,
+    Loan,
+    LoanSchedule,
+    Payment,
+    PayrollLoan,
+    bump_loan_totals,
+    loan_total_deltas,
+)
+from payroll.services.employee_summary import mark_employee_summary_dirty
+from payroll.utils import add_months, parse_period_to_date, utcnow
+
+
+def calculate_loan_deduction(employee_id):
+    """
+    Menghitung total potongan cicilan dari pinjaman yang disetujui dan aktif untuk karyawan tertentu.
+    Fungsi ini juga akan menambahkan 1 pada installments_paid untuk tiap pinjaman yang aktif.
+    """
+    loans = Loan.query.filter_by(employee_id=employee_id, status='approved').all()
+    total_deduction = 0
+    for loan in loans:
+        if loan.installments_paid < loan.tenor:
+            total_deduction += loan.installment
+            loan.installments_paid += 1
+            # Jika pinjaman sudah lunas, ubah status menjadi 'completed'
+            if loan.installments_paid >= loan.tenor:
+                loan.status = 'completed'
+    mark_employee_summary_dirty(employee_id)
+    db.session.commit()
+    return total_deduction
+
+
+def postable_installments(employee_ids=None, pay_period=None):
+    """
+    Resolver massal angsuran yang siap diposting, satu query untuk semua karyawan.
+    - hanya Payment 'approved' yang belum ada di payroll_loan (anti-join NOT EXISTS)
+    - pay_period (YYYY-MM): hanya pembayaran bertanggal sampai akhir periode tsb
+    - nomor cicilan = installments_paid + ROW_NUMBER() per pinjaman (urut tanggal bayar)
+    - employee_total = SUM(nominal) per karyawan (window function)
+    Mengembalikan dict {employee_id: [dict angsuran, ...]} urut pinjaman lalu cicilan.
+    """
+    per_loan = sa.func.row_number().over(
+        partition_by=Payment.loan_id,
+        order_by=(Payment.payment_date, Payment.id),
+    )
+    stmt = (sa.select(
+                Loan.employee_id,
+                Payment.loan_id,
+                Payment.id.label('payment_id'),
+                Payment.payment_date,
+                Payment.payment_amount.label('amount'),
+                Loan.tenor,
+                (sa.func.coalesce(Loan.installments_paid, 0) + per_loan).label('number'),
+                sa.func.sum(Payment.payment_amount)
+                  .over(partition_by=Loan.employee_id).label('employee_total'))
+            .join(Loan, Loan.id == Payment.loan_id)
+            .where(Payment.status == 'approved',
+                   ~sa.exists().where(PayrollLoan.payment_id == Payment.id)))
+
+    if employee_ids is not None:
+        stmt = stmt.where(Loan.employee_id.in_(list(employee_ids)))
+    period_start = parse_period_to_date(pay_period)
+    if period_start:
+        next_month = (period_start.replace(day=28) + timedelta(days=4)).replace(day=1)
+        stmt = stmt.where(Payment.payment_date < next_month)
+
+    stmt = stmt.order_by(Loan.employee_id, Payment.loan_id, Payment.payment_date, Payment.id)
+
+    result = {}
+    for row in db.session.execute(stmt).mappings():
+        result.setdefault(row['employee_id'], []).append(dict(row))
+    return result
+
+
+def approved_payments(employee_id, pay_period=None):
+    """
+    Angsuran 'approved' milik satu karyawan yang belum masuk payroll,
+    dalam bentuk dict dari postable_installments():
+      { "payment_id", "loan_id", "number", "tenor", "payment_date", "amount", ... }
+    """
+    return postable_installments([employee_id], pay_period).get(employee_id, [])
+
+
+# === TOTAL BERJALAN PINJAMAN (paid_amount / pending_amount) ===
+# Perubahan Payment lewat ORM sudah menggeser total pinjaman (event di models.py);
+# fungsi di bawah menambah penjagaan untuk transisi yang bisa terjadi bersamaan.
+def submit_payment(loan, amount):
+    """
+    Ajukan pembayaran pending. Insert payment menaikkan pending_amount dengan
+    UPDATE atomik (sekaligus mengunci baris pinjaman); jika paid + pending lalu
+    melebihi total pinjaman, savepoint dibatalkan. Return Payment baru, atau
+    None jika melebihi sisa hutang.
+    """
+    savepoint = db.session.begin_nested()
+    payment = Payment(loan_id=loan.id, payment_amount=amount, status='pending')
+    db.session.add(payment)
+    db.session.flush()
+    if loan.paid_amount + loan.pending_amount > loan.total_amount:
+        savepoint.rollback()
+        return None
+    savepoint.commit()
+    return payment
+
+
+def set_payment_status(payment, status):
+    """
+    Ubah status payment dengan UPDATE bersyarat status lama (aman dari approve
+    ganda di dua request) lalu geser paid_amount/pending_amount pinjamannya.
+    approved <-> posted tidak mengubah total. Return False jika status tidak
+    berubah (sudah sama / sudah diubah transaksi lain).
+    """
+    old_status = payment.status
+    if old_status == status:
+        return False
+    same_status = Payment.status.is_(None) if old_status is None else Payment.status == old_status
+    result = db.session.execute(
+        sa.update(Payment)
+        .where(Payment.id == payment.id, same_status)
+        .values(status=status)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        db.session.refresh(payment)
+        return False
+
+    set_committed_value(payment, 'status', status)
+    old_paid, old_pending = loan_total_deltas(old_status, payment.payment_amount, sign=-1)
+    new_paid, new_pending = loan_total_deltas(status, payment.payment_amount)
+    bump_loan_totals(db.session.connection(), payment.loan_id,
+                     paid=old_paid + new_paid, pending=old_pending + new_pending)
+    loan = db.session.identity_map.get(identity_key(Loan, payment.loan_id))
+    if loan is not None:
+        db.session.expire(loan, ['paid_amount', 'pending_amount'])
+    return True
+
+
+def batch_set_payment_status(status, payment_ids=None, until=None):
+    """
+    Setujui/tolak banyak payment pending sekaligus di transaksi berjalan
+    (pemanggil yang commit):
+    - payment_ids: payment terpilih; until (date): semua pending s.d. tanggal tsb
+    - status payment diubah dengan satu UPDATE, total pinjaman digeser per
+      pinjaman (executemany), status lunas dihitung set-based, dan cicilan
+      jadwal dialokasikan dengan satu query
+    Return list dict {payment_id, loan_id, employee_id, amount} yang diproses.
+    ValueError jika parameter tidak valid atau payment sudah diproses admin lain.
+    """
+    if status not in ('approved', 'rejected'):
+        raise ValueError(f'status tidak dikenal: {status}')
+    if payment_ids is None and until is None:
+        raise ValueError('pilih pembayaran atau batas tanggal')
+
+    stmt = (sa.select(Payment.id.label('payment_id'), Payment.loan_id, Loan.employee_id,
+                      Payment.payment_amount.label('amount'))
+            .join(Loan, Loan.id == Payment.loan_id)
+            .where(Payment.status == 'pending')
+            .order_by(Payment.loan_id, Payment.payment_date, Payment.id))
+    if payment_ids is not None:
+        stmt = stmt.where(Payment.id.in_(sorted({int(pid) for pid in payment_ids})))
+    if until is not None:
+        stmt = stmt.where(Payment.payment_date < until + timedelta(days=1))
+    if db.engine.url.get_backend_name() == 'postgresql':
+        stmt = stmt.with_for_update(of=Payment)
+    rows = [dict(row) for row in db.session.execute(stmt).mappings()]
+    if not rows:
+        return []
+
+    ids = [row['payment_id'] for row in rows]
+    result = db.session.execute(
+        sa.update(Payment)
+        .where(Payment.id.in_(ids), Payment.status == 'pending')
+        .values(status=status)
+        .execution_options(synchronize_session='fetch')
+    )
+    if result.rowcount != len(ids):
+        raise ValueError('Sebagian pembayaran sudah diproses admin lain, silakan ulangi.')
+
+    per_loan = {}
+    for row in rows:
+        per_loan[row['loan_id']] = per_loan.get(row['loan_id'], 0.0) + row['amount']
+    loan_table = Loan.__table__
+    db.session.execute(
+        loan_table.update()
+        .where(loan_table.c.id == sa.bindparam('b_loan_id'))
+        .values(paid_amount=loan_table.c.paid_amount + sa.bindparam('b_paid'),
+                pending_amount=loan_table.c.pending_amount - sa.bindparam('b_amount')),
+        [{'b_loan_id': loan_id, 'b_amount': amount, 'b_paid': amount if status == 'approved' else 0.0}
+         for loan_id, amount in per_loan.items()],
+    )
+    for loan_id in per_loan:
+        loan = db.session.identity_map.get(identity_key(Loan, loan_id))
+        if loan is not None:
+            db.session.expire(loan, ['paid_amount', 'pending_amount', 'status'])
+
+    if status == 'approved':
+        db.session.execute(
+            sa.update(Loan)
+            .where(Loan.id.in_(list(per_loan)),
+                   Loan.status == 'approved',
+                   Loan.paid_amount >= Loan.total_amount)
+            .values(status='completed')
+            .execution_options(synchronize_session=False)
+        )
+        _allocate_batch(rows)
+    return rows
+
+
+def _allocate_batch(rows):
+    # cicilan open terkecil per pinjaman dipasangkan berurutan dengan payment (urut tanggal)
+    query = (LoanSchedule.query
+             .filter(LoanSchedule.loan_id.in_({row['loan_id'] for row in rows}),
+                     LoanSchedule.status == 'open')
+             .order_by(LoanSchedule.loan_id, LoanSchedule.installment_number))
+    if db.engine.url.get_backend_name() == 'postgresql':
+        query = query.with_for_update()
+    open_rows = {}
+    for item in query.all():
+        open_rows.setdefault(item.loan_id, []).append(item)
+    for row in rows:
+        queue = open_rows.get(row['loan_id'])
+        if queue:
+            item = queue.pop(0)
+            item.status = 'paid'
+            item.payment_id = row['payment_id']
+
+
+def _computed_totals():
+    def total(*statuses):
+        return (sa.select(sa.func.coalesce(sa.func.sum(Payment.payment_amount), 0))
+                .where(Payment.loan_id == Loan.id, Payment.status.in_(statuses))
+                .scalar_subquery())
+    return total(*PAID_PAYMENT_STATUSES), total('pending')
+
+
+def reconcile_loan_totals(dry_run=False):
+    """
+    Hitung ulang paid_amount/pending_amount dari tabel payment secara set-based
+    (satu UPDATE dengan subquery berkorelasi). Return list id pinjaman yang
+    nilainya menyimpang; dry_run hanya melaporkan.
+    """
+    paid, pending = _computed_totals()
+    drifted = sa.or_(sa.func.abs(Loan.paid_amount - paid) > 0.005,
+                     sa.func.abs(Loan.pending_amount - pending) > 0.005)
+    loan_ids = db.session.scalars(sa.select(Loan.id).where(drifted).order_by(Loan.id)).all()
+    if loan_ids and not dry_run:
+        db.session.execute(
+            sa.update(Loan)
+            .where(drifted)
+            .values(paid_amount=paid, pending_amount=pending)
+            .execution_options(synchronize_session=False)
+        )
+    return loan_ids
+
+
+def claim_approved_payments(employee_id, payment_ids):
+    """
+    Klaim Payment 'approved' milik karyawan agar tidak bisa diposting dua kali.
+    - Postgres: SELECT ... FOR UPDATE SKIP LOCKED, baris yang sedang dipegang
+      worker lain dilewati (tidak menunggu) sehingga worker paralel tidak antre.
+    - Backend lain (SQLite): UPDATE bersyarat status='approved' per baris;
+      penulisan pertama memegang write lock SQLite sampai commit, sehingga
+      posting dari thread/proses lain terserialisasi dan klaim ganda gagal.
+    Mengembalikan list Payment yang sudah berstatus 'posted' di transaksi ini.
+    """
+    ids = sorted({int(pid) for pid in payment_ids})
+    if not ids:
+        return []
+
+    base = (Payment.query
+            .join(Loan)
+            .filter(Payment.id.in_(ids),
+                    Payment.status == 'approved',
+                    Loan.employee_id == employee_id)
+            .order_by(Payment.loan_id, Payment.payment_date, Payment.id))
+
+    if db.engine.url.get_backend_name() == 'postgresql':
+        claimed = base.with_for_update(of=Payment, skip_locked=True).all()
+        for payment in claimed:
+            payment.status = 'posted'
+        return claimed
+
+    claimed_ids = []
+    for payment_id in base.with_entities(Payment.id).all():
+        result = db.session.execute(
+            sa.update(Payment)
+            .where(Payment.id == payment_id[0], Payment.status == 'approved')
+            .values(status='posted')
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 1:
+            claimed_ids.append(payment_id[0])
+    if not claimed_ids:
+        return []
+    claimed = (Payment.query
+               .filter(Payment.id.in_(claimed_ids))
+               .order_by(Payment.loan_id, Payment.payment_date, Payment.id)
+               .populate_existing()
+               .all())
+    return claimed
+
+
+def post_payments_to_payroll(payroll, payment_ids):
+    """
+    Posting angsuran terpilih ke payroll (dipanggil di dalam transaksi payroll,
+    setelah flush agar payroll.id tersedia). Pinjaman terkait dikunci FOR UPDATE
+    (urut id agar tidak deadlock) sebelum installments_paid dinaikkan, sehingga
+    nomor cicilan tetap berurutan walau beberapa worker posting bersamaan.
+    Mengembalikan total nominal angsuran yang berhasil diposting.
+    """
+    claimed = claim_approved_payments(payroll.employee_id, payment_ids)
+    if not claimed:
+        return 0.0
+    mark_employee_summary_dirty(payroll.employee_id)
+
+    loan_ids = sorted({p.loan_id for p in claimed})
+    loans_query = Loan.query.filter(Loan.id.in_(loan_ids)).order_by(Loan.id)
+    if db.engine.url.get_backend_name() == 'postgresql':
+        loans_query = loans_query.with_for_update()
+    loans_by_id = {loan.id: loan for loan in loans_query.populate_existing().all()}
+
+    total = 0.0
+    for payment in claimed:
+        loan = loans_by_id[payment.loan_id]
+        loan.installments_paid = (loan.installments_paid or 0) + 1
+        if loan.installments_paid >= loan.tenor:
+            loan.status = 'completed'
+
+        db.session.add(PayrollLoan(
+            payroll_id         = payroll.id,
+            payroll_period_start = payroll.period_start,
+            loan_id            = loan.id,
+            payment_id         = payment.id,
+            installment_number = loan.installments_paid,
+            amount             = payment.payment_amount
+        ))
+        scheduled = allocate_payment(payment)
+        if scheduled is not None:
+            scheduled.payroll_id = payroll.id
+        total += payment.payment_amount
+    return total
+
+
+def remaining_installments(employee_id):
+    """
+    Kembalikan list dict:
+    [
+      {"loan": <Loan>, "number": 3, "amount": 250000},
+      {"loan": <Loan>, "number": 4, "amount": 250000},
+      ...
+    ]
+    Hanya cicilan 'open' dari pinjaman 'approved' (dibaca dari loan_schedule).
+    """
+    rows = (LoanSchedule.query
+            .join(Loan, Loan.id == LoanSchedule.loan_id)
+            .filter(LoanSchedule.employee_id == employee_id,
+                    LoanSchedule.status == 'open',
+                    Loan.status == 'approved')
+            .order_by(LoanSchedule.loan_id, LoanSchedule.installment_number)
+            .all())
+    return [{"loan": row.loan, "number": row.installment_number, "amount": row.amount} for row in rows]
+
+
+# === JADWAL ANGSURAN (loan_schedule) ===
+def generate_loan_schedule(loan):
+    """
+    Buat jadwal angsuran pinjaman yang disetujui: satu baris per cicilan
+    (tenor), jatuh tempo mulai bulan setelah tanggal persetujuan. Tidak
+    mengubah apa-apa bila jadwal sudah ada.
+    """
+    if loan.schedule:
+        return loan.schedule
+    approved_on = (loan.approval_date or utcnow()).date()
+    first_due = add_months(approved_on, 1)
+    loan.schedule = [
+        LoanSchedule(employee_id=loan.employee_id,
+                     installment_number=number,
+                     due_period=add_months(first_due, number - 1),
+                     amount=loan.installment)
+        for number in range(1, loan.tenor + 1)
+    ]
+    return loan.schedule
+
+
+def cancel_loan_schedule(loan):
+    """Hapus cicilan yang belum dibayar (mis. pinjaman ditolak setelah disetujui)."""
+    loan.schedule = [row for row in loan.schedule if row.status != 'open']
+
+
+def allocate_payment(payment):
+    """
+    Tandai cicilan 'open' terkecil pinjaman sebagai 'paid' oleh payment ini
+    (satu payment = satu cicilan). Baris dikunci FOR UPDATE di Postgres agar
+    dua persetujuan bersamaan tidak mengambil cicilan yang sama.
+    Return baris jadwal, atau None jika pinjaman tidak punya cicilan open.
+    """
+    existing = LoanSchedule.query.filter_by(payment_id=payment.id).first()
+    if existing is not None:
+        return existing
+    query = (LoanSchedule.query
+             .filter_by(loan_id=payment.loan_id, status='open')
+             .order_by(LoanSchedule.installment_number))
+    if db.engine.url.get_backend_name() == 'postgresql':
+        query = query.with_for_update()
+    row = query.first()
+    if row is not None:
+        row.status = 'paid'
+        row.payment_id = payment.id
+    return row
+
+
+def release_payment(payment):
+    """Kembalikan cicilan yang dibayar payment ini menjadi 'open' (payment ditolak)."""
+    row = LoanSchedule.query.filter_by(payment_id=payment.id).first()
+    if row is not None:
+        row.status = 'open'
+        row.payment_id = None
+        row.payroll_id = None
+    return row
+
+
+def release_payroll_installments(payroll_id):
+    """Lepas tautan cicilan ke payroll yang dihapus (cicilan tetap 'paid')."""
+    db.session.execute(
+        sa.update(LoanSchedule)
+        .where(LoanSchedule.payroll_id == payroll_id)
+        .values(payroll_id=None)
+        .execution_options(synchronize_session='fetch')
+    )
+
+
+def installments_due(pay_period, employee_ids=None):
+    """
+    Cicilan 'open' yang jatuh tempo sampai periode (YYYY-MM), termasuk
+    tunggakan bulan sebelumnya, untuk semua karyawan dalam satu query
+    (indeks status + due_period). Return {employee_id: [dict cicilan, ...]}.
+    """
+    period_start = parse_period_to_date(pay_period)
+    if period_start is None:
+        return {}
+    stmt = (sa.select(LoanSchedule.employee_id, LoanSchedule.loan_id, LoanSchedule.id.label('schedule_id'),
+                      LoanSchedule.installment_number.label('number'), LoanSchedule.due_period,
+                      LoanSchedule.amount)
+            .where(LoanSchedule.status == 'open', LoanSchedule.due_period <= period_start)
+            .order_by(LoanSchedule.employee_id, LoanSchedule.loan_id, LoanSchedule.installment_number))
+    if employee_ids is not None:
+        stmt = stmt.where(LoanSchedule.employee_id.in_(list(employee_ids)))
+
+    result = {}
+    for row in db.session.execute(stmt).mappings():
+        result.setdefault(row['employee_id'], []).append(dict(row))
+    return result
+
+
+def loan_balances(loan_ids=None):
+    """
+    Saldo pinjaman dari jadwal: {loan_id: {"paid", "remaining", "open_count"}}
+    (agregat satu query, tanpa menjumlah Payment per pinjaman).
+    """
+    is_open = LoanSchedule.status == 'open'
+    stmt = (sa.select(LoanSchedule.loan_id,
+                      sa.func.sum(sa.case((is_open, 0), else_=LoanSchedule.amount)).label('paid'),
+                      sa.func.sum(sa.case((is_open, LoanSchedule.amount), else_=0)).label('remaining'),
+                      sa.func.sum(sa.case((is_open, 1), else_=0)).label('open_count'))
+            .group_by(LoanSchedule.loan_id))
+    if loan_ids is not None:
+        stmt = stmt.where(LoanSchedule.loan_id.in_(list(loan_ids)))
+    return {row['loan_id']: {"paid": float(row['paid'] or 0),
+                             "remaining": float(row['remaining'] or 0),
+                             "open_count": int(row['open_count'] or 0)}
+            for row in db.session.execute(stmt).mappings()}
@@ -0,0 +1,198 @@
+"""Ekspor CSV volume besar (laporan kepatuhan, ekspor bank) sebagai satu query SQL.
+
+Semua kolom (termasuk total tunjangan/potongan) dihitung di SELECT sehingga tidak
+ada objek ORM maupun akses `p.employee` per baris. Di Postgres hasilnya ditulis
+lewat `COPY (SELECT ...) TO STDOUT WITH CSV HEADER` langsung ke file tujuan; di
+backend lain baris dibaca dengan cursor ber-stream (yield_per) dan ditulis
+csv.writer per batch. iter_csv() menghasilkan potongan bytes yang langsung
+di-stream route ke klien, sehingga memori datar dan byte pertama tidak menunggu
+seluruh file selesai.
+"""
+import csv
+import io
+import queue
+import threading
+
+import sqlalchemy as sa
+
+from payroll.extensions import db
+from payroll.models import Employee, Payroll
+
+STREAM_BATCH_SIZE = 2000
+# COPY mengirim satu baris per pesan; digabung dulu supaya tidak satu write() WSGI per baris
+STREAM_CHUNK_BYTES = 64 * 1024
+# potongan yang boleh menunggu di antrean thread COPY psycopg2 (~4 MB)
+STREAM_QUEUE_CHUNKS = 64
+_DONE = object()
+
+
+def _whole(column, dialect_name):
+    """Nilai rupiah utuh (dipotong ke arah nol, sama seperti int() di Python)."""
+    value = sa.func.coalesce(column, 0)
+    if dialect_name == "postgresql":
+        value = sa.func.trunc(value)
+    return sa.cast(value, sa.BigInteger)
+
+
+def compliance_report_query(pay_period, dialect_name):
+    P = Payroll
+    tunjangan = (sa.func.coalesce(P.tunjangan_makan, 0) + sa.func.coalesce(P.tunjangan_transport, 0)
+                 + sa.func.coalesce(P.tunjangan_lainnya, 0) + sa.func.coalesce(P.thr, 0)
+                 + sa.func.coalesce(P.upah_lembur, 0))
+    return (sa.select(
+                Employee.name.label("Karyawan"),
+                Employee.nik.label("NIK"),
+                P.pay_period.label("Periode"),
+                _whole(P.gaji_pokok, dialect_name).label("Gaji Pokok"),
+                _whole(P.bpjs_ketenagakerjaan, dialect_name).label("BPJS TK"),
+                _whole(P.bpjs_kesehatan, dialect_name).label("BPJS KS"),
+                _whole(P.pph21, dialect_name).label("PPH21"),
+                _whole(tunjangan, dialect_name).label("Tunjangan"),
+                _whole(P.total_deductions, dialect_name).label("Potongan"),
+                _whole(P.take_home_pay, dialect_name).label("THP"))
+            .join(Employee, Employee.id == P.employee_id)
+            .where(P.in_period(pay_period))
+            .order_by(Employee.name, P.id))
+
+
+def bank_export_query(pay_period, dialect_name):
+    return (sa.select(
+                Employee.name.label("Nama"),
+                Employee.nik.label("NIK"),
+                sa.func.coalesce(Employee.bank_name, "").label("Nama Bank"),
+                sa.func.coalesce(Employee.no_rek, "").label("No Rekening"),
+                _whole(Payroll.take_home_pay, dialect_name).label("Jumlah Transfer"))
+            .join(Employee, Employee.id == Payroll.employee_id)
+            .where(Payroll.in_period(pay_period))
+            .order_by(Employee.name, Payroll.id))
+
+
+def _batched(chunks):
+    pending, size = [], 0
+    for chunk in chunks:
+        pending.append(chunk)
+        size += len(chunk)
+        if size >= STREAM_CHUNK_BYTES:
+            yield b"".join(pending)
+            pending, size = [], 0
+    if pending:
+        yield b"".join(pending)
+
+
+class _QueueWriter:
+    """File tujuan copy_expert (psycopg2) yang meneruskan potongan ke antrean generator."""
+
+    def __init__(self, chunks, cancelled):
+        self.chunks = chunks
+        self.cancelled = cancelled
+        self.pending = []
+        self.size = 0
+
+    def put(self, item):
+        # antrean penuh = klien lambat; berhenti menunggu bila download dibatalkan
+        while not self.cancelled.is_set():
+            try:
+                self.chunks.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+        raise RuntimeError("Ekspor CSV dibatalkan.")
+
+    def write(self, data):
+        self.pending.append(bytes(data))
+        self.size += len(data)
+        if self.size >= STREAM_CHUNK_BYTES:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            chunk, self.pending, self.size = b"".join(self.pending), [], 0
+            self.put(chunk)
+
+
+def _iter_copy_psycopg2(raw, cursor, copy_sql):
+    """copy_expert hanya bisa menulis ke file: jalankan di thread dan alirkan lewat antrean."""
+    chunks = queue.Queue(maxsize=STREAM_QUEUE_CHUNKS)
+    cancelled = threading.Event()
+    writer = _QueueWriter(chunks, cancelled)
+    failure = []
+
+    def run():
+        try:
+            cursor.copy_expert(copy_sql, writer)
+            writer.flush()
+        except Exception as exc:   # diteruskan ke thread request di bawah
+            failure.append(exc)
+        try:
+            writer.put(_DONE)
+        except RuntimeError:
+            pass
+
+    thread = threading.Thread(target=run, name="csv-copy", daemon=True)
+    thread.start()
+    try:
+        while True:
+            chunk = chunks.get()
+            if chunk is _DONE:
+                break
+            yield chunk
+        if failure:
+            raise failure[0]
+    finally:
+        if thread.is_alive():
+            # klien memutus download: hentikan COPY di server
+            cancelled.set()
+            raw.cancel()
+        thread.join()
+
+
+def _iter_copy(connection, query):
+    compiled = query.compile(dialect=connection.dialect)
+    raw = connection.connection.driver_connection
+    cursor = raw.cursor()
+    try:
+        if connection.dialect.driver == "psycopg2":
+            select_sql = cursor.mogrify(str(compiled), compiled.params)
+            copy_sql = b"COPY (" + select_sql + b") TO STDOUT WITH (FORMAT csv, HEADER)"
+            yield from _iter_copy_psycopg2(raw, cursor, copy_sql)
+        else:  # psycopg 3
+            with cursor.copy(f"COPY ({compiled}) TO STDOUT WITH (FORMAT csv, HEADER)", compiled.params) as copy:
+                yield from _batched(bytes(chunk) for chunk in copy)
+    finally:
+        cursor.close()
+
+
+def _iter_stream(connection, query):
+    result = connection.execute(query, execution_options={"yield_per": STREAM_BATCH_SIZE})
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(result.keys())
+    for rows in result.partitions():
+        writer.writerows(rows)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def iter_csv(query_factory, pay_period):
+    """
+    Potongan CSV (bytes UTF-8, dengan header) hasil `query_factory(pay_period, dialect)`.
+    Postgres + psycopg2/psycopg memakai COPY; lainnya cursor ber-stream.
+
+    Stream memakai koneksi sendiri dari bind yang sedang dirutekan (primary atau
+    replica), bukan koneksi session: response di-stream setelah view dan
+    replica_route selesai, yang me-rollback session dan mengembalikan koneksinya
+    ke pool. Koneksi ditutup saat generator selesai atau ditutup.
+    """
+    connection = db.session.get_bind().connect()
+    try:
+        dialect = connection.dialect
+        query = query_factory(pay_period, dialect.name)
+        if dialect.name == "postgresql" and dialect.driver in ("psycopg2", "psycopg"):
+            yield from _iter_copy(connection, query)
+        else:
+            yield from _iter_stream(connection, query)
+    finally:
+        connection.close()
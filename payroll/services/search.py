@@ -0,0 +1,120 @@
+"""Pencarian karyawan berdasarkan nama, NIK, posisi, dan nomor rekening.
+
+- Postgres: filter ILIKE di atas indeks GIN `pg_trgm` sehingga pola `%kata%`
+  tidak lagi men-scan seluruh tabel.
+- SQLite: tabel bayangan FTS5 (tokenizer trigram) yang disinkronkan trigger
+  pada setiap insert/update/delete employee, termasuk import massal.
+
+Jika indeks belum terpasang (extension tidak tersedia / database lama),
+pencarian tetap berjalan dengan ILIKE biasa.
+"""
+import logging
+import weakref
+
+import sqlalchemy as sa
+
+from payroll.extensions import db
+from payroll.models import Employee
+
+logger = logging.getLogger(__name__)
+
+SEARCH_COLUMNS = ('name', 'nik', 'position', 'no_rek')
+FTS_TABLE = 'employee_fts'
+# tokenizer trigram FTS5 hanya bisa mencocokkan kata kunci minimal 3 karakter
+MIN_TRIGRAM_LENGTH = 3
+# engine -> True bila tabel FTS sudah ada (hanya hasil positif yang disimpan)
+_fts_ready_engines = weakref.WeakKeyDictionary()
+
+_cols = ', '.join(SEARCH_COLUMNS)
+_new = ', '.join(f'new.{c}' for c in SEARCH_COLUMNS)
+_old = ', '.join(f'old.{c}' for c in SEARCH_COLUMNS)
+
+SQLITE_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"{_cols}, content='employee', content_rowid='id', tokenize='trigram')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON employee BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, {_cols}) VALUES (new.id, {_new}); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON employee BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_cols}) VALUES ('delete', old.id, {_old}); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON employee BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_cols}) VALUES ('delete', old.id, {_old}); "
+    f"INSERT INTO {FTS_TABLE}(rowid, {_cols}) VALUES (new.id, {_new}); END",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+POSTGRES_DDL = ["CREATE EXTENSION IF NOT EXISTS pg_trgm"] + [
+    f"CREATE INDEX IF NOT EXISTS ix_employee_{c}_trgm ON employee USING gin ({c} gin_trgm_ops)"
+    for c in SEARCH_COLUMNS
+]
+
+
+def install_search_index(connection):
+    """Pasang indeks pencarian sesuai dialect. Return False jika tidak bisa dipasang."""
+    dialect = connection.dialect.name
+    if dialect == 'sqlite':
+        for stmt in SQLITE_DDL:
+            connection.exec_driver_sql(stmt)
+        return True
+    if dialect == 'postgresql':
+        try:
+            with connection.begin_nested():
+                for stmt in POSTGRES_DDL:
+                    connection.exec_driver_sql(stmt)
+        except sa.exc.DBAPIError as exc:
+            logger.warning("Indeks trigram karyawan tidak dipasang (pg_trgm tidak tersedia): %s", exc.orig)
+            return False
+        return True
+    return False
+
+
+@sa.event.listens_for(Employee.__table__, 'after_create')
+def _create_search_index(target, connection, **kw):
+    install_search_index(connection)
+
+
+@sa.event.listens_for(Employee.__table__, 'before_drop')
+def _drop_search_index(target, connection, **kw):
+    if connection.dialect.name == 'sqlite':
+        connection.exec_driver_sql(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+        _fts_ready_engines.pop(connection.engine, None)
+
+
+def is_fts_table(name):
+    """True untuk tabel FTS karyawan beserta tabel bayangannya (employee_fts_data, dst.)."""
+    return name == FTS_TABLE or name.startswith(FTS_TABLE + '_')
+
+
+def _fts_ready(connection):
+    # cek sqlite_master sekali per engine, bukan setiap pencarian
+    if _fts_ready_engines.get(connection.engine):
+        return True
+    ready = connection.execute(
+        sa.text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": FTS_TABLE},
+    ).first() is not None
+    if ready:
+        _fts_ready_engines[connection.engine] = True
+    return ready
+
+
+def employee_search_filter(keyword, connection=None):
+    """
+    Kondisi WHERE untuk mencari karyawan dengan kata kunci (substring,
+    tidak peka huruf besar/kecil) di nama, NIK, posisi, atau nomor rekening.
+    """
+    keyword = (keyword or '').strip()
+    if connection is None:
+        connection = db.session.connection()
+
+    if (connection.dialect.name == 'sqlite'
+            and len(keyword) >= MIN_TRIGRAM_LENGTH
+            and _fts_ready(connection)):
+        phrase = '"' + keyword.replace('"', '""') + '"'
+        matches = (sa.select(sa.column('rowid'))
+                   .select_from(sa.table(FTS_TABLE))
+                   .where(sa.text(f"{FTS_TABLE} MATCH :phrase").bindparams(phrase=phrase)))
+        return Employee.id.in_(matches)
+
+    escaped = keyword.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    pattern = f"%{escaped}%"
+    return sa.or_(*(getattr(Employee, c).ilike(pattern, escape='\\') for c in SEARCH_COLUMNS))
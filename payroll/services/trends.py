@@ -0,0 +1,159 @@
+"""Tren multi-tahun payroll dari snapshot kolumnar (Parquet), tanpa query ke OLTP.
+
+Snapshot fakta payroll (lihat analytics_export.write_fact) disimpan di
+`<ANALYTICS_SNAPSHOT_DIR>/trends/v<timestamp>/`; file `CURRENT` menunjuk versi
+aktif dan diganti atomik (os.replace) setelah versi baru selesai ditulis.
+Snapshot diperbarui saat periode ditutup (payroll di-approve) lewat
+schedule_trends_refresh(), di thread latar agar request approve tidak menunggu;
+refresh itu membaca primary karena replica bisa belum memuat approve pemicunya.
+
+Halaman tren membaca snapshot dengan memory map lalu agregasi pyarrow.compute;
+hasilnya di-cache per versi sehingga request berikutnya hanya membaca dict.
+"""
+import contextlib
+import os
+import shutil
+import threading
+
+from flask import current_app
+
+from payroll.database import read_from_replica
+from payroll.services.analytics_export import write_fact
+from payroll.utils import utcnow
+
+TRENDS_DIRNAME = "trends"
+CURRENT_POINTER = "CURRENT"
+KEEP_VERSIONS = 2
+TREND_COLUMNS = ["employee_id", "status", "take_home_pay", "total_deductions", "gaji_pokok"]
+
+_refresh_lock = threading.Lock()
+_refresh_state = {"thread": None, "again": False}
+_cache_lock = threading.Lock()
+_cache = {}   # versi -> hasil compute_trends
+
+
+def trends_root(app=None):
+    return os.path.join((app or current_app).config["ANALYTICS_SNAPSHOT_DIR"], TRENDS_DIRNAME)
+
+
+def current_version(root=None):
+    root = root or trends_root()
+    try:
+        with open(os.path.join(root, CURRENT_POINTER), encoding="utf-8") as handle:
+            name = handle.read().strip()
+    except FileNotFoundError:
+        return None
+    return name if name and os.path.isdir(os.path.join(root, name)) else None
+
+
+def refresh_trends_snapshot(root=None, use_replica=True):
+    """
+    Tulis ulang fakta payroll ke versi baru lalu pindahkan pointer CURRENT. Return nama versi.
+    use_replica=False membaca primary (refresh setelah approve: di thread latar
+    tidak ada request sehingga read-your-writes tidak berlaku).
+    """
+    root = root or trends_root()
+    os.makedirs(root, exist_ok=True)
+    version = "v" + utcnow().strftime("%Y%m%d_%H%M%S_%f")
+    target = os.path.join(root, version)
+    os.makedirs(target)
+    try:
+        with read_from_replica() if use_replica else contextlib.nullcontext():
+            write_fact("payroll", target)
+    except Exception:
+        shutil.rmtree(target, ignore_errors=True)
+        raise
+    pointer = os.path.join(root, CURRENT_POINTER)
+    with open(pointer + ".tmp", "w", encoding="utf-8") as handle:
+        handle.write(version)
+    os.replace(pointer + ".tmp", pointer)
+
+    versions = sorted((name for name in os.listdir(root) if name.startswith("v")), reverse=True)
+    for old in versions[KEEP_VERSIONS:]:
+        shutil.rmtree(os.path.join(root, old), ignore_errors=True)
+    return version
+
+
+def _refresh_worker(app):
+    while True:
+        try:
+            with app.app_context():
+                refresh_trends_snapshot(trends_root(app), use_replica=False)
+        except Exception:
+            app.logger.exception("Refresh snapshot tren gagal.")
+        with _refresh_lock:
+            if not _refresh_state["again"]:
+                _refresh_state["thread"] = None
+                return
+            _refresh_state["again"] = False
+
+
+def schedule_trends_refresh():
+    """
+    Minta snapshot tren diperbarui di thread latar. Beberapa permintaan selama
+    refresh berjalan digabung menjadi satu refresh susulan.
+    """
+    app = current_app._get_current_object()
+    if not app.config.get("TRENDS_REFRESH_ON_APPROVE", True):
+        return
+    with _refresh_lock:
+        if _refresh_state["thread"] is not None:
+            _refresh_state["again"] = True
+            return
+        thread = threading.Thread(target=_refresh_worker, args=(app,), name="trends-refresh", daemon=True)
+        _refresh_state["thread"] = thread
+    thread.start()
+
+
+def compute_trends(path):
+    """Agregasi per periode dan per tahun (payroll approved) dari dataset Parquet di `path`."""
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+
+    table = pq.read_table(path, columns=TREND_COLUMNS + ["pay_period"], memory_map=True,
+                          partitioning="hive")
+    table = table.filter(pc.equal(table["status"], "approved"))
+    table = table.set_column(table.schema.get_field_index("pay_period"), "pay_period",
+                             pc.cast(table["pay_period"], "string"))
+    table = table.append_column("year", pc.utf8_slice_codeunits(table["pay_period"], 0, 4))
+    table = table.append_column("cost", pc.add(table["take_home_pay"], table["total_deductions"]))
+    aggregates = [("employee_id", "count_distinct"), ("cost", "sum"), ("total_deductions", "sum"),
+                  ("take_home_pay", "sum"), ("take_home_pay", "mean")]
+
+    def series(key):
+        grouped = table.group_by(key).aggregate(aggregates).sort_by(key)
+        return [{
+            "key": row[key],
+            "headcount": row["employee_id_count_distinct"],
+            "cost": row["cost_sum"] or 0.0,
+            "deductions": row["total_deductions_sum"] or 0.0,
+            "take_home": row["take_home_pay_sum"] or 0.0,
+            "avg_take_home": row["take_home_pay_mean"] or 0.0,
+        } for row in grouped.to_pylist()]
+
+    return {"monthly": series("pay_period"), "yearly": series("year")}
+
+
+def load_trends():
+    """
+    Tren dari snapshot aktif (di-cache per versi). Return None jika snapshot belum ada;
+    route sebaiknya memanggil schedule_trends_refresh() agar segera tersedia.
+    """
+    root = trends_root()
+    version = current_version(root)
+    if version is None:
+        return None
+    with _cache_lock:
+        cached = _cache.get(version)
+    if cached is not None:
+        return cached
+    path = os.path.join(root, version, "payroll")
+    if os.path.isdir(path):
+        trends = compute_trends(path)
+    else:  # belum ada payroll sama sekali
+        trends = {"monthly": [], "yearly": []}
+    trends["version"] = version
+    with _cache_lock:
+        _cache.clear()
+        _cache[version] = trends
+    return trends
@@ -0,0 +1,270 @@
+"""Generator data sintetis skala produksi untuk uji beban (`flask data generate`).
+
+Membuat karyawan, komponen kompensasi + assignment, payroll M periode per
+karyawan, pinjaman beserta pembayaran yang diposting ke payroll (PayrollLoan,
+loan_schedule, total berjalan pinjaman), dan audit log persetujuan.
+
+- Deterministik: seed + periode akhir yang sama menghasilkan data yang sama.
+- Baris dibangkitkan bertahap (generator) dan ditulis per chunk: Postgres
+  (psycopg2) lewat COPY ... FROM STDIN, backend lain lewat executemany insert.
+- ID ditetapkan di sini (mulai dari max(id)+1) agar relasi bisa dibangun dalam
+  satu lintasan tanpa membaca balik; sequence Postgres disetel ulang di akhir.
+  Jalankan di database uji/khusus, bukan saat aplikasi sedang menulis data.
+- Insert Core melewati event ORM, jadi paid_amount/pending_amount pinjaman
+  diisi langsung sesuai pembayaran yang dibuat.
+"""
+import csv
+import io
+import random
+from datetime import date, datetime, timedelta
+
+import sqlalchemy as sa
+
+from payroll import partitions
+from payroll.models import (
+    AuditLog,
+    CompensationComponent,
+    Employee,
+    EmployeeCompensation,
+    Loan,
+    LoanSchedule,
+    Payment,
+    Payroll,
+    PayrollLoan,
+    User,
+)
+from payroll.utils import add_months
+
+DEFAULT_CHUNK_SIZE = 20_000
+NIK_PREFIX = "SYN"
+
+FIRST_NAMES = ["Agus", "Budi", "Citra", "Dewi", "Eko", "Fitri", "Gilang", "Hendra", "Indah", "Joko",
+               "Kartika", "Lestari", "Made", "Nur", "Putri", "Rizky", "Sari", "Taufik", "Wahyu", "Yuni"]
+LAST_NAMES = ["Pratama", "Saputra", "Wijaya", "Santoso", "Hidayat", "Kusuma", "Nugroho", "Siregar",
+              "Lubis", "Setiawan", "Rahmawati", "Putra", "Utami", "Gunawan", "Halim"]
+POSITIONS = [("Staff", 4_500_000), ("Operator", 4_000_000), ("Admin", 5_000_000),
+             ("Supervisor", 8_000_000), ("Manager", 14_000_000)]
+BANKS = ["BCA", "MANDIRI", "BNI", "BRI", "CIMB"]
+COMPONENTS = [
+    ("SYN_MAKAN", "Tunjangan Makan", "tunjangan", "fixed", 600_000),
+    ("SYN_TRANSPORT", "Tunjangan Transport", "tunjangan", "fixed", 400_000),
+    ("SYN_KOPERASI", "Iuran Koperasi", "potongan", "fixed", 50_000),
+]
+
+# urutan tulis mengikuti foreign key (induk sebelum anak)
+TABLE_ORDER = [User.__table__, Employee.__table__, CompensationComponent.__table__,
+               EmployeeCompensation.__table__, Loan.__table__, Payroll.__table__, Payment.__table__,
+               PayrollLoan.__table__, LoanSchedule.__table__, AuditLog.__table__]
+
+
+class BulkWriter:
+    """Buffer baris per tabel; flush semua tabel (urut FK) saat total buffer mencapai chunk_size."""
+
+    def __init__(self, conn, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.conn = conn
+        self.chunk_size = chunk_size
+        self.use_copy = conn.dialect.name == "postgresql" and conn.dialect.driver == "psycopg2"
+        self.buffers = {table.name: [] for table in TABLE_ORDER}
+        self.columns = {}
+        self.pending = 0
+        self.counts = {table.name: 0 for table in TABLE_ORDER}
+
+    def add(self, table, row):
+        self.columns.setdefault(table.name, list(row))
+        self.buffers[table.name].append(row)
+        self.pending += 1
+        if self.pending >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        for table in TABLE_ORDER:
+            rows = self.buffers[table.name]
+            if not rows:
+                continue
+            if self.use_copy:
+                self._copy(table, rows)
+            else:
+                self.conn.execute(sa.insert(table), rows)
+            self.counts[table.name] += len(rows)
+            rows.clear()
+        self.pending = 0
+
+    def _copy(self, table, rows):
+        columns = self.columns[table.name]
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([row[c] for c in columns])
+        buffer.seek(0)
+        column_sql = ", ".join(f'"{c}"' for c in columns)
+        cursor = self.conn.connection.driver_connection.cursor()
+        try:
+            cursor.copy_expert(f'COPY "{table.name}" ({column_sql}) FROM STDIN WITH (FORMAT csv)', buffer)
+        finally:
+            cursor.close()
+
+
+def _next_id(conn, table):
+    return (conn.execute(sa.select(sa.func.max(table.c.id))).scalar() or 0) + 1
+
+
+def _reset_sequences(conn):
+    if conn.dialect.name != "postgresql":
+        return
+    for table in TABLE_ORDER:
+        sequence = conn.execute(sa.text("SELECT pg_get_serial_sequence(:t, 'id')"), {"t": f'"{table.name}"'}).scalar()
+        if sequence:
+            conn.execute(sa.text(f"SELECT setval('{sequence}', (SELECT COALESCE(MAX(id), 1) FROM \"{table.name}\"))"))
+
+
+def _plan_loan(rng, months, base_salary):
+    """(bulan mulai potongan, tenor, pokok, bunga %) atau None."""
+    tenor = rng.choice([3, 6, 10, 12])
+    if months < 2:
+        return None
+    start = rng.randrange(1, months)
+    principal = round(base_salary * rng.uniform(0.5, 2.5), -4)
+    return start, tenor, principal, rng.choice([0, 0, 5, 10])
+
+
+def generate(conn, employees, months, seed=0, end_period=None, loan_ratio=0.3,
+             chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    """
+    Bangkitkan data sintetis di `conn` (dalam transaksi pemanggil).
+    Return jumlah baris per tabel. `progress(n_karyawan_selesai)` dipanggil tiap chunk karyawan.
+    """
+    if employees < 1 or months < 1:
+        raise ValueError("Jumlah karyawan dan periode minimal 1.")
+    rng = random.Random(seed)
+    nik_prefix = f"{NIK_PREFIX}{seed}-"
+    if conn.execute(sa.select(Employee.id).where(Employee.nik.like(nik_prefix + "%")).limit(1)).first():
+        raise ValueError(f"Data sintetis dengan seed {seed} sudah ada (NIK {nik_prefix}...).")
+
+    last = end_period or date.today().replace(day=1)
+    first = add_months(last, -(months - 1))
+    periods = [add_months(first, i) for i in range(months)]
+    if partitions.is_partitioned(conn):
+        partitions.ensure_partitions(conn, from_year=first.year)
+
+    ids = {table.name: _next_id(conn, table) for table in TABLE_ORDER}
+
+    def new_id(table):
+        value = ids[table.name]
+        ids[table.name] += 1
+        return value
+
+    out = BulkWriter(conn, chunk_size)
+    T = {table.name: table for table in TABLE_ORDER}
+    user_t, emp_t, comp_t, ec_t = T["user"], T["employee"], T["compensation_component"], T["employee_compensation"]
+    loan_t, payroll_t, pay_t = T["loan"], T["payroll"], T["payment"]
+    pl_t, sched_t, audit_t = T["payroll_loan"], T["loan_schedule"], T["audit_log"]
+
+    admin_id = new_id(user_t)
+    out.add(user_t, {"id": admin_id, "fullname": f"Synthetic Admin {seed}",
+                     "email": f"synthetic-{seed}-{admin_id}@example.invalid",
+                     "password": "!", "role": "admin"})
+
+    existing_codes = set(conn.execute(sa.select(CompensationComponent.code)).scalars())
+    component_ids = []
+    for code, name, comp_type, calc_type, value in COMPONENTS:
+        if code in existing_codes:
+            component_ids.append((conn.execute(sa.select(CompensationComponent.id)
+                                               .where(CompensationComponent.code == code)).scalar(), value))
+            continue
+        component_id = new_id(comp_t)
+        out.add(comp_t, {"id": component_id, "code": code, "name": name, "comp_type": comp_type,
+                         "calc_type": calc_type, "default_value": value, "active": True,
+                         "created_at": datetime.combine(first, datetime.min.time())})
+        component_ids.append((component_id, value))
+
+    def audit(action, entity_type, entity_id, at, details=None):
+        out.add(audit_t, {"id": new_id(audit_t), "user_id": admin_id, "action": action,
+                          "entity_type": entity_type, "entity_id": entity_id,
+                          "details": details, "created_at": at})
+
+    for n in range(1, employees + 1):
+        employee_id = new_id(emp_t)
+        position, base = rng.choice(POSITIONS)
+        salary = round(base * rng.uniform(0.9, 1.3), -3)
+        hire_date = add_months(first, -rng.randrange(0, 36)) + timedelta(days=rng.randrange(0, 28))
+        out.add(emp_t, {
+            "id": employee_id, "user_id": None, "nik": f"{nik_prefix}{n:06d}",
+            "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}", "position": position,
+            "address": f"Jl. Sintetis No. {rng.randrange(1, 300)}", "phone": f"08{rng.randrange(10**9, 10**10)}",
+            "no_rek": str(rng.randrange(10**9, 10**10)), "bank_name": rng.choice(BANKS),
+            "hire_date": hire_date, "photo": None, "status": "active" if rng.random() > 0.05 else "inactive",
+        })
+        for component_id, value in component_ids:
+            if rng.random() < 0.8:
+                out.add(ec_t, {"id": new_id(ec_t), "employee_id": employee_id, "component_id": component_id,
+                               "value": value if rng.random() < 0.7 else round(value * rng.uniform(0.8, 1.5), -3),
+                               "start_period": first.strftime("%Y-%m"), "active": True})
+
+        # pinjaman: potongan mulai di periode ke-`start`, satu cicilan per periode
+        loan = None
+        plan = _plan_loan(rng, months, salary) if rng.random() < loan_ratio else None
+        if plan:
+            start, tenor, principal, rate = plan
+            total = principal * (1 + rate / 100)
+            installment = round(total / tenor, 2)
+            paid_count = min(tenor, months - start)
+            approved_at = datetime.combine(add_months(periods[start], -1), datetime.min.time()) + timedelta(days=5)
+            loan = {"id": new_id(loan_t), "start": start, "tenor": tenor, "installment": installment}
+            out.add(loan_t, {
+                "id": loan["id"], "employee_id": employee_id, "amount": principal, "tenor": tenor,
+                "interest_rate": rate, "installment": installment,
+                "status": "completed" if paid_count == tenor else "approved",
+                "application_date": approved_at - timedelta(days=3), "approval_date": approved_at,
+                "reason": "Data sintetis", "installments_paid": paid_count,
+                "paid_amount": installment * paid_count, "pending_amount": 0,
+            })
+            audit("approve_loan", "loan", loan["id"], approved_at)
+            loan["schedule"] = []
+
+        for index, period_start in enumerate(periods):
+            payroll_id = new_id(payroll_t)
+            number = index - loan["start"] + 1 if loan else 0
+            deduction = loan["installment"] if loan and 1 <= number <= loan["tenor"] else 0
+            approved_at = datetime.combine(period_start, datetime.min.time()) + timedelta(days=27)
+            bpjs_tk = round(salary * 0.02)
+            bpjs_ks = round(min(salary, 12_000_000) * 0.01)
+            out.add(payroll_t, {
+                "id": payroll_id, "employee_id": employee_id, "pay_period": period_start.strftime("%Y-%m"),
+                "period_start": period_start, "gaji_pokok": salary, "bpjs_ketenagakerjaan": bpjs_tk,
+                "bpjs_kesehatan": bpjs_ks, "tunjangan_makan": 600_000, "tunjangan_transport": 400_000,
+                "tunjangan_lainnya": rng.choice([0, 0, 0, 250_000]), "potongan_gaji": 0,
+                "alpha": 1 if rng.random() < 0.05 else 0, "hutang": 0,
+                "upah_lembur": rng.choice([0, 0, 150_000, 300_000]),
+                "thr": salary if period_start.month == 4 else 0,
+                "pph21": round(max(0, salary - 4_500_000) * 0.05), "loan_deduction": deduction,
+                "status": "approved", "approved_by": admin_id, "approved_at": approved_at,
+                "submitted_by": admin_id, "submitted_at": approved_at - timedelta(days=2),
+                "reject_reason": None, "created_at": approved_at - timedelta(days=3),
+            })
+            audit("approve_payroll", "payroll", payroll_id, approved_at, "synthetic")
+            if deduction:
+                payment_id = new_id(pay_t)
+                out.add(pay_t, {"id": payment_id, "loan_id": loan["id"], "payment_date": approved_at,
+                                "payment_amount": deduction, "status": "posted"})
+                out.add(pl_t, {"id": new_id(pl_t), "payroll_id": payroll_id, "payroll_period_start": period_start,
+                               "loan_id": loan["id"], "payment_id": payment_id, "installment_number": number,
+                               "amount": deduction})
+                loan["schedule"].append((period_start, payment_id, payroll_id))
+
+        if loan:
+            for number in range(1, loan["tenor"] + 1):
+                due = add_months(periods[loan["start"]], number - 1)
+                settled = loan["schedule"][number - 1] if number <= len(loan["schedule"]) else None
+                out.add(sched_t, {"id": new_id(sched_t), "loan_id": loan["id"], "employee_id": employee_id,
+                                  "installment_number": number, "due_period": due, "amount": loan["installment"],
+                                  "status": "paid" if settled else "open",
+                                  "payment_id": settled[1] if settled else None,
+                                  "payroll_id": settled[2] if settled else None})
+        if progress and n % 1000 == 0:
+            progress(n)
+
+    out.flush()
+    _reset_sequences(conn)
+    if conn.dialect.name == "postgresql":
+        conn.exec_driver_sql("ANALYZE")
+    return out.counts
@@ -0,0 +1,177 @@
+"""Helper murni: perhitungan payroll, parsing, dan filter template."""
+import os
+import shutil
+from datetime import datetime, date, timezone
+from decimal import Decimal
+
+
+BPJS_KETENAGAKERJAAN_RATE = float(os.getenv("BPJS_KETENAGAKERJAAN_RATE", "0.02"))
+BPJS_KESEHATAN_RATE = float(os.getenv("BPJS_KESEHATAN_RATE", "0.01"))
+BPJS_KESEHATAN_CAP = float(os.getenv("BPJS_KESEHATAN_CAP", "12000000"))
+PPH21_RATE = float(os.getenv("PPH21_RATE", "0.05"))
+PPH21_PTKP_MONTHLY = float(os.getenv("PPH21_PTKP_MONTHLY", "4500000"))
+
+
+def parse_currency(value):
+    raw = str(value or "").replace(".", "").replace(",", "").strip()
+    try:
+        return float(raw) if raw else 0.0
+    except ValueError:
+        return 0.0
+
+
+def compute_bpjs_ketenagakerjaan(gaji_pokok):
+    return round(max(0.0, gaji_pokok) * BPJS_KETENAGAKERJAAN_RATE, 2)
+
+
+def compute_bpjs_kesehatan(gaji_pokok):
+    base = max(0.0, gaji_pokok)
+    cap = BPJS_KESEHATAN_CAP
+    if cap and cap > 0:
+        base = min(base, cap)
+    return round(base * BPJS_KESEHATAN_RATE, 2)
+
+
+def compute_pph21(gross, bpjs_total):
+    taxable = max(0.0, gross - bpjs_total - PPH21_PTKP_MONTHLY)
+    return round(taxable * PPH21_RATE, 2)
+
+
+def utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def parse_period_to_date(period_str):
+    """
+    Mengubah pay_period (YYYY-MM) menjadi datetime.date, 
+    mis. "2025-03" -> date(2025, 3, 1).
+    """
+    if not period_str:
+        return None
+    try:
+        year, month = period_str.split('-')
+        return date(int(year), int(month), 1)
+    except:
+        return None
+
+
+def add_months(value, months):
+    """Tanggal 1 pada bulan ke-`months` setelah bulan `value` (boleh negatif)."""
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def months_of_service(hire_date, end_date):
+    """
+    Menghitung selisih bulan antara hire_date dan end_date.
+    Contoh:
+      hire_date=2025-01-15, end_date=2025-03-01  => 1 atau 2 bulan, 
+      tergantung logika rounding. 
+    Di sini kita buat simple: hitung selisih year * 12 + selisih month.
+    """
+    if not hire_date or not end_date:
+        return 0
+    diff_years = end_date.year - hire_date.year
+    diff_months = end_date.month - hire_date.month
+    total_months = diff_years * 12 + diff_months
+    
+    # Jika end_date harinya kurang dari hire_date, turunkan 1 bulan
+    if end_date.day < hire_date.day:
+        total_months -= 1
+    
+    return total_months if total_months > 0 else 0
+
+
+def strftime_filter(value, format_str="%d/%m/%Y"):
+    """
+    Memformat datetime/date menjadi string sesuai format_str.
+    Default: dd/mm/YYYY (contoh: 10/03/2025).
+    """
+    if not value:
+        return ""
+    return value.strftime(format_str)
+
+
+def rupiah_format(value):
+    """
+    Mengubah angka menjadi format rupiah Indonesia,
+    misalnya 5000000 -> '5.000.000'
+    Hanya menampilkan angka bulat (tanpa desimal).
+    """
+    if not value:
+        value = 0
+    try:
+        # Pastikan ke float, lalu ke int agar menghilangkan desimal
+        val = int(float(value))
+    except:
+        val = 0
+    
+    # Format dengan koma, lalu ganti koma jadi titik
+    formatted = f"{val:,}"
+    return formatted.replace(",", ".")
+
+
+def format_bytes(size):
+    if size is None:
+        return "-"
+    try:
+        value = float(size)
+    except (TypeError, ValueError):
+        return "-"
+    for unit in ("B", "KB", "MB", "GB", "TB"):
+        if value < 1024 or unit == "TB":
+            if unit == "B":
+                return f"{int(value)} {unit}"
+            return f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} TB"
+
+
+def get_disk_usage(path):
+    if not path:
+        return None
+    try:
+        usage = shutil.disk_usage(path)
+    except (FileNotFoundError, OSError):
+        return None
+    total = usage.total
+    used = usage.used
+    free = usage.free
+    percent = (used / total * 100) if total else None
+    return {
+        "total": format_bytes(total),
+        "used": format_bytes(used),
+        "free": format_bytes(free),
+        "percent": f"{percent:.1f}%" if percent is not None else "-",
+    }
+
+
+def serialize_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return value.hex()
+    return value
+
+
+def get_pdfkit_config():
+    """
+    Kembalikan konfigurasi pdfkit dengan wkhtmltopdf.
+    - Gunakan env WKHTMLTOPDF_PATH jika diset.
+    - Jika wkhtmltopdf tidak ditemukan, kembalikan None agar pemanggil bisa memberi pesan error.
+    pdfkit di-import di sini (bukan di level modul) supaya start worker tetap ringan.
+    """
+    import pdfkit
+
+    wkhtmltopdf_path = os.getenv("WKHTMLTOPDF_PATH")
+    try:
+        if wkhtmltopdf_path:
+            if os.path.isfile(wkhtmltopdf_path):
+                return pdfkit.configuration(wkhtmltopdf=wkhtmltopdf_path)
+            return None
+        # Autodetect di PATH
+        return pdfkit.configuration()
+    except Exception:
+        return None
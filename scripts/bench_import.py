@@ -0,0 +1,57 @@
+"""Ukur waktu cold start import aplikasi.
+
+Setiap percobaan dijalankan di interpreter baru agar cache modul tidak ikut
+terhitung. Contoh:
+
+    python scripts/bench_import.py --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+{stmt}
+elapsed = time.perf_counter() - start
+heavy = [m for m in ("pandas", "pdfkit", "pyarrow", "alembic", "flask_migrate") if m in sys.modules]
+print(json.dumps({{"seconds": elapsed, "heavy": heavy}}))
+"""
+
+TARGETS = {
+    "import app": "import app",
+    "create_app()": "from payroll import create_app\ncreate_app()",
+}
+
+
+def run_once(stmt):
+    env = dict(os.environ, AUTO_BACKUP_DISABLED="1")
+    env.setdefault("SQLALCHEMY_DATABASE_URI", "sqlite:///:memory:")
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE.format(stmt=stmt)],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    for label, stmt in TARGETS.items():
+        results = [run_once(stmt) for _ in range(args.runs)]
+        times = [r["seconds"] * 1000 for r in results]
+        print(
+            f"{label:<14} median {statistics.median(times):7.1f} ms  "
+            f"min {min(times):7.1f} ms  modul berat: {', '.join(results[-1]['heavy']) or '-'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
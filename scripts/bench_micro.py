@@ -0,0 +1,403 @@
+"""Micro-benchmark fungsi per baris (perhitungan payroll, parsing, filter template) + cek regresi.
+
+Setiap kasus menjalankan fungsinya untuk N baris data sintetis (default 1k, 10k,
+100k), diulang --repeat kali; yang dicatat median dan minimum waktu per baris
+(ns). Minimum dibandingkan dengan baseline JSON setelah dinormalisasi dengan loop
+kalibrasi (Python murni) yang ikut dicatat di baseline, sehingga baseline dari mesin
+lain tetap bisa dipakai. Kasus yang lebih lambat dari --threshold x baseline diukur
+ulang --confirm kali; baru dianggap regresi bila tetap lambat, dan skrip keluar
+dengan kode 1 (bisa dipakai di CI).
+
+get_component_totals diukur terhadap snapshot kompensasi yang sudah di-cache
+(jalur per baris saat export/render) di database SQLite sementara.
+
+    python scripts/bench_micro.py                         # banding dengan baseline
+    python scripts/bench_micro.py --update-baseline       # simpan hasil sebagai baseline baru
+    python scripts/bench_micro.py --filter pph21,rupiah --sizes 100000 --threshold 1.5
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DEFAULT_BASELINE = os.path.join(ROOT, "scripts", "bench_micro_baseline.json")
+DEFAULT_SIZES = "1000,10000,100000"
+COMPONENT_EMPLOYEES = 2000
+CALIBRATION_ROWS = 100_000
+
+
+# ---------- data per baris ----------
+def salaries(rng, n):
+    return [float(rng.randint(3, 40) * 500_000) for _ in range(n)]
+
+
+def dates(rng, n, start=date(2005, 1, 1), days=7300):
+    return [start + timedelta(days=rng.randrange(days)) for _ in range(n)]
+
+
+def currency_strings(rng, n):
+    # campuran format input form: "5.000.000", "5,000,000", angka polos, kosong, tidak valid
+    styles = [lambda v: f"{v:,}".replace(",", "."), lambda v: f"{v:,}", str, lambda v: "", lambda v: "abc"]
+    return [rng.choices(styles, weights=[6, 2, 2, 1, 1])[0](rng.randint(1, 80) * 250_000) for _ in range(n)]
+
+
+def periods(rng, n):
+    return [f"{rng.randint(2015, 2026)}-{rng.randint(1, 12):02d}" for _ in range(n)]
+
+
+# ---------- kasus ----------
+# tiap kasus: setup(rng, n, ctx) -> fungsi tanpa argumen yang memproses n baris
+def case_bpjs_ketenagakerjaan(rng, n, ctx):
+    from payroll.utils import compute_bpjs_ketenagakerjaan
+
+    values = salaries(rng, n)
+    return lambda: [compute_bpjs_ketenagakerjaan(v) for v in values]
+
+
+def case_bpjs_kesehatan(rng, n, ctx):
+    from payroll.utils import compute_bpjs_kesehatan
+
+    values = salaries(rng, n)
+    return lambda: [compute_bpjs_kesehatan(v) for v in values]
+
+
+def case_pph21(rng, n, ctx):
+    from payroll.utils import compute_pph21
+
+    rows = [(gross, gross * 0.03) for gross in salaries(rng, n)]
+    return lambda: [compute_pph21(gross, bpjs) for gross, bpjs in rows]
+
+
+def case_months_of_service(rng, n, ctx):
+    from payroll.utils import months_of_service
+
+    rows = list(zip(dates(rng, n), dates(rng, n, start=date(2024, 1, 1), days=900)))
+    return lambda: [months_of_service(hire, end) for hire, end in rows]
+
+
+def case_parse_currency(rng, n, ctx):
+    from payroll.utils import parse_currency
+
+    values = currency_strings(rng, n)
+    return lambda: [parse_currency(v) for v in values]
+
+
+def case_parse_period_to_date(rng, n, ctx):
+    from payroll.utils import parse_period_to_date
+
+    values = periods(rng, n)
+    return lambda: [parse_period_to_date(v) for v in values]
+
+
+def case_rupiah_format(rng, n, ctx):
+    from payroll.utils import rupiah_format
+
+    values = [v + rng.random() for v in salaries(rng, n)]
+    return lambda: [rupiah_format(v) for v in values]
+
+
+def case_strftime_filter(rng, n, ctx):
+    from payroll.utils import strftime_filter
+
+    values = dates(rng, n)
+    return lambda: [strftime_filter(v) for v in values]
+
+
+def case_render_filters(rng, n, ctx):
+    """Filter lewat Jinja (seperti tabel payroll): satu baris = rupiah x2 + strftime."""
+    template = ctx["app"].jinja_env.from_string(
+        "{% for r in rows %}<tr><td>{{ r[0]|strftime }}</td><td>{{ r[1]|rupiah }}</td>"
+        "<td>{{ r[2]|rupiah }}</td></tr>{% endfor %}")
+    rows = list(zip(dates(rng, n), salaries(rng, n), salaries(rng, n)))
+    return lambda: template.render(rows=rows)
+
+
+def case_get_component_totals(rng, n, ctx):
+    from payroll.services.compensation import get_component_totals
+
+    employee_ids, period = ctx["employee_ids"], ctx["period"]
+    rows = [rng.choice(employee_ids) for _ in range(n)]
+    get_component_totals(rows[0], period)   # isi cache snapshot dulu
+    return lambda: [get_component_totals(employee_id, period) for employee_id in rows]
+
+
+CASES = {
+    "compute_bpjs_ketenagakerjaan": case_bpjs_ketenagakerjaan,
+    "compute_bpjs_kesehatan": case_bpjs_kesehatan,
+    "compute_pph21": case_pph21,
+    "months_of_service": case_months_of_service,
+    "parse_currency": case_parse_currency,
+    "parse_period_to_date": case_parse_period_to_date,
+    "rupiah_format": case_rupiah_format,
+    "strftime_filter": case_strftime_filter,
+    "render_filters": case_render_filters,
+    "get_component_totals": case_get_component_totals,
+}
+APP_CASES = {"render_filters", "get_component_totals"}
+
+
+def seed_compensation(employees):
+    """Karyawan + komponen gaji pokok/tunjangan (fixed & persen)/potongan, assignment berjenjang."""
+    import sqlalchemy as sa
+
+    from payroll.extensions import db
+    from payroll.models import CompensationComponent, Employee, EmployeeCompensation
+
+    rng = random.Random(7)
+    components = [
+        {"id": 1, "code": "GP", "name": "Gaji Pokok", "comp_type": "gaji_pokok", "calc_type": "fixed",
+         "default_value": 5_000_000},
+        {"id": 2, "code": "TM", "name": "Tunjangan Makan", "comp_type": "tunjangan", "calc_type": "fixed",
+         "default_value": 600_000},
+        {"id": 3, "code": "TJ", "name": "Tunjangan Jabatan", "comp_type": "tunjangan", "calc_type": "percentage",
+         "default_value": 10},
+        {"id": 4, "code": "KOP", "name": "Iuran Koperasi", "comp_type": "potongan", "calc_type": "fixed",
+         "default_value": 50_000},
+    ]
+    db.session.execute(sa.insert(CompensationComponent.__table__), [dict(c, active=True) for c in components])
+    db.session.execute(sa.insert(Employee.__table__), [
+        {"id": i, "nik": f"MICRO-{i:06d}", "name": f"Karyawan {i}", "status": "active"}
+        for i in range(1, employees + 1)
+    ])
+    assignments = []
+    for employee_id in range(1, employees + 1):
+        for component in components:
+            assignments.append({"employee_id": employee_id, "component_id": component["id"],
+                                "value": None, "start_period": None, "active": True})
+        # kenaikan gaji di tengah tahun: assignment dengan start_period lebih baru
+        assignments.append({"employee_id": employee_id, "component_id": 1,
+                            "value": float(rng.randint(8, 40) * 500_000), "start_period": "2025-07",
+                            "active": True})
+    db.session.execute(sa.insert(EmployeeCompensation.__table__), assignments)
+    db.session.commit()
+    return list(range(1, employees + 1))
+
+
+def measure(run, n, repeat, min_time=0.05):
+    """
+    Median dan minimum waktu per baris (ns) dari `repeat` sampel. Seperti timeit:
+    ukuran kecil diulang beberapa kali per sampel (>= min_time detik) dan GC dimatikan.
+    """
+    started = time.perf_counter()
+    run()   # pemanasan sekaligus menaksir jumlah ulangan per sampel
+    loops = max(1, int(min_time / max(time.perf_counter() - started, 1e-9)))
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter_ns()
+            for _ in range(loops):
+                run()
+            samples.append((time.perf_counter_ns() - started) / (n * loops))
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return {"median_ns": round(statistics.median(samples), 1), "min_ns": round(min(samples), 1)}
+
+
+def calibration_loop():
+    """Beban tetap (aritmetika float, format string, dict) untuk menaksir kecepatan mesin."""
+    rows = [(i * 37 % 1000) * 1500.0 for i in range(CALIBRATION_ROWS)]
+
+    def run():
+        totals = {}
+        for value in rows:
+            key = f"{value % 7:.0f}"
+            totals[key] = totals.get(key, 0.0) + value * 0.05 - min(value, 12_000.0)
+        return totals
+    return run
+
+
+def calibrate(repeat):
+    return measure(calibration_loop(), CALIBRATION_ROWS, repeat)["min_ns"]
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold, scale=1.0, quiet=False):
+    """
+    Return daftar (kunci, ns sekarang, ns baseline, rasio) yang melewati threshold.
+    Yang dibandingkan min_ns (paling tahan gangguan proses lain); ns baseline
+    dikalikan `scale` (kalibrasi sekarang / kalibrasi baseline).
+    """
+    regressions = []
+    if not quiet:
+        print(f"\n{'kasus':<40} {'baseline':>10} {'sekarang':>10} {'rasio':>7}")
+    for key, stats in results.items():
+        old = baseline.get("results", {}).get(key)
+        if not old or not old.get("min_ns"):
+            if not quiet:
+                print(f"{key:<40} {'-':>10} {stats['min_ns']:>10.1f} {'baru':>7}")
+            continue
+        expected = old["min_ns"] * scale
+        ratio = stats["min_ns"] / expected
+        if not quiet:
+            flag = "  REGRESI?" if ratio > threshold else ""
+            print(f"{key:<40} {expected:>10.1f} {stats['min_ns']:>10.1f} {ratio:>6.2f}x{flag}")
+        if ratio > threshold:
+            regressions.append((key, stats["min_ns"], expected, ratio))
+    return regressions
+
+
+def confirm_regressions(regressions, results, baseline, threshold, scale, rounds, rerun):
+    """Ukur ulang kasus yang melewati threshold; yang tetap lambat di setiap putaran adalah regresi."""
+    for round_no in range(1, rounds + 1):
+        if not regressions:
+            break
+        print(f"\nKonfirmasi {round_no}/{rounds}: ukur ulang {len(regressions)} kasus")
+        for key, *_ in regressions:
+            again = rerun(key)
+            # ambil yang tercepat: gangguan sesaat hanya bisa memperlambat
+            if again["min_ns"] < results[key]["min_ns"]:
+                results[key] = dict(results[key], min_ns=again["min_ns"])
+        regressions = compare({key: results[key] for key, *_ in regressions}, baseline, threshold, scale,
+                              quiet=True)
+        for key, now, expected, ratio in regressions:
+            print(f"{key:<40} {expected:>10.1f} {now:>10.1f} {ratio:>6.2f}x")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Jumlah baris per kasus, dipisah koma.")
+    parser.add_argument("--repeat", type=int, default=7, help="Putaran terukur per kasus/ukuran.")
+    parser.add_argument("--filter", help="Hanya kasus yang namanya memuat salah satu kata ini (dipisah koma).")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="File JSON baseline.")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="Rasio min ns/baris terhadap baseline yang dianggap regresi.")
+    parser.add_argument("--confirm", type=int, default=2,
+                        help="Berapa kali kasus yang melewati threshold diukur ulang sebelum dianggap regresi.")
+    parser.add_argument("--update-baseline", action="store_true", help="Tulis hasil ke file baseline.")
+    parser.add_argument("--output", help="Tulis hasil JSON ke file ini.")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    words = [word.strip() for word in (args.filter or "").split(",") if word.strip()]
+    selected = [name for name in CASES if not words or any(word in name for word in words)]
+    if not selected:
+        raise SystemExit(f"Tidak ada kasus yang cocok; pilihan: {', '.join(CASES)}")
+
+    baseline = None
+    if not args.update_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+
+    calibration_ns = calibrate(args.repeat)
+    print(f"kalibrasi mesin: {calibration_ns:.1f} ns/iterasi\n")
+
+    ctx = {}
+    tmpdir = None
+    if APP_CASES.intersection(selected):
+        os.environ.setdefault("AUTO_BACKUP_DISABLED", "1")
+        from payroll import create_app
+        from payroll.extensions import db
+
+        tmpdir = tempfile.TemporaryDirectory(prefix="bench_micro_")
+        sqlite_path = os.path.join(tmpdir.name, "bench.db")
+        app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{sqlite_path}", "SQLALCHEMY_ENGINE_OPTIONS": {},
+                          "AUTO_BACKUP_WORKER": False, "COMPENSATION_CACHE_TTL_SECONDS": 3600})
+        app_ctx = app.app_context()
+        app_ctx.push()
+        db.create_all()
+        ctx.update(app=app, period="2025-09", employee_ids=seed_compensation(COMPONENT_EMPLOYEES))
+
+    def run_case(key):
+        name, size = key[:-1].split("[")
+        size = int(size)
+        return measure(CASES[name](random.Random(args.seed), size, ctx), size, args.repeat)
+
+    results = {}
+    regressions = []
+    try:
+        print(f"{'kasus':<40} {'median ns/baris':>16} {'min ns/baris':>14} {'total ms':>10}")
+        for name in selected:
+            for size in sizes:
+                key = f"{name}[{size}]"
+                stats = results[key] = run_case(key)
+                print(f"{key:<40} {stats['median_ns']:>16.1f} {stats['min_ns']:>14.1f} "
+                      f"{stats['median_ns'] * size / 1e6:>10.2f}")
+
+        if baseline is not None:
+            # baseline lama tanpa kalibrasi: anggap mesin sama cepat
+            scale = calibration_ns / baseline["meta"].get("calibration_ns", calibration_ns)
+            print(f"\nBanding dengan baseline commit {baseline['meta'].get('commit')} "
+                  f"(python {baseline['meta'].get('python')}), threshold {args.threshold:.2f}x, "
+                  f"skala mesin {scale:.2f}x")
+            regressions = compare(results, baseline, args.threshold, scale)
+            # dalam try: kasus berbasis app masih butuh database sementara
+            regressions = confirm_regressions(regressions, results, baseline, args.threshold, scale,
+                                              args.confirm, run_case)
+    finally:
+        if ctx:
+            db.session.remove()
+            db.engine.dispose()
+            app_ctx.pop()
+        if tmpdir is not None:
+            tmpdir.cleanup()
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "platform": sys.platform,
+            "repeat": args.repeat,
+            "seed": args.seed,
+            "calibration_ns": calibration_ns,
+        },
+        "results": results,
+    }
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+
+    if args.update_baseline:
+        baseline = {"meta": report["meta"], "results": {}}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as handle:
+                previous = json.load(handle)
+            # pertahankan kasus/ukuran yang tidak dijalankan kali ini, diskalakan ke kalibrasi baru
+            scale = calibration_ns / previous["meta"].get("calibration_ns", calibration_ns)
+            baseline["results"] = {
+                key: {field: round(value * scale, 1) for field, value in stats.items()}
+                for key, stats in previous.get("results", {}).items()
+            }
+        baseline["results"].update(results)
+        baseline["results"] = dict(sorted(baseline["results"].items()))
+        with open(args.baseline, "w", encoding="utf-8") as handle:
+            json.dump(baseline, handle, indent=2)
+            handle.write("\n")
+        print(f"\nBaseline ditulis ke {args.baseline}")
+        return 0
+
+    if baseline is None:
+        print(f"\nBaseline {args.baseline} belum ada; jalankan dengan --update-baseline.")
+        return 0
+    if regressions:
+        print(f"\n{len(regressions)} kasus tetap melambat melewati threshold setelah {args.confirm} kali ukur ulang.")
+        return 1
+    print("\nTidak ada regresi.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
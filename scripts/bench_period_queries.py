@@ -0,0 +1,144 @@
+"""Bandingkan query periode lama (substr/cast pay_period) vs period_start ber-indeks.
+
+Data sintetis multi-tahun dibuat di SQLite sementara (default) atau di schema
+sementara Postgres (--url postgresql://...), lalu dihapus setelah selesai.
+
+    python scripts/bench_period_queries.py --employees 500 --years 6
+    python scripts/bench_period_queries.py --url postgresql+psycopg2://payroll@localhost/payroll
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import date
+
+import sqlalchemy as sa
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from payroll.extensions import db  # noqa: E402
+from payroll.models import Employee, Payroll, User  # noqa: E402
+
+
+def seed(conn, employees, years, last_year):
+    conn.execute(sa.insert(Employee.__table__), [
+        {"nik": f"BENCH-{i:06d}", "name": f"Karyawan {i}", "status": "active"}
+        for i in range(1, employees + 1)
+    ])
+    employee_ids = conn.execute(sa.select(Employee.id)).scalars().all()
+    rng = random.Random(42)
+    rows = []
+    for year in range(last_year - years + 1, last_year + 1):
+        for month in range(1, 13):
+            for employee_id in employee_ids:
+                rows.append({
+                    "employee_id": employee_id,
+                    "pay_period": f"{year}-{month:02d}",
+                    "period_start": date(year, month, 1),
+                    "gaji_pokok": rng.randint(4, 20) * 500_000,
+                    "bpjs_ketenagakerjaan": 0, "bpjs_kesehatan": 0, "tunjangan_makan": 0,
+                    "tunjangan_transport": 0, "tunjangan_lainnya": 0, "potongan_gaji": 0,
+                    "alpha": 0, "hutang": 0, "upah_lembur": 0, "thr": 0, "pph21": 0,
+                    "loan_deduction": 0, "status": "approved",
+                })
+            if len(rows) >= 20_000:
+                conn.execute(sa.insert(Payroll.__table__), rows)
+                rows = []
+    if rows:
+        conn.execute(sa.insert(Payroll.__table__), rows)
+
+
+def timed(conn, stmt, runs):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        conn.execute(stmt).all()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def plan(conn, stmt):
+    compiled = stmt.compile(conn, compile_kwargs={"literal_binds": True})
+    prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+    rows = conn.exec_driver_sql(prefix + str(compiled)).all()
+    return " | ".join(str(r[-1]) for r in rows)
+
+
+def cases(year):
+    # (nama, query lama, query baru)
+    old_year = sa.func.substr(Payroll.pay_period, 1, 4) == str(year)
+    new_year = Payroll.in_year(year)
+    old_range = sa.cast(Payroll.pay_period + '-01', sa.Date).between(date(year, 1, 1), date(year, 6, 1))
+    new_range = Payroll.period_start.between(date(year, 1, 1), date(year, 6, 1))
+    monthly = (sa.func.sum(Payroll.gaji_pokok), sa.func.avg(Payroll.take_home_pay))
+    return [
+        ("ringkasan per bulan (1 tahun)",
+         sa.select(Payroll.pay_period, *monthly).where(old_year).group_by(Payroll.pay_period),
+         sa.select(Payroll.period_start, *monthly).where(new_year).group_by(Payroll.period_start)),
+        ("total Jan-Jun",
+         sa.select(sa.func.sum(Payroll.gaji_pokok)).where(old_range),
+         sa.select(sa.func.sum(Payroll.gaji_pokok)).where(new_range)),
+        ("periode terakhir",
+         sa.select(sa.func.max(Payroll.pay_period)),
+         sa.select(sa.func.max(Payroll.period_start))),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="URL database (default: SQLite sementara)")
+    parser.add_argument("--employees", type=int, default=500)
+    parser.add_argument("--years", type=int, default=6)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    last_year = date.today().year
+    schema = None
+    tmpdir = None
+    if args.url:
+        url = args.url
+        schema = f"bench_period_{uuid.uuid4().hex[:8]}"
+        admin = sa.create_engine(url)
+        with admin.begin() as conn:
+            conn.exec_driver_sql(f'CREATE SCHEMA "{schema}"')
+        engine = sa.create_engine(url, connect_args={"options": f"-csearch_path={schema}"})
+    else:
+        tmpdir = tempfile.TemporaryDirectory(prefix="bench_period_")
+        engine = sa.create_engine(f"sqlite:///{os.path.join(tmpdir.name, 'bench.db')}")
+
+    try:
+        db.metadata.create_all(engine, tables=[User.__table__, Employee.__table__, Payroll.__table__])
+        started = time.perf_counter()
+        with engine.begin() as conn:
+            seed(conn, args.employees, args.years, last_year)
+        with engine.begin() as conn:
+            if engine.dialect.name == "postgresql":
+                conn.exec_driver_sql("ANALYZE payroll")
+            else:
+                conn.exec_driver_sql("ANALYZE")
+        total = args.employees * args.years * 12
+        print(f"{engine.dialect.name}: {total} baris payroll ({args.years} tahun) "
+              f"dibuat dalam {time.perf_counter() - started:.1f} dtk\n")
+
+        with engine.connect() as conn:
+            for name, old, new in cases(last_year - 1):
+                old_ms, new_ms = timed(conn, old, args.runs), timed(conn, new, args.runs)
+                print(f"{name}: lama {old_ms:8.2f} ms  baru {new_ms:8.2f} ms  ({old_ms / max(new_ms, 1e-6):.1f}x)")
+                print(f"  plan lama: {plan(conn, old)}")
+                print(f"  plan baru: {plan(conn, new)}")
+    finally:
+        engine.dispose()
+        if schema:
+            with admin.begin() as conn:
+                conn.exec_driver_sql(f'DROP SCHEMA "{schema}" CASCADE')
+            admin.dispose()
+        if tmpdir is not None:
+            tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+"""Benchmark latensi route: p50/p95/p99, throughput, dan jumlah query per route ke JSON.
+
+Default memakai Flask test client di proses ini terhadap database dari env
+(DATABASE_URL / SQLALCHEMY_DATABASE_URI); isi dulu dengan `flask data generate`.
+Mode --base-url memukul server yang sedang jalan (login lewat form; jumlah query
+tidak tersedia). `{period}` di path diganti periode payroll terbaru.
+
+    flask --app app data generate --employees 2000 --months 24
+    python scripts/bench_routes.py --requests 500 --output bench/before.json
+    python scripts/bench_routes.py --requests 500 --output bench/after.json --compare bench/before.json
+    python scripts/bench_routes.py --mix "/payrolls=3,/dashboard=1" --concurrency 4
+"""
+import argparse
+import http.cookiejar
+import json
+import os
+import queue
+import random
+import re
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DEFAULT_MIX = ",".join([
+    "/=2",
+    "/dashboard=2",
+    "/payrolls=4",
+    "/payrolls?pay_period={period}=2",
+    "/loans=2",
+    "/employee_dashboard=2",
+    "/reports/compliance?pay_period={period}=1",
+    "/reports/bank_export?pay_period={period}&file_format=csv=1",
+    "/export/payrolls/excel?pay_period={period}=1",
+])
+# route yang dibuka sebagai karyawan (bukan admin)
+EMPLOYEE_ROUTES = ("/employee_dashboard",)
+BENCH_EMPLOYEE_EMAIL = "bench-employee@example.invalid"
+
+
+def parse_mix(value):
+    """'/a=3,/b?x=1=2' -> [('/a', 3), ('/b?x=1', 2)]; bobot = angka setelah '=' terakhir."""
+    mix = []
+    for item in value.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        path, sep, weight = item.rpartition("=")
+        if not sep or not weight.isdigit():
+            path, weight = item, "1"
+        mix.append((path, int(weight)))
+    return mix
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile dari list terurut."""
+    if not sorted_values:
+        return None
+    rank = max(1, int(round(pct / 100 * len(sorted_values) + 0.4999)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(samples, elapsed):
+    """samples: list (ms, queries, status) -> ringkasan statistik."""
+    times = sorted(s[0] for s in samples)
+    queries = [s[1] for s in samples if s[1] is not None]
+    errors = sum(1 for s in samples if not 200 <= s[2] < 300)
+    return {
+        "count": len(samples),
+        "errors": errors,
+        "p50_ms": round(percentile(times, 50), 2),
+        "p95_ms": round(percentile(times, 95), 2),
+        "p99_ms": round(percentile(times, 99), 2),
+        "mean_ms": round(sum(times) / len(times), 2),
+        "max_ms": round(times[-1], 2),
+        "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else None,
+        "queries_mean": round(sum(queries) / len(queries), 2) if queries else None,
+        "queries_max": max(queries) if queries else None,
+    }
+
+
+# ---------- mode test client ----------
+class QueryCounter:
+    def __init__(self, engines):
+        import sqlalchemy as sa
+
+        self.local = threading.local()
+        for engine in engines:
+            sa.event.listen(engine, "before_cursor_execute", self._count)
+
+    def _count(self, *args):
+        self.local.count = getattr(self.local, "count", 0) + 1
+
+    def reset(self):
+        self.local.count = 0
+
+    @property
+    def value(self):
+        return getattr(self.local, "count", 0)
+
+
+def prepare_app():
+    """App + user admin/karyawan untuk login dan periode terbaru."""
+    os.environ.setdefault("AUTO_BACKUP_DISABLED", "1")
+    import sqlalchemy as sa
+    from werkzeug.security import generate_password_hash
+
+    from payroll import create_app
+    from payroll.extensions import db
+    from payroll.models import Employee, Loan, Payroll, User
+
+    app = create_app({"AUTO_BACKUP_WORKER": False, "TRENDS_REFRESH_ON_APPROVE": False})
+    with app.app_context():
+        admin = User.query.filter_by(role="admin").order_by(User.id).first()
+        if admin is None:
+            raise SystemExit("Tidak ada user admin; jalankan `flask data generate` atau seed_admin.py dulu.")
+        admin_id = admin.id
+        employee = (Employee.query.join(Loan, Loan.employee_id == Employee.id).order_by(Employee.id).first()
+                    or Employee.query.order_by(Employee.id).first())
+        employee_user_id = None
+        if employee is not None:
+            if employee.user_id is None:
+                # karyawan untuk /employee_dashboard (hanya menambah user di database benchmark)
+                user = User.query.filter_by(email=BENCH_EMPLOYEE_EMAIL).first()
+                if user is None:
+                    user = User(fullname=employee.name, email=BENCH_EMPLOYEE_EMAIL,
+                                password=generate_password_hash("bench"), role="user")
+                    db.session.add(user)
+                    db.session.flush()
+                employee.user_id = user.id
+                db.session.commit()
+            employee_user_id = employee.user_id
+        latest = db.session.scalar(sa.select(sa.func.max(Payroll.period_start)))
+        period = latest.strftime("%Y-%m") if latest else datetime.now().strftime("%Y-%m")
+        counter = QueryCounter(db.engines.values())
+        backend = db.engine.url.get_backend_name()
+    return app, admin_id, employee_user_id, period, counter, backend
+
+
+def test_client_runner(app, admin_id, employee_user_id, counter):
+    def login(user_id, role):
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess["user_id"] = user_id
+            sess["role"] = role
+            sess["user_name"] = "Bench"
+        return client
+
+    clients = {"admin": login(admin_id, "admin")}
+    if employee_user_id:
+        clients["user"] = login(employee_user_id, "user")
+
+    def run(path):
+        client = clients["user" if path.startswith(EMPLOYEE_ROUTES) and "user" in clients else "admin"]
+        counter.reset()
+        start = time.perf_counter()
+        resp = client.get(path)
+        resp.get_data()
+        elapsed = (time.perf_counter() - start) * 1000
+        resp.close()
+        return elapsed, counter.value, resp.status_code
+    return run
+
+
+# ---------- mode server (--base-url) ----------
+def http_runner(base_url, admin, employee):
+    def login(credentials):
+        jar = http.cookiejar.CookieJar()
+        opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(jar))
+        if credentials:
+            page = opener.open(base_url + "/login").read().decode("utf-8", "replace")
+            token = re.search(r'name="csrf-token" content="([^"]+)"', page)
+            data = urllib.parse.urlencode({"email": credentials[0], "password": credentials[1],
+                                           "csrf_token": token.group(1) if token else ""}).encode()
+            opener.open(base_url + "/login", data=data).read()
+        return opener
+
+    openers = {"admin": login(admin)}
+    if employee:
+        openers["user"] = login(employee)
+
+    def run(path):
+        opener = openers["user" if path.startswith(EMPLOYEE_ROUTES) and "user" in openers else "admin"]
+        start = time.perf_counter()
+        try:
+            with opener.open(base_url + path) as resp:
+                resp.read()
+                status = resp.status
+        except urllib.error.HTTPError as exc:
+            status = exc.code
+        return (time.perf_counter() - start) * 1000, None, status
+    return run
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, baseline_path):
+    with open(baseline_path, encoding="utf-8") as handle:
+        baseline = json.load(handle)
+    print(f"\nBanding dengan {baseline_path} (commit {baseline['meta'].get('commit')}):")
+    print(f"{'route':<56} {'p50':>16} {'p95':>16} {'query':>12}")
+    for route, stats in current["routes"].items():
+        old = baseline["routes"].get(route)
+        if not old:
+            continue
+
+        def delta(key):
+            if old.get(key) in (None, 0) or stats.get(key) is None:
+                return "-"
+            return f"{stats[key]:.1f} ({(stats[key] - old[key]) / old[key] * 100:+.0f}%)"
+        print(f"{route[:56]:<56} {delta('p50_ms'):>16} {delta('p95_ms'):>16} {delta('queries_mean'):>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Daftar path=bobot dipisah koma.")
+    parser.add_argument("--requests", type=int, default=200, help="Jumlah request terukur.")
+    parser.add_argument("--warmup", type=int, default=1, help="Putaran pemanasan per route (tidak diukur).")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0, help="Seed urutan request.")
+    parser.add_argument("--output", help="Tulis hasil JSON ke file ini.")
+    parser.add_argument("--compare", help="File JSON hasil sebelumnya untuk dibandingkan.")
+    parser.add_argument("--base-url", help="Server yang sedang jalan, mis. http://localhost:5000.")
+    parser.add_argument("--period", help="Nilai {period} (mode --base-url wajib diisi).")
+    parser.add_argument("--admin", help="email:password admin (mode --base-url).")
+    parser.add_argument("--employee", help="email:password karyawan (mode --base-url).")
+    args = parser.parse_args()
+
+    if args.base_url:
+        split = lambda value: tuple(value.split(":", 1)) if value else None  # noqa: E731
+        period, backend = args.period or datetime.now().strftime("%Y-%m"), None
+        make_runner = lambda: http_runner(args.base_url.rstrip("/"), split(args.admin), split(args.employee))  # noqa: E731
+    else:
+        app, admin_id, employee_user_id, period, counter, backend = prepare_app()
+        period = args.period or period
+        make_runner = lambda: test_client_runner(app, admin_id, employee_user_id, counter)  # noqa: E731
+
+    mix = [(template.replace("{period}", period), template, weight) for template, weight in parse_mix(args.mix)]
+    rng = random.Random(args.seed)
+    plan = rng.choices(mix, weights=[m[2] for m in mix], k=args.requests)
+
+    samples = {template: [] for _, template, _ in mix}
+    lock = threading.Lock()
+    work = queue.Queue()
+    for item in plan:
+        work.put(item)
+
+    def worker():
+        run = make_runner()
+        for path, _, _ in mix * max(0, args.warmup):
+            run(path)
+        while True:
+            try:
+                path, template, _ = work.get_nowait()
+            except queue.Empty:
+                return
+            result = run(path)
+            with lock:
+                samples[template].append(result)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(max(1, args.concurrency))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    result = {
+        "meta": {
+            "commit": git_commit(),
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "mode": "http" if args.base_url else "test_client",
+            "backend": backend,
+            "period": period,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "elapsed_s": round(elapsed, 3),
+        },
+        "routes": {template: summarize(values, elapsed) for template, values in samples.items() if values},
+        "total": summarize([s for values in samples.values() for s in values], elapsed),
+    }
+    # throughput per route = laju route itu dalam campuran; total = seluruh request / waktu dinding
+
+    print(f"{'route':<56} {'n':>5} {'p50':>8} {'p95':>8} {'p99':>8} {'rps':>7} {'query':>6} {'err':>4}")
+    for template, stats in list(result["routes"].items()) + [("TOTAL", result["total"])]:
+        queries = "-" if stats["queries_mean"] is None else f"{stats['queries_mean']:.1f}"
+        print(f"{template[:56]:<56} {stats['count']:>5} {stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} "
+              f"{stats['p99_ms']:>8.1f} {stats['throughput_rps']:>7.1f} {queries:>6} {stats['errors']:>4}")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(result, handle, indent=2)
+        print(f"\nHasil ditulis ke {args.output}")
+    if args.compare:
+        compare(result, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""Throughput baca/tulis bersamaan di SQLite: PRAGMA bawaan vs mode performa (SQLITE_PRAGMAS).
+
+Setiap mode memakai file SQLite sementara yang diisi data sama, lalu beberapa
+thread pembaca (agregat per periode + halaman daftar payroll) dan penulis
+(update kecil per transaksi, seperti approve/edit payroll) berjalan bersamaan
+selama --seconds detik. Dilaporkan operasi/detik, p95 latensi, dan error
+"database is locked".
+
+    python scripts/bench_sqlite.py --readers 4 --writers 2 --seconds 10
+"""
+import argparse
+import functools
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import date
+
+import sqlalchemy as sa
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from payroll.config import build_engine_options, build_sqlite_pragmas  # noqa: E402
+from payroll.database import apply_sqlite_pragmas  # noqa: E402
+from payroll.extensions import db  # noqa: E402
+from payroll.models import Employee, Payroll, User  # noqa: E402
+
+
+def seed(engine, employees, months):
+    db.metadata.create_all(engine, tables=[User.__table__, Employee.__table__, Payroll.__table__])
+    rng = random.Random(42)
+    with engine.begin() as conn:
+        conn.execute(sa.insert(Employee.__table__), [
+            {"nik": f"BENCH-{i:06d}", "name": f"Karyawan {i}", "status": "active"}
+            for i in range(1, employees + 1)
+        ])
+        employee_ids = conn.execute(sa.select(Employee.id)).scalars().all()
+        periods = []
+        for index in range(months):
+            start = date(2020 + index // 12, index % 12 + 1, 1)
+            periods.append(start)
+            conn.execute(sa.insert(Payroll.__table__), [{
+                "employee_id": employee_id,
+                "pay_period": start.strftime("%Y-%m"),
+                "period_start": start,
+                "gaji_pokok": rng.randint(4, 20) * 500_000,
+                "bpjs_ketenagakerjaan": 0, "bpjs_kesehatan": 0, "tunjangan_makan": 0,
+                "tunjangan_transport": 0, "tunjangan_lainnya": 0, "potongan_gaji": 0,
+                "alpha": 0, "hutang": 0, "upah_lembur": 0, "thr": 0, "pph21": 0,
+                "loan_deduction": 0, "status": "approved",
+            } for employee_id in employee_ids])
+        max_id = conn.execute(sa.select(sa.func.max(Payroll.id))).scalar()
+    return periods, max_id
+
+
+def reader(engine, periods, stop, stats, rng):
+    monthly = (sa.select(sa.func.count(), sa.func.sum(Payroll.gaji_pokok), sa.func.avg(Payroll.take_home_pay))
+               .where(Payroll.period_start == sa.bindparam("period")))
+    page = (sa.select(Payroll.id, Payroll.employee_id, Employee.name, Payroll.take_home_pay)
+            .join(Employee, Employee.id == Payroll.employee_id)
+            .where(Payroll.period_start == sa.bindparam("period"))
+            .order_by(Payroll.id).limit(50).offset(sa.bindparam("offset")))
+    while not stop.is_set():
+        period = rng.choice(periods)
+        started = time.perf_counter()
+        try:
+            with engine.connect() as conn:
+                conn.execute(monthly, {"period": period}).one()
+                conn.execute(page, {"period": period, "offset": rng.randrange(0, 500)}).all()
+        except sa.exc.OperationalError:
+            stats["errors"] += 1
+            continue
+        stats["latencies"].append((time.perf_counter() - started) * 1000)
+
+
+def writer(engine, max_id, stop, stats, rng):
+    update = (sa.update(Payroll.__table__)
+              .where(Payroll.id == sa.bindparam("row_id"))
+              .values(tunjangan_lainnya=sa.bindparam("value")))
+    while not stop.is_set():
+        rows = [{"row_id": rng.randint(1, max_id), "value": rng.randint(0, 20) * 50_000} for _ in range(20)]
+        started = time.perf_counter()
+        try:
+            with engine.begin() as conn:
+                conn.execute(update, rows)
+        except sa.exc.OperationalError:
+            stats["errors"] += 1
+            continue
+        stats["latencies"].append((time.perf_counter() - started) * 1000)
+
+
+def p95(values):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * 0.95))]
+
+
+def run_mode(name, pragmas, args):
+    tmpdir = tempfile.TemporaryDirectory(prefix="bench_sqlite_")
+    url = f"sqlite:///{os.path.join(tmpdir.name, 'bench.db')}"
+    engine = sa.create_engine(url, **build_engine_options(url))
+    if pragmas:
+        sa.event.listen(engine, "connect", functools.partial(apply_sqlite_pragmas, pragmas))
+    try:
+        periods, max_id = seed(engine, args.employees, args.months)
+        stop = threading.Event()
+        read_stats = [{"latencies": [], "errors": 0} for _ in range(args.readers)]
+        write_stats = [{"latencies": [], "errors": 0} for _ in range(args.writers)]
+        threads = [threading.Thread(target=reader, args=(engine, periods, stop, stats, random.Random(i)))
+                   for i, stats in enumerate(read_stats)]
+        threads += [threading.Thread(target=writer, args=(engine, max_id, stop, stats, random.Random(100 + i)))
+                    for i, stats in enumerate(write_stats)]
+        for thread in threads:
+            thread.start()
+        time.sleep(args.seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        def total(group):
+            latencies = [value for stats in group for value in stats["latencies"]]
+            return {"ops_s": len(latencies) / args.seconds, "p95_ms": p95(latencies),
+                    "errors": sum(stats["errors"] for stats in group)}
+        with engine.connect() as conn:
+            journal = conn.exec_driver_sql("PRAGMA journal_mode").scalar()
+        return {"mode": name, "journal": journal, "read": total(read_stats), "write": total(write_stats)}
+    finally:
+        engine.dispose()
+        # sekaligus membuang file -wal/-shm/-journal
+        tmpdir.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--employees", type=int, default=2000)
+    parser.add_argument("--months", type=int, default=12)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+
+    pragmas = build_sqlite_pragmas()
+    if not pragmas:
+        raise SystemExit("SQLITE_PERFORMANCE_MODE=0; tidak ada yang dibandingkan.")
+    print(f"{args.employees * args.months} baris payroll, {args.readers} pembaca + {args.writers} penulis, "
+          f"{args.seconds:g} dtk per mode\n")
+    print(f"{'mode':<10} {'journal':<8} {'baca/dtk':>10} {'p95 baca':>10} {'tulis/dtk':>10} {'p95 tulis':>10} "
+          f"{'locked':>7}")
+    results = []
+    for name, mode_pragmas in (("bawaan", {}), ("performa", pragmas)):
+        result = run_mode(name, mode_pragmas, args)
+        results.append(result)
+        read, write = result["read"], result["write"]
+        print(f"{name:<10} {result['journal']:<8} {read['ops_s']:>10.1f} {read['p95_ms']:>9.1f}ms "
+              f"{write['ops_s']:>10.1f} {write['p95_ms']:>9.1f}ms {read['errors'] + write['errors']:>7}")
+    before, after = results
+    for kind in ("read", "write"):
+        if before[kind]["ops_s"]:
+            print(f"{'baca' if kind == 'read' else 'tulis'}: {after[kind]['ops_s'] / before[kind]['ops_s']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,7 @@
 # seed_admin.py
-from app import app, db, User, generate_password_hash
+from werkzeug.security import generate_password_hash
+
+from app import app, db, User
 
 def seed_admin():
     admin_email = "cs@goldenfarm99.com"
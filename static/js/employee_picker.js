@@ -0,0 +1,119 @@
+// Typeahead pemilih karyawan berbasis /api/employees.
+//
+// Markup:
+// <div data-employee-picker data-api="/api/employees" class="position-relative">
+//   <input type="text" class="form-control" data-picker-input>
+//   <input type="hidden" name="employee_id" data-picker-value>
+//   <div class="list-group" data-picker-menu></div>
+// </div>
+//
+// Saat karyawan dipilih, input hidden diisi id lalu event "change" dikirim
+// ke input hidden tersebut.
+(function () {
+  const MIN_CONTAINS = 3;   // kata kunci pendek: cari awalan nama/NIK saja
+  const LIMIT = 10;
+
+  function esc(v) {
+    return String(v ?? '').replace(/[&<>"']/g, c => ({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'}[c]));
+  }
+
+  function label(emp) {
+    return emp.name + ' (' + emp.nik + (emp.position ? ' · ' + emp.position : '') + ')';
+  }
+
+  function initPicker(root) {
+    const api = root.dataset.api;
+    const input = root.querySelector('[data-picker-input]');
+    const hidden = root.querySelector('[data-picker-value]');
+    const menu = root.querySelector('[data-picker-menu]');
+    let items = [], active = -1, timer = null, seq = 0;
+
+    function close() {
+      menu.classList.add('d-none');
+      menu.innerHTML = '';
+      active = -1;
+    }
+
+    function choose(emp) {
+      input.value = label(emp);
+      hidden.value = emp.id;
+      close();
+      hidden.dispatchEvent(new Event('change', {bubbles: true}));
+    }
+
+    function render() {
+      if (!items.length) {
+        menu.innerHTML = '<div class="list-group-item text-muted small">Karyawan tidak ditemukan</div>';
+      } else {
+        menu.innerHTML = items.map((emp, i) =>
+          `<button type="button" class="list-group-item list-group-item-action${i === active ? ' active' : ''}" data-index="${i}">` +
+          `${esc(emp.name)} <small class="${i === active ? '' : 'text-muted'}">${esc(emp.nik)}${emp.position ? ' · ' + esc(emp.position) : ''}</small>` +
+          '</button>'
+        ).join('');
+      }
+      menu.classList.remove('d-none');
+    }
+
+    async function search(q) {
+      const mySeq = ++seq;
+      const params = new URLSearchParams({
+        q: q,
+        match: q.length < MIN_CONTAINS ? 'prefix' : 'contains',
+        fields: 'id,nik,name,position',
+        limit: LIMIT
+      });
+      const resp = await fetch(api + '?' + params.toString(), {headers: {'Accept': 'application/json'}});
+      if (mySeq !== seq || !resp.ok) return;
+      items = (await resp.json()).items;
+      active = items.length ? 0 : -1;
+      render();
+    }
+
+    input.addEventListener('input', () => {
+      hidden.value = '';
+      clearTimeout(timer);
+      const q = input.value.trim();
+      if (!q) { close(); return; }
+      timer = setTimeout(() => search(q), 200);
+    });
+
+    input.addEventListener('keydown', e => {
+      if (menu.classList.contains('d-none') || !items.length) return;
+      if (e.key === 'ArrowDown' || e.key === 'ArrowUp') {
+        e.preventDefault();
+        const step = e.key === 'ArrowDown' ? 1 : -1;
+        active = (active + step + items.length) % items.length;
+        render();
+      } else if (e.key === 'Enter') {
+        e.preventDefault();
+        if (active >= 0) choose(items[active]);
+      } else if (e.key === 'Escape') {
+        close();
+      }
+    });
+
+    // mousedown agar terpilih sebelum input kehilangan fokus
+    menu.addEventListener('mousedown', e => {
+      const btn = e.target.closest('[data-index]');
+      if (!btn) return;
+      e.preventDefault();
+      choose(items[Number(btn.dataset.index)]);
+    });
+    input.addEventListener('blur', close);
+
+    const form = root.closest('form');
+    if (form && root.hasAttribute('data-required')) {
+      form.addEventListener('submit', e => {
+        if (!hidden.value) {
+          e.preventDefault();
+          input.classList.add('is-invalid');
+          input.focus();
+        }
+      });
+    }
+  }
+
+  document.addEventListener('DOMContentLoaded', () => {
+    document.querySelectorAll('[data-employee-picker]').forEach(initPicker);
+  });
+})();
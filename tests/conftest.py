@@ -25,6 +25,8 @@ def app_instance():
 
     try:
         os.environ["DB_SEARCH_PATH"] = SCHEMA_NAME
+        # hook profiler dipasang saat create_app (tests/test_profiling.py)
+        os.environ["PROFILER_ENABLED"] = "1"
         os.environ["SQLALCHEMY_DATABASE_URI"] = DATABASE_URL
         if "app" in sys.modules:
             del sys.modules["app"]
@@ -0,0 +1,54 @@
+import io
+import zipfile
+from datetime import datetime
+
+
+def test_parquet_facts_partitioned_by_period(client, app_instance, tmp_path):
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    from payroll.extensions import db
+    from payroll.models import Employee, Loan, Payment, Payroll
+    from payroll.services.analytics_export import list_snapshots, write_facts, write_snapshot
+
+    with app_instance.app_context():
+        employee = Employee(nik="EMP-PQ-001", name="Parquet", position="Staff")
+        db.session.add(employee)
+        db.session.flush()
+        for period in ("2025-01", "2025-02", "2025-02"):
+            db.session.add(Payroll(employee_id=employee.id, pay_period=period, gaji_pokok=4_000_000))
+        loan = Loan(employee_id=employee.id, amount=1_000_000, tenor=2, interest_rate=0, installment=500_000,
+                    status="approved", application_date=datetime(2025, 1, 15))
+        db.session.add(loan)
+        db.session.flush()
+        db.session.add(Payment(loan_id=loan.id, payment_amount=500_000, status="approved",
+                               payment_date=datetime(2025, 2, 3)))
+        db.session.commit()
+
+        counts = write_facts(str(tmp_path / "all"))
+        assert counts["payroll"] == {"2025-01": 1, "2025-02": 2}
+        assert counts["loans"] == {"2025-01": 1}
+        assert counts["payments"] == {"2025-02": 1}
+
+        payroll = ds.dataset(str(tmp_path / "all" / "payroll"), format="parquet", partitioning="hive").to_table()
+        assert payroll.num_rows == 3
+        assert payroll.schema.field("take_home_pay").type == pa.float64()
+        assert payroll.schema.field("period_start").type == pa.date32()
+        assert sorted(payroll.column("pay_period").to_pylist()) == ["2025-01", "2025-02", "2025-02"]
+        loans = ds.dataset(str(tmp_path / "all" / "loans"), format="parquet", partitioning="hive").to_table()
+        assert loans.column("paid_amount").to_pylist() == [500_000.0]
+
+        assert write_facts(str(tmp_path / "one"), "2025-02")["payroll"] == {"2025-02": 2}
+
+        first = write_snapshot(str(tmp_path / "snapshots"), retention=1)
+        assert list_snapshots(str(tmp_path / "snapshots")) == [first]
+
+    with client.session_transaction() as sess:
+        sess["user_id"] = 1
+        sess["role"] = "admin"
+
+    resp = client.get("/reports/analytics_export?pay_period=2025-01")
+    assert resp.status_code == 200
+    names = zipfile.ZipFile(io.BytesIO(resp.data)).namelist()
+    assert "payroll/pay_period=2025-01/part-0.parquet" in names
+    assert "loans/pay_period=2025-01/part-0.parquet" in names
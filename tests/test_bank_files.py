@@ -0,0 +1,51 @@
+import io
+import zipfile
+
+
+def test_bank_files_split_per_bank_with_control_totals(client, app_instance, monkeypatch):
+    from payroll.extensions import db
+    from payroll.models import Employee, Payroll
+
+    monkeypatch.setitem(app_instance.config, "BANK_FILE_FORMATS", {"BCA": "fixed", "MANDIRI": "delimited"})
+
+    with app_instance.app_context():
+        people = [
+            ("EMP-BF-001", "Andi", "BCA", "123-456-7890", "approved", 5_000_000),
+            ("EMP-BF-002", "Budi", " bca ", "1111111111", "approved", 4_000_000),
+            ("EMP-BF-003", "Citra", "Mandiri", "9876543210", "approved", 3_000_000),
+            ("EMP-BF-004", "Dewi", "BNI", "5555", "approved", 2_000_000),
+            ("EMP-BF-005", "Eka", "BNI", None, "approved", 1_000_000),
+            ("EMP-BF-006", "Fajar", "BCA", "2222", "draft", 9_000_000),
+        ]
+        for nik, name, bank, rek, status, gaji in people:
+            employee = Employee(nik=nik, name=name, position="Staff", bank_name=bank, no_rek=rek)
+            db.session.add(employee)
+            db.session.flush()
+            db.session.add(Payroll(employee_id=employee.id, pay_period="2025-05", gaji_pokok=gaji, status=status))
+        db.session.commit()
+
+    with client.session_transaction() as sess:
+        sess["user_id"] = 1
+        sess["role"] = "admin"
+
+    resp = client.get("/reports/bank_files?pay_period=2025-05")
+    assert resp.status_code == 200
+    archive = zipfile.ZipFile(io.BytesIO(resp.data))
+    assert sorted(archive.namelist()) == [
+        "BCA_202505.txt", "BNI_202505.csv", "MANDIRI_202505.txt", "control_totals.csv", "exceptions.csv",
+    ]
+
+    bca = archive.read("BCA_202505.txt").decode("ascii").split("\r\n")
+    assert [line[0] for line in bca if line] == ["0", "1", "1", "9"]
+    assert {len(line) for line in bca if line} == {100}
+    assert bca[3][1:7] == "000002"
+    assert int(bca[3][7:27]) == 9_000_000 * 100
+    assert int(bca[3][27:42]) == 1234567890 + 1111111111
+
+    mandiri = archive.read("MANDIRI_202505.txt").decode("ascii").split("\r\n")
+    assert mandiri[1].startswith("D|1|9876543210|CITRA|3000000|")
+    assert mandiri[2] == "T|1|3000000|9876543210"
+
+    bni = archive.read("BNI_202505.csv").decode("ascii").split("\r\n")
+    assert bni[-2] == "TOTAL,1,,,2000000,5555"
+    assert "tanpa nomor rekening" in archive.read("exceptions.csv").decode()
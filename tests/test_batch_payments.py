@@ -0,0 +1,57 @@
+from datetime import datetime
+
+
+def test_batch_approve_selected_and_until_date(client, app_instance):
+    from payroll.extensions import db
+    from payroll.models import AuditLog, Employee, Loan, LoanSchedule, Payment, User
+    from payroll.services.loans import generate_loan_schedule
+
+    with app_instance.app_context():
+        admin = User(fullname="Admin", email="batch-admin@example.com", password="x", role="admin")
+        employee = Employee(nik="EMP-BATCH-001", name="Batch", position="Staff")
+        db.session.add_all([admin, employee])
+        db.session.flush()
+        loans = []
+        for _ in range(2):
+            loan = Loan(employee_id=employee.id, amount=600_000, tenor=2, interest_rate=0,
+                        installment=300_000, status="approved", approval_date=datetime(2025, 1, 10))
+            db.session.add(loan)
+            db.session.flush()
+            generate_loan_schedule(loan)
+            loans.append(loan)
+        first, second = loans
+        payments = [
+            Payment(loan_id=first.id, payment_amount=300_000, status="pending", payment_date=datetime(2025, 2, 1)),
+            Payment(loan_id=first.id, payment_amount=300_000, status="pending", payment_date=datetime(2025, 3, 1)),
+            Payment(loan_id=second.id, payment_amount=300_000, status="pending", payment_date=datetime(2025, 2, 5)),
+            Payment(loan_id=second.id, payment_amount=300_000, status="pending", payment_date=datetime(2025, 4, 1)),
+        ]
+        db.session.add_all(payments)
+        db.session.commit()
+        admin_id = admin.id
+        first_id, second_id = first.id, second.id
+        selected = [payments[0].id, payments[1].id]
+        late_id = payments[3].id
+
+    with client.session_transaction() as sess:
+        sess["user_id"] = admin_id
+        sess["role"] = "admin"
+        sess["user_name"] = "Admin"
+        sess["csrf_token"] = "token"
+
+    resp = client.post("/payments/batch", data={"csrf_token": "token", "action": "approve",
+                                                "scope": "selected", "payment_ids": selected})
+    assert resp.status_code == 302
+    resp = client.post("/payments/batch", data={"csrf_token": "token", "action": "approve",
+                                                "scope": "until", "until": "2025-03-31"})
+    assert resp.status_code == 302
+
+    with app_instance.app_context():
+        first = db.session.get(Loan, first_id)
+        second = db.session.get(Loan, second_id)
+        assert (first.status, first.paid_amount, first.pending_amount) == ("completed", 600_000, 0)
+        assert (second.status, second.paid_amount, second.pending_amount) == ("approved", 300_000, 300_000)
+        assert db.session.get(Payment, late_id).status == "pending"
+        assert LoanSchedule.query.filter_by(loan_id=first_id, status="paid").count() == 2
+        assert LoanSchedule.query.filter_by(loan_id=second_id, status="paid").count() == 1
+        assert AuditLog.query.filter(AuditLog.action == "batch_approve_payment").count() == 3
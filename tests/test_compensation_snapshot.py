@@ -0,0 +1,87 @@
+def _seed(db, Employee, CompensationComponent, EmployeeCompensation):
+    employee = Employee(nik="EMP-COMP-001", name="Komponen", position="Staff")
+    gaji = CompensationComponent(code="GP", name="Gaji Pokok", comp_type="gaji_pokok", default_value=0)
+    makan = CompensationComponent(code="TM", name="Tunjangan Makan", comp_type="tunjangan",
+                                  calc_type="percentage", default_value=10)
+    koperasi = CompensationComponent(code="KOP", name="Koperasi", comp_type="potongan", default_value=50_000)
+    db.session.add_all([employee, gaji, makan, koperasi])
+    db.session.flush()
+
+    db.session.add_all([
+        EmployeeCompensation(employee_id=employee.id, component_id=gaji.id, value=4_000_000, start_period=None),
+        EmployeeCompensation(employee_id=employee.id, component_id=gaji.id, value=5_000_000, start_period="2025-03"),
+        EmployeeCompensation(employee_id=employee.id, component_id=gaji.id, value=6_000_000, start_period="2025-07"),
+        EmployeeCompensation(employee_id=employee.id, component_id=makan.id, value=None, start_period="2025-01"),
+        EmployeeCompensation(employee_id=employee.id, component_id=koperasi.id, value=None, active=False),
+    ])
+    db.session.commit()
+    return employee, makan
+
+
+def test_snapshot_uses_latest_effective_assignment(app_instance):
+    from payroll.extensions import db
+    from payroll.models import CompensationComponent, Employee, EmployeeCompensation
+    from payroll.services.compensation import get_component_totals, invalidate_compensation_cache
+
+    with app_instance.app_context():
+        invalidate_compensation_cache()
+        employee, _ = _seed(db, Employee, CompensationComponent, EmployeeCompensation)
+
+        assert get_component_totals(employee.id, "2025-02")["gaji_pokok"] == 4_000_000
+
+        totals = get_component_totals(employee.id, "2025-05")
+        assert totals["gaji_pokok"] == 5_000_000
+        assert totals["tunjangan"] == 500_000
+        assert totals["potongan"] == 0
+        assert [item["code"] for item in totals["items"]] == ["TM"]
+
+        assert get_component_totals(employee.id, "2024-12") == {
+            "gaji_pokok": 4_000_000, "tunjangan": 0, "potongan": 0, "items": []}
+        assert get_component_totals(employee.id, "bukan-periode")["gaji_pokok"] == 0
+
+
+def test_snapshot_cache_invalidated_on_component_edit(client, app_instance):
+    from payroll.extensions import db
+    from payroll.models import CompensationComponent, Employee, EmployeeCompensation
+    from payroll.services.compensation import get_component_totals, invalidate_compensation_cache
+
+    with app_instance.app_context():
+        invalidate_compensation_cache()
+        employee, makan = _seed(db, Employee, CompensationComponent, EmployeeCompensation)
+        employee_id, makan_id = employee.id, makan.id
+        assert get_component_totals(employee_id, "2025-05")["tunjangan"] == 500_000
+
+    with client.session_transaction() as sess:
+        sess["user_id"] = 1
+        sess["role"] = "admin"
+        sess["csrf_token"] = "token"
+    resp = client.post(f"/components/{makan_id}/toggle", data={"csrf_token": "token"})
+    assert resp.status_code == 302
+
+    with app_instance.app_context():
+        assert get_component_totals(employee_id, "2025-05")["tunjangan"] == 0
+
+
+def test_snapshot_cache_follows_version_bumped_by_other_worker(app_instance):
+    from payroll.extensions import db
+    from payroll.models import CompensationComponent, Employee, EmployeeCompensation
+    from payroll.services import compensation
+    from payroll.services.cache_versions import bump_cache_version, get_cache_version
+
+    with app_instance.app_context():
+        compensation.clear_compensation_cache()
+        employee, makan = _seed(db, Employee, CompensationComponent, EmployeeCompensation)
+        employee_id, makan_id = employee.id, makan.id
+        snapshot = compensation.compensation_snapshot("2025-05")
+        assert compensation.compensation_snapshot("2025-05") is snapshot
+
+    # worker lain: ubah data + naikkan versi tanpa menyentuh cache proses ini
+    with app_instance.app_context():
+        db.session.get(CompensationComponent, makan_id).default_value = 20
+        bump_cache_version(compensation.CACHE_VERSION_NAME)
+        db.session.commit()
+
+    with app_instance.app_context():
+        assert get_cache_version(compensation.CACHE_VERSION_NAME) == 1
+        assert compensation.compensation_snapshot("2025-05") is not snapshot
+        assert compensation.get_component_totals(employee_id, "2025-05")["tunjangan"] == 1_000_000
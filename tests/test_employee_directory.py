@@ -0,0 +1,81 @@
+def _login_admin(client):
+    with client.session_transaction() as sess:
+        sess["user_id"] = 1
+        sess["role"] = "admin"
+        sess["user_name"] = "Admin"
+
+
+def _seed(app_instance):
+    from payroll.extensions import db
+    from payroll.models import Employee
+
+    with app_instance.app_context():
+        for i in range(5):
+            db.session.add(Employee(nik=f"EMP-DIR-{i:03d}", name=f"Karyawan {i}", position="Staff",
+                                    no_rek=f"70000{i}"))
+        db.session.add(Employee(nik="EMP-DIR-ARC", name="Arsip", position="Staff", status="inactive"))
+        db.session.commit()
+
+
+def test_directory_requires_admin(client):
+    assert client.get("/api/employees").status_code == 401
+
+
+def test_directory_keyset_pagination_and_projection(client, app_instance):
+    _seed(app_instance)
+    _login_admin(client)
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2, "fields": "id,name"}
+        if cursor:
+            params["after"] = cursor
+        resp = client.get("/api/employees", query_string=params)
+        assert resp.status_code == 200
+        page = resp.get_json()
+        assert all(set(item) == {"id", "name"} for item in page["items"])
+        seen += [item["name"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    assert seen == [f"Karyawan {i}" for i in range(5)]
+
+
+def test_directory_search_and_status(client, app_instance):
+    _seed(app_instance)
+    _login_admin(client)
+
+    resp = client.get("/api/employees", query_string={"q": "emp-dir-00", "match": "prefix"})
+    assert [e["nik"] for e in resp.get_json()["items"]] == [f"EMP-DIR-{i:03d}" for i in range(5)]
+
+    resp = client.get("/api/employees", query_string={"q": "700003"})
+    assert [e["name"] for e in resp.get_json()["items"]] == ["Karyawan 3"]
+
+    resp = client.get("/api/employees", query_string={"status": "inactive", "fields": "nik,status"})
+    assert resp.get_json()["items"] == [{"nik": "EMP-DIR-ARC", "status": "inactive"}]
+
+    assert client.get("/api/employees", query_string={"fields": "password"}).status_code == 400
+    assert client.get("/api/employees", query_string={"after": "!!"}).status_code == 400
+
+
+def test_directory_rejects_tampered_cursor(client, app_instance):
+    from payroll.services.directory import encode_cursor
+
+    _seed(app_instance)
+    _login_admin(client)
+
+    tampered = [
+        encode_cursor(["Karyawan 1", "bukan-id"]),   # id bukan int
+        encode_cursor(["Karyawan 1"]),               # jumlah elemen salah
+        encode_cursor([1, 2]),                       # nama bukan str
+        encode_cursor(["Karyawan 1", True]),
+        "bukan-base64!",
+    ]
+    for cursor in tampered:
+        resp = client.get("/api/employees", query_string={"after": cursor})
+        assert resp.status_code == 400, cursor
+        assert resp.get_json()["error"] == "cursor tidak valid"
+    resp = client.get("/api/employees", query_string={"sort": "id", "after": encode_cursor(["5"])})
+    assert resp.status_code == 400
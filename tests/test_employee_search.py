@@ -0,0 +1,92 @@
+import sqlalchemy as sa
+
+
+def _seed(db, Employee):
+    db.session.add_all([
+        Employee(nik="EMP-SRC-001", name="Budi Santoso", position="Akuntan", no_rek="1234500001"),
+        Employee(nik="EMP-SRC-002", name="Siti 100%", position="Kasir", no_rek="9876500002"),
+    ])
+    db.session.commit()
+
+
+def test_search_matches_name_nik_position_and_account(app_instance):
+    from payroll.extensions import db
+    from payroll.models import Employee
+    from payroll.services.search import employee_search_filter
+
+    with app_instance.app_context():
+        _seed(db, Employee)
+
+        def names(keyword):
+            return sorted(e.name for e in Employee.query.filter(employee_search_filter(keyword)))
+
+        assert names("santoso") == ["Budi Santoso"]
+        assert names("src-002") == ["Siti 100%"]
+        assert names("akun") == ["Budi Santoso"]
+        assert names("98765") == ["Siti 100%"]
+        # % dan _ diperlakukan sebagai karakter biasa
+        assert names("0%") == ["Siti 100%"]
+        assert names("_") == []
+
+
+def test_sqlite_fts_index_stays_in_sync():
+    from payroll.models import Employee
+    from payroll.services.search import employee_search_filter
+
+    engine = sa.create_engine("sqlite://")
+    Employee.__table__.create(engine)
+    with engine.begin() as conn:
+        conn.execute(sa.insert(Employee.__table__), [
+            {"nik": "EMP-FTS-001", "name": "Budi Santoso", "position": "Akuntan"},
+            {"nik": "EMP-FTS-002", "name": "Siti Aminah", "position": "Kasir"},
+        ])
+        conn.execute(sa.update(Employee.__table__)
+                     .where(Employee.__table__.c.nik == "EMP-FTS-002")
+                     .values(no_rek="5550001"))
+
+        def names(keyword):
+            query = sa.select(Employee.__table__.c.name).where(employee_search_filter(keyword, conn))
+            return sorted(conn.execute(query).scalars())
+
+        assert names("SANTO") == ["Budi Santoso"]
+        assert names("fts-00") == ["Budi Santoso", "Siti Aminah"]
+        assert names("5550001") == ["Siti Aminah"]
+        # kata kunci < 3 karakter memakai ILIKE biasa
+        assert names("ti") == ["Siti Aminah"]
+    Employee.__table__.drop(engine)
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql(
+            "SELECT count(*) FROM sqlite_master WHERE name = 'employee_fts'").scalar() == 0
+
+
+def test_sqlite_backup_skips_fts_tables(tmp_path):
+    import json
+    import os
+
+    from payroll import create_app
+    from payroll.backup import export_database_json
+    from payroll.config import build_engine_options
+    from payroll.extensions import db
+    from payroll.models import Employee
+    from payroll.services import search
+
+    url = f"sqlite:///{tmp_path / 'payroll.db'}"
+    app = create_app({"SQLALCHEMY_DATABASE_URI": url, "SQLALCHEMY_ENGINE_OPTIONS": build_engine_options(url),
+                      "SQLALCHEMY_BINDS": {}, "AUTO_BACKUP_WORKER": False})
+    with app.app_context():
+        db.create_all()
+        db.session.add(Employee(nik="EMP-FTS-101", name="Budi Santoso"))
+        db.session.commit()
+        assert db.session.query(Employee).filter(search.employee_search_filter("Santo")).count() == 1
+        assert search._fts_ready_engines.get(db.engine) is True
+
+        path = export_database_json()
+        try:
+            with open(path, encoding="utf-8") as handle:
+                tables = json.load(handle)["tables"]
+        finally:
+            os.remove(path)
+        assert len(tables["employee"]) == 1
+        assert not [name for name in tables if name.startswith("employee_fts")]
+        db.session.remove()
+        db.engine.dispose()
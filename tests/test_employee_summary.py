@@ -0,0 +1,78 @@
+def test_dashboard_summary_cached_until_payment_change(client, app_instance):
+    from payroll.extensions import db
+    from payroll.models import Employee, Loan, Payment, User
+    from payroll.services.employee_summary import employee_summary, invalidate_employee_summary
+
+    with app_instance.app_context():
+        invalidate_employee_summary()
+        user = User(fullname="Karyawan", email="summary@example.com", password="x", role="user")
+        db.session.add(user)
+        db.session.flush()
+        employee = Employee(nik="EMP-SUM-001", name="Ringkasan", position="Staff", user_id=user.id)
+        db.session.add(employee)
+        db.session.flush()
+        loan = Loan(employee_id=employee.id, amount=1_000_000, tenor=4, interest_rate=0,
+                    installment=250_000, status="approved", installments_paid=0)
+        db.session.add(loan)
+        db.session.flush()
+        db.session.add_all([
+            Payment(loan_id=loan.id, payment_amount=250_000, status="posted"),
+            Payment(loan_id=loan.id, payment_amount=250_000, status="approved"),
+            Payment(loan_id=loan.id, payment_amount=250_000, status="pending"),
+        ])
+        db.session.commit()
+        user_id, employee_id = user.id, employee.id
+
+        summary = employee_summary(employee_id)
+        [item] = summary["loans"]
+        assert item["paid"] == 500_000
+        assert item["paid_installments"] == [250_000, 250_000]
+        assert item["payment_count"] == 3
+        assert len(summary["active_payments"]) == 3
+        assert employee_summary(employee_id) is summary
+
+    with client.session_transaction() as sess:
+        sess["user_id"] = user_id
+        sess["role"] = "user"
+        sess["user_name"] = "Karyawan"
+        sess["csrf_token"] = "token"
+
+    resp = client.get("/employee_dashboard")
+    assert resp.status_code == 200
+    assert "Cicilan 2" in resp.get_data(as_text=True)
+
+    resp = client.post(f"/pay_loan/{item['id']}", data={"payment_amount": "100.000", "csrf_token": "token"})
+    assert resp.status_code == 302
+
+    with app_instance.app_context():
+        refreshed = employee_summary(employee_id)
+        assert refreshed is not summary
+        assert refreshed["loans"][0]["payment_count"] == 4
+
+
+def test_summary_cache_follows_version_bumped_by_other_worker(app_instance):
+    from payroll.extensions import db
+    from payroll.models import Employee, Loan
+    from payroll.services import employee_summary as summaries
+    from payroll.services.cache_versions import bump_cache_version
+
+    with app_instance.app_context():
+        summaries.invalidate_employee_summary()
+        employee = Employee(nik="EMP-SUM-002", name="Worker", position="Staff")
+        db.session.add(employee)
+        db.session.commit()
+        employee_id = employee.id
+        summary = summaries.employee_summary(employee_id)
+        assert summary["loans"] == []
+
+    # worker lain: tambah pinjaman + naikkan versi tanpa menyentuh cache proses ini
+    with app_instance.app_context():
+        db.session.add(Loan(employee_id=employee_id, amount=500_000, tenor=2, interest_rate=0,
+                            installment=250_000, status="approved", installments_paid=0))
+        bump_cache_version(summaries.cache_version_name(employee_id))
+        db.session.commit()
+
+    with app_instance.app_context():
+        refreshed = summaries.employee_summary(employee_id)
+        assert refreshed is not summary
+        assert len(refreshed["loans"]) == 1
@@ -0,0 +1,27 @@
+def test_pool_options_from_env(app_instance, monkeypatch):
+    from payroll.config import build_engine_options
+    from payroll.database import InstrumentedQueuePool
+
+    monkeypatch.setenv("DB_POOL_SIZE", "12")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "3")
+    monkeypatch.setenv("DB_STATEMENT_TIMEOUT_MS", "5000")
+    monkeypatch.delenv("DB_PGBOUNCER", raising=False)
+
+    options = build_engine_options("postgresql+psycopg2://u:p@localhost/db")
+    assert options["poolclass"] is InstrumentedQueuePool
+    assert options["pool_size"] == 12
+    assert options["max_overflow"] == 3
+    assert "-cstatement_timeout=5000" in options["connect_args"]["options"]
+
+
+def test_pgbouncer_mode_skips_startup_options(app_instance, monkeypatch):
+    from payroll.config import build_engine_options, build_session_params
+
+    monkeypatch.setenv("DB_PGBOUNCER", "1")
+    monkeypatch.setenv("DB_STATEMENT_TIMEOUT_MS", "5000")
+
+    url = "postgresql+psycopg://u:p@localhost/db"
+    options = build_engine_options(url)
+    assert "options" not in options.get("connect_args", {})
+    assert options["connect_args"]["prepare_threshold"] is None
+    assert build_session_params(url)["statement_timeout"] == "5000"
@@ -0,0 +1,71 @@
+from datetime import date
+
+
+def _login_admin(client, user_id):
+    with client.session_transaction() as sess:
+        sess["user_id"] = user_id
+        sess["role"] = "admin"
+        sess["user_name"] = "Admin"
+
+
+def test_schedule_generated_on_approval_and_tracks_payments(client, app_instance):
+    from payroll.extensions import db
+    from payroll.models import Employee, Loan, LoanSchedule, Payment, Payroll, User
+    from payroll.services.loans import (
+        installments_due,
+        loan_balances,
+        post_payments_to_payroll,
+        remaining_installments,
+    )
+    from payroll.utils import add_months
+
+    with app_instance.app_context():
+        admin = User(fullname="Admin", email="schedule-admin@example.com", password="x", role="admin")
+        employee = Employee(nik="EMP-SCH-001", name="Jadwal", position="Staff")
+        db.session.add_all([admin, employee])
+        db.session.flush()
+        loan = Loan(employee_id=employee.id, amount=900_000, tenor=3, interest_rate=0,
+                    installment=300_000, status="pending", installments_paid=0)
+        db.session.add(loan)
+        db.session.commit()
+        loan_id, employee_id, admin_id = loan.id, employee.id, admin.id
+
+    _login_admin(client, admin_id)
+    assert client.get(f"/approve_loan/{loan_id}").status_code == 302
+
+    with app_instance.app_context():
+        rows = LoanSchedule.query.filter_by(loan_id=loan_id).order_by(LoanSchedule.installment_number).all()
+        first_due = add_months(date.today(), 1)
+        assert [r.due_period for r in rows] == [first_due, add_months(first_due, 1), add_months(first_due, 2)]
+        assert {r.status for r in rows} == {"open"}
+
+        period = first_due.strftime("%Y-%m")
+        due = installments_due(period)
+        assert [item["number"] for item in due[employee_id]] == [1]
+        assert [item["number"] for item in remaining_installments(employee_id)] == [1, 2, 3]
+
+        payment = Payment(loan_id=loan_id, payment_amount=300_000, status="pending")
+        db.session.add(payment)
+        db.session.commit()
+        payment_id = payment.id
+
+    assert client.get(f"/approve_payment/{payment_id}").status_code == 302
+
+    with app_instance.app_context():
+        assert installments_due(period) == {}
+        assert loan_balances([loan_id])[loan_id] == {"paid": 300_000, "remaining": 600_000, "open_count": 2}
+
+        payroll = Payroll(employee_id=employee_id, pay_period=period, gaji_pokok=5_000_000, status="draft")
+        db.session.add(payroll)
+        db.session.flush()
+        post_payments_to_payroll(payroll, [payment_id])
+        db.session.commit()
+        payroll_id = payroll.id
+        assert LoanSchedule.query.filter_by(payment_id=payment_id).one().payroll_id == payroll_id
+
+    assert client.get(f"/delete_payroll/{payroll_id}").status_code == 302
+
+    with app_instance.app_context():
+        row = LoanSchedule.query.filter_by(payment_id=payment_id).one()
+        assert row.status == "paid"
+        assert row.payroll_id is None
@@ -0,0 +1,40 @@
+def test_running_totals_follow_payment_transitions(app_instance):
+    import sqlalchemy as sa
+
+    from payroll.extensions import db
+    from payroll.models import Employee, Loan
+    from payroll.services.loans import reconcile_loan_totals, set_payment_status, submit_payment
+
+    with app_instance.app_context():
+        employee = Employee(nik="EMP-TOT-001", name="Total", position="Staff")
+        db.session.add(employee)
+        db.session.flush()
+        loan = Loan(employee_id=employee.id, amount=1_000_000, tenor=2, interest_rate=10,
+                    installment=550_000, status="approved")
+        db.session.add(loan)
+        db.session.commit()
+
+        first = submit_payment(loan, 550_000)
+        second = submit_payment(loan, 550_000)
+        assert submit_payment(loan, 1) is None  # melebihi total 1.100.000
+        db.session.commit()
+        assert (loan.paid_amount, loan.pending_amount) == (0, 1_100_000)
+
+        assert set_payment_status(first, "approved")
+        assert not set_payment_status(first, "approved")
+        assert set_payment_status(second, "rejected")
+        db.session.commit()
+        db.session.refresh(loan)
+        assert (loan.paid_amount, loan.pending_amount, loan.remaining) == (550_000, 0, 550_000)
+
+        # posted tetap dihitung sebagai dibayar
+        assert set_payment_status(first, "posted")
+        db.session.commit()
+        assert db.session.scalar(sa.select(Loan.remaining).where(Loan.id == loan.id)) == 550_000
+
+        db.session.execute(sa.update(Loan).values(paid_amount=0))
+        db.session.commit()
+        assert reconcile_loan_totals(dry_run=True) == [loan.id]
+        assert reconcile_loan_totals() == [loan.id]
+        db.session.commit()
+        assert reconcile_loan_totals() == []
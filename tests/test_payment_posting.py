@@ -0,0 +1,119 @@
+import sqlalchemy as sa
+
+
+def _make_loan_with_payment(db, Employee, Loan, Payment, nik):
+    employee = Employee(nik=nik, name=f"Posting {nik}", position="Staff")
+    db.session.add(employee)
+    db.session.flush()
+
+    loan = Loan(
+        employee_id=employee.id,
+        amount=1_000_000,
+        tenor=2,
+        interest_rate=0,
+        installment=500_000,
+        status="approved",
+        installments_paid=0,
+    )
+    db.session.add(loan)
+    db.session.flush()
+
+    payment = Payment(loan_id=loan.id, payment_amount=500_000, status="approved")
+    db.session.add(payment)
+    db.session.commit()
+    return employee, loan, payment
+
+
+def _make_payroll(db, Payroll, employee_id, period):
+    payroll = Payroll(employee_id=employee_id, pay_period=period, gaji_pokok=5_000_000, status="draft")
+    db.session.add(payroll)
+    db.session.flush()
+    return payroll
+
+
+def test_payment_posted_only_once(app_instance):
+    from payroll.extensions import db
+    from payroll.models import Employee, Loan, Payment, Payroll, PayrollLoan
+    from payroll.services.loans import post_payments_to_payroll
+
+    with app_instance.app_context():
+        employee, loan, payment = _make_loan_with_payment(db, Employee, Loan, Payment, "EMP-POST-001")
+
+        first = _make_payroll(db, Payroll, employee.id, "2025-01")
+        assert post_payments_to_payroll(first, [payment.id]) == 500_000
+        db.session.commit()
+
+        second = _make_payroll(db, Payroll, employee.id, "2025-02")
+        assert post_payments_to_payroll(second, [payment.id]) == 0.0
+        db.session.commit()
+
+        reloaded = db.session.get(Loan, loan.id)
+        assert reloaded.installments_paid == 1
+        assert db.session.get(Payment, payment.id).status == "posted"
+        assert PayrollLoan.query.count() == 1
+
+
+def test_locked_payment_is_skipped(app_instance):
+    from payroll.extensions import db
+    from payroll.models import Employee, Loan, Payment, Payroll
+    from payroll.services.loans import post_payments_to_payroll
+
+    with app_instance.app_context():
+        employee, loan, payment = _make_loan_with_payment(db, Employee, Loan, Payment, "EMP-POST-002")
+
+        # worker lain memegang row lock atas payment yang sama
+        other = db.engine.connect()
+        trans = other.begin()
+        try:
+            other.execute(
+                sa.select(Payment.id).where(Payment.id == payment.id).with_for_update()
+            ).all()
+
+            payroll = _make_payroll(db, Payroll, employee.id, "2025-03")
+            assert post_payments_to_payroll(payroll, [payment.id]) == 0.0
+            db.session.commit()
+        finally:
+            trans.rollback()
+            other.close()
+
+        assert db.session.get(Loan, loan.id).installments_paid == 0
+        assert db.session.get(Payment, payment.id).status == "approved"
+
+
+def test_postable_installments_for_all_employees(app_instance):
+    from datetime import datetime
+
+    from payroll.extensions import db
+    from payroll.models import Employee, Loan, Payment, Payroll
+    from payroll.services.loans import post_payments_to_payroll, postable_installments
+
+    with app_instance.app_context():
+        employee_a, loan_a, first = _make_loan_with_payment(db, Employee, Loan, Payment, "EMP-BULK-001")
+        first.payment_date = datetime(2025, 1, 10)
+        loan_a.tenor = 4
+        db.session.add_all([
+            Payment(loan_id=loan_a.id, payment_amount=500_000, status="approved",
+                    payment_date=datetime(2025, 2, 10)),
+            Payment(loan_id=loan_a.id, payment_amount=500_000, status="approved",
+                    payment_date=datetime(2025, 3, 10)),
+            Payment(loan_id=loan_a.id, payment_amount=500_000, status="pending",
+                    payment_date=datetime(2025, 1, 15)),
+        ])
+        employee_b, loan_b, other = _make_loan_with_payment(db, Employee, Loan, Payment, "EMP-BULK-002")
+        other.payment_date = datetime(2025, 1, 20)
+        db.session.commit()
+
+        payroll = _make_payroll(db, Payroll, employee_a.id, "2025-01")
+        post_payments_to_payroll(payroll, [first.id])
+        db.session.commit()
+
+        resolved = postable_installments()
+        assert set(resolved) == {employee_a.id, employee_b.id}
+        assert [(r["loan_id"], r["number"]) for r in resolved[employee_a.id]] == [(loan_a.id, 2), (loan_a.id, 3)]
+        assert resolved[employee_a.id][0]["employee_total"] == 1_000_000
+        assert [r["payment_id"] for r in resolved[employee_b.id]] == [other.id]
+
+        # hanya pembayaran sampai akhir periode
+        february = postable_installments(pay_period="2025-02")
+        assert [r["number"] for r in february[employee_a.id]] == [2]
+        assert postable_installments([employee_b.id]).keys() == {employee_b.id}
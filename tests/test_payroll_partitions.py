@@ -0,0 +1,59 @@
+from datetime import date
+
+import sqlalchemy as sa
+
+
+def test_partitioned_payroll_keeps_loan_links(app_instance):
+    from payroll import partitions
+    from payroll.extensions import db
+    from payroll.models import Employee, Loan, Payment, Payroll, PayrollLoan
+    from payroll.services.loans import post_payments_to_payroll
+
+    with app_instance.app_context():
+        employee = Employee(nik="EMP-PART-001", name="Partisi", position="Staff")
+        db.session.add(employee)
+        db.session.flush()
+        loan = Loan(employee_id=employee.id, amount=1_000_000, tenor=2, interest_rate=0,
+                    installment=500_000, status="approved", installments_paid=0)
+        db.session.add(loan)
+        db.session.flush()
+        payment = Payment(loan_id=loan.id, payment_amount=500_000, status="approved")
+        db.session.add(payment)
+        payroll = Payroll(employee_id=employee.id, pay_period="2024-11", gaji_pokok=5_000_000, status="draft")
+        db.session.add(payroll)
+        db.session.flush()
+        post_payments_to_payroll(payroll, [payment.id])
+        db.session.commit()
+        payroll_id = payroll.id
+        db.session.remove()
+
+        try:
+            with db.engine.begin() as conn:
+                assert partitions.enable_partitioning(conn)
+                names = [p["name"] for p in partitions.list_partitions(conn)]
+            assert names[0] == "payroll_y2024"
+            assert partitions.partition_name(date.today().year + partitions.DEFAULT_YEARS_AHEAD) in names
+
+            # pindah tahun = pindah partisi; FK payroll_loan ikut lewat ON UPDATE CASCADE
+            payroll = db.session.get(Payroll, payroll_id)
+            payroll.pay_period = "2025-02"
+            db.session.commit()
+            item = PayrollLoan.query.filter_by(payroll_id=payroll_id).one()
+            assert item.payroll_period_start == date(2025, 2, 1)
+            assert db.session.scalar(sa.text("SELECT count(*) FROM payroll_y2025")) == 1
+            db.session.remove()
+
+            with db.engine.begin() as conn:
+                assert partitions.detach_partition(conn, 2025) == 1
+            assert Payroll.query.count() == 0
+            assert PayrollLoan.query.count() == 0
+            db.session.remove()
+        finally:
+            db.session.remove()
+            with db.engine.begin() as conn:
+                partitions.disable_partitioning(conn)
+                conn.exec_driver_sql("DROP TABLE IF EXISTS payroll_y2025")
+                conn.exec_driver_sql(f"DROP TABLE IF EXISTS {partitions.LOAN_ARCHIVE_TABLE}")
+
+        with db.engine.connect() as conn:
+            assert not partitions.is_partitioned(conn)
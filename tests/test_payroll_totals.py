@@ -0,0 +1,69 @@
+import sqlalchemy as sa
+
+
+def _payroll(Payroll, employee_id, period, gaji_pokok, **extra):
+    values = dict(bpjs_ketenagakerjaan=0, bpjs_kesehatan=0, tunjangan_makan=0, tunjangan_transport=0,
+                  tunjangan_lainnya=0, potongan_gaji=0, alpha=0, hutang=0, upah_lembur=0, thr=0,
+                  pph21=0, loan_deduction=0, status="draft")
+    values.update(extra)
+    return Payroll(employee_id=employee_id, pay_period=period, gaji_pokok=gaji_pokok, **values)
+
+
+def test_stored_totals_match_hybrid_and_sort(client, app_instance):
+    from payroll.extensions import db
+    from payroll.models import Employee, Payroll
+
+    with app_instance.app_context():
+        employee = Employee(nik="EMP-THP-001", name="Take Home", position="Staff")
+        db.session.add(employee)
+        db.session.flush()
+        db.session.add_all([
+            _payroll(Payroll, employee.id, "2025-01", 3_000_000, alpha=1, tunjangan_makan=200_000),
+            _payroll(Payroll, employee.id, "2025-02", 9_000_000, pph21=500_000),
+            _payroll(Payroll, employee.id, "2025-03", 6_000_000),
+        ])
+        db.session.commit()
+        db.session.expire_all()
+
+        for p in Payroll.query.all():
+            assert p.stored_take_home_pay == p.take_home_pay
+            assert p.stored_total_deductions == p.total_deductions
+
+        ordered = db.session.scalars(sa.select(Payroll.pay_period).order_by(Payroll.take_home_pay.desc())).all()
+        assert ordered == ["2025-02", "2025-03", "2025-01"]
+        assert db.session.scalar(sa.select(sa.func.sum(Payroll.total_deductions))) == 600_000
+
+    with client.session_transaction() as sess:
+        sess["user_id"] = 1
+        sess["role"] = "admin"
+        sess["user_name"] = "Admin"
+
+    resp = client.get("/payrolls", query_string={"sort": "thp_asc", "min_thp": "5.000.000"})
+    assert resp.status_code == 200
+    html = resp.get_data(as_text=True)
+    assert "2025-01" not in html
+    assert html.index("2025-03") < html.index("2025-02")
+
+
+def test_period_start_follows_pay_period(app_instance):
+    from datetime import date
+
+    from payroll.extensions import db
+    from payroll.models import Employee, Payroll
+
+    with app_instance.app_context():
+        employee = Employee(nik="EMP-PER-001", name="Periode", position="Staff")
+        db.session.add(employee)
+        db.session.flush()
+        dec = _payroll(Payroll, employee.id, "2024-12", 1_000_000)
+        jan = _payroll(Payroll, employee.id, "2025-01", 2_000_000)
+        db.session.add_all([dec, jan])
+        db.session.commit()
+        assert dec.period_start == date(2024, 12, 1)
+
+        jan.pay_period = "2025-02"
+        db.session.commit()
+        assert db.session.scalar(sa.select(Payroll.period_start).where(Payroll.id == jan.id)) == date(2025, 2, 1)
+
+        assert [p.pay_period for p in Payroll.query.filter(Payroll.in_year(2025))] == ["2025-02"]
+        assert [p.pay_period for p in Payroll.query.filter(Payroll.in_period("2024-12"))] == ["2024-12"]
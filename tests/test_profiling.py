@@ -0,0 +1,69 @@
+import json
+import os
+
+
+def test_admin_profile_saved_and_listed(client, app_instance, monkeypatch, tmp_path):
+    monkeypatch.setitem(app_instance.config, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setitem(app_instance.config, "PROFILE_SAMPLE_INTERVAL_MS", 0.5)
+
+    with client.session_transaction() as sess:
+        sess["user_id"] = 1
+        sess["role"] = "user"
+    resp = client.get("/employee_dashboard?_profile=1")
+    assert "X-Profile-Id" not in resp.headers
+    assert os.listdir(tmp_path) == []
+
+    with client.session_transaction() as sess:
+        sess["user_id"] = 1
+        sess["role"] = "admin"
+        sess["user_name"] = "Admin"
+
+    resp = client.get("/payrolls?_profile=1")
+    assert resp.status_code == 200
+    profile_id = resp.headers["X-Profile-Id"]
+    assert os.path.isfile(tmp_path / f"{profile_id}.prof")
+
+    resp = client.get("/payrolls", headers={"X-Profile": "sample"})
+    sample_id = resp.headers["X-Profile-Id"]
+    with open(tmp_path / f"{sample_id}.speedscope.json", encoding="utf-8") as handle:
+        speedscope = json.load(handle)
+    profile = speedscope["profiles"][0]
+    assert profile["type"] == "sampled"
+    assert len(profile["samples"]) == len(profile["weights"])
+
+    listing = client.get("/admin/profiles?route=GET+/payrolls")
+    assert profile_id.encode() in listing.data and sample_id.encode() in listing.data
+
+    detail = client.get(f"/admin/profiles/{profile_id}")
+    assert b"cumulative" in detail.data
+    assert client.get(f"/admin/profiles/{profile_id}/download").status_code == 200
+    assert client.get("/admin/profiles/..%2Fetc").status_code == 404
+
+
+def test_streamed_response_profiled_until_close(client, monkeypatch, tmp_path):
+    import pstats
+
+    from payroll.blueprints import reports
+
+    monkeypatch.setitem(client.application.config, "PROFILE_DIR", str(tmp_path))
+
+    def rest_of_export():
+        return b"baris,lanjutan\n"
+
+    def fake_iter_csv(query_factory, pay_period):
+        yield b"header\n"
+        # hanya berjalan setelah view dan after_request selesai
+        yield rest_of_export()
+
+    monkeypatch.setattr(reports, "iter_csv", fake_iter_csv)
+    with client.session_transaction() as sess:
+        sess["user_id"] = 1
+        sess["role"] = "admin"
+
+    resp = client.get("/reports/compliance?pay_period=2025-06&_profile=1")
+    assert resp.status_code == 200 and resp.is_streamed
+    assert resp.data == b"header\nbaris,lanjutan\n"
+    resp.close()
+    profile_id = resp.headers["X-Profile-Id"]
+    stats = pstats.Stats(str(tmp_path / f"{profile_id}.prof"))
+    assert any(name == "rest_of_export" for _, _, name in stats.stats)
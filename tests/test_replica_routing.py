@@ -0,0 +1,67 @@
+import pytest
+import sqlalchemy as sa
+
+
+@pytest.fixture()
+def sqlite_replica(app_instance, tmp_path):
+    from payroll.database import replica_health
+    from payroll.extensions import db, REPLICA_BIND_KEY
+
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    with app_instance.app_context():
+        db.metadata.create_all(engine)
+        db.engines[REPLICA_BIND_KEY] = engine
+    replica_health.update(checked_at=0.0)
+    try:
+        yield engine
+    finally:
+        with app_instance.app_context():
+            db.engines.pop(REPLICA_BIND_KEY, None)
+        replica_health.update(checked_at=0.0, ok=False)
+        engine.dispose()
+
+
+def test_reads_routed_to_replica(app_instance, sqlite_replica):
+    from payroll.database import read_from_replica
+    from payroll.extensions import db
+    from payroll.models import Employee
+
+    with sqlite_replica.begin() as conn:
+        conn.execute(sa.insert(Employee.__table__).values(nik="EMP-RPL-001", name="Replica Only"))
+
+    with app_instance.app_context():
+        db.session.add(Employee(nik="EMP-PRI-001", name="Primary One"))
+        db.session.add(Employee(nik="EMP-PRI-002", name="Primary Two"))
+        db.session.commit()
+
+        with read_from_replica() as routed:
+            assert routed
+            assert Employee.query.count() == 1
+        assert Employee.query.count() == 2
+
+
+def test_unhealthy_replica_falls_back_to_primary(app_instance, sqlite_replica):
+    from payroll.database import read_from_replica, mark_replica_down
+    from payroll.extensions import db
+    from payroll.models import Employee
+
+    with app_instance.app_context():
+        db.session.add(Employee(nik="EMP-PRI-003", name="Primary Three"))
+        db.session.commit()
+
+        mark_replica_down("replica mati")
+        with read_from_replica() as routed:
+            assert not routed
+            assert Employee.query.count() == 1
+
+
+def test_report_route_uses_replica(client, sqlite_replica):
+    statements = []
+    sa.event.listen(
+        sqlite_replica, "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+
+    resp = client.get("/")
+    assert resp.status_code == 200
+    assert any("FROM employee" in stmt for stmt in statements)
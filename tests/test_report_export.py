@@ -0,0 +1,114 @@
+def test_compliance_report_copy_matches_streamed_fallback(client, app_instance):
+    from payroll.extensions import db
+    from payroll.models import Employee, Payroll
+    from payroll.services import report_export
+
+    with app_instance.app_context():
+        for i, gaji in enumerate((5_000_000.75, 4_200_000)):
+            employee = Employee(nik=f"EMP-CP-00{i}", name=f"Karyawan {i}", position="Staff",
+                                bank_name="BCA", no_rek=f"12345{i}")
+            db.session.add(employee)
+            db.session.flush()
+            db.session.add(Payroll(employee_id=employee.id, pay_period="2025-06", gaji_pokok=gaji,
+                                   tunjangan_makan=100_000, thr=50_000, pph21=25_000, status="approved"))
+        db.session.add(Payroll(employee_id=employee.id, pay_period="2025-07", gaji_pokok=1, status="draft"))
+        db.session.commit()
+
+    with client.session_transaction() as sess:
+        sess["user_id"] = 1
+        sess["role"] = "admin"
+
+    resp = client.get("/reports/compliance?pay_period=2025-06")
+    assert resp.status_code == 200
+    lines = resp.data.decode("utf-8").splitlines()
+    assert lines[0] == "Karyawan,NIK,Periode,Gaji Pokok,BPJS TK,BPJS KS,PPH21,Tunjangan,Potongan,THP"
+    assert lines[1] == "Karyawan 0,EMP-CP-000,2025-06,5000000,0,0,25000,150000,25000,5125000"
+    assert len(lines) == 3
+
+    with app_instance.app_context():
+        streamed = b"".join(report_export._iter_stream(
+            db.session.connection(), report_export.compliance_report_query("2025-06", "postgresql")))
+        assert streamed == resp.data
+
+    resp = client.get("/reports/bank_export?pay_period=2025-06&file_format=csv")
+    assert resp.data.decode("utf-8").splitlines()[2] == "Karyawan 1,EMP-CP-001,BCA,123451,4325000"
+
+
+def test_copy_stream_chunks_and_cancel(app_instance, monkeypatch):
+    from datetime import date
+
+    import sqlalchemy as sa
+
+    from payroll.extensions import db
+    from payroll.models import Employee, Payroll
+    from payroll.services import report_export
+
+    monkeypatch.setattr(report_export, "STREAM_CHUNK_BYTES", 1024)
+    monkeypatch.setattr(report_export, "STREAM_QUEUE_CHUNKS", 2)
+    with app_instance.app_context():
+        employee_ids = db.session.execute(sa.insert(Employee.__table__).returning(Employee.id), [
+            {"nik": f"EMP-ST-{i:04d}", "name": f"Karyawan {i:04d}"} for i in range(500)]).scalars().all()
+        db.session.execute(sa.insert(Payroll.__table__), [
+            {"employee_id": employee_id, "pay_period": "2025-06", "period_start": date(2025, 6, 1),
+             "gaji_pokok": 4_000_000} for employee_id in employee_ids])
+        db.session.commit()
+
+        chunks = list(report_export.iter_csv(report_export.compliance_report_query, "2025-06"))
+        assert len(chunks) > 2
+        assert all(len(chunk) >= 1024 for chunk in chunks[:-1])
+        streamed = b"".join(report_export._iter_stream(
+            db.session.connection(), report_export.compliance_report_query("2025-06", "postgresql")))
+        assert b"".join(chunks) == streamed
+
+        # download diputus setelah potongan pertama: COPY dihentikan, thread selesai
+        partial = report_export.iter_csv(report_export.compliance_report_query, "2025-06")
+        assert next(partial).startswith(b"Karyawan,NIK")
+        partial.close()
+        db.session.rollback()
+        assert db.session.execute(sa.select(sa.func.count()).select_from(Payroll)).scalar() == 500
+
+
+def test_streamed_export_survives_replica_route(client, app_instance, monkeypatch):
+    from datetime import date
+
+    import sqlalchemy as sa
+
+    from payroll.database import replica_health
+    from payroll.extensions import db, REPLICA_BIND_KEY
+    from payroll.models import Employee, Payroll
+    from payroll.services import report_export
+
+    monkeypatch.setattr(report_export, "STREAM_CHUNK_BYTES", 4096)
+    with app_instance.app_context():
+        employee_ids = db.session.execute(sa.insert(Employee.__table__).returning(Employee.id), [
+            {"nik": f"EMP-RS-{i:04d}", "name": f"Karyawan {i:04d}"} for i in range(2000)]).scalars().all()
+        db.session.execute(sa.insert(Payroll.__table__), [
+            {"employee_id": employee_id, "pay_period": "2025-06", "period_start": date(2025, 6, 1),
+             "gaji_pokok": 4_000_000} for employee_id in employee_ids])
+        db.session.commit()
+        expected = b"".join(report_export._iter_stream(
+            db.session.connection(), report_export.compliance_report_query("2025-06", "postgresql")))
+        # "replica" Postgres kedua ke database yang sama
+        replica = sa.create_engine(db.engine.url, **app_instance.config["SQLALCHEMY_ENGINE_OPTIONS"])
+        db.engines[REPLICA_BIND_KEY] = replica
+    replica_health.update(checked_at=0.0)
+
+    copy_engines = []
+    iter_copy = report_export._iter_copy
+    monkeypatch.setattr(report_export, "_iter_copy",
+                        lambda connection, query: copy_engines.append(connection.engine) or iter_copy(connection, query))
+    try:
+        with client.session_transaction() as sess:
+            sess["user_id"] = 1
+            sess["role"] = "admin"
+        resp = client.get("/reports/compliance?pay_period=2025-06")
+        assert resp.status_code == 200
+        assert resp.data == expected
+        assert len(resp.data.splitlines()) == 2001
+        assert copy_engines == [replica]
+        assert replica.pool.checkedout() == 0
+    finally:
+        with app_instance.app_context():
+            db.engines.pop(REPLICA_BIND_KEY, None)
+        replica_health.update(checked_at=0.0, ok=False)
+        replica.dispose()
@@ -43,3 +43,14 @@ def test_payrolls_admin_access(client):
 
     resp = client.get("/payrolls")
     assert resp.status_code == 200
+
+
+def test_server_status_shows_pool_stats(client):
+    with client.session_transaction() as sess:
+        sess["user_id"] = 1
+        sess["role"] = "admin"
+        sess["user_name"] = "Admin"
+
+    resp = client.get("/admin/server_status")
+    assert resp.status_code == 200
+    assert b"Connection Pool" in resp.data
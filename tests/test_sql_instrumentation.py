@@ -0,0 +1,47 @@
+def test_request_query_stats_and_slow_query_table(client, app_instance, monkeypatch):
+    from payroll.database import get_sql_stats, parameter_shape, reset_sql_stats
+    from payroll.extensions import db
+    from payroll.models import Employee, Payroll
+
+    assert parameter_shape({"b": 1, "a": 2}) == "{a, b}"
+    assert parameter_shape([{"a": 1}, {"a": 2}], executemany=True) == "2 x {a}"
+    assert parameter_shape(None) == "-"
+
+    reset_sql_stats()
+    monkeypatch.setitem(app_instance.config, "SQL_SLOW_QUERY_MS", 0)
+    with app_instance.app_context():
+        employee = Employee(nik="EMP-SQL-001", name="Query", position="Staff")
+        db.session.add(employee)
+        db.session.flush()
+        db.session.add(Payroll(employee_id=employee.id, pay_period="2025-01", gaji_pokok=3_000_000))
+        db.session.commit()
+
+    with client.session_transaction() as sess:
+        sess["user_id"] = 1
+        sess["role"] = "admin"
+        sess["user_name"] = "Admin"
+
+    resp = client.get("/payrolls")
+    assert resp.status_code == 200
+    timing = resp.headers.getlist("Server-Timing")
+    assert timing[0].startswith("db;dur=") and "query" in timing[0]
+    assert timing[1].startswith("app;dur=")
+
+    with app_instance.app_context():
+        stats = get_sql_stats()
+        routes = {entry["route"]: entry for entry in stats["routes"]}
+        assert routes["GET /payrolls"]["requests"] == 1
+        assert routes["GET /payrolls"]["max_queries"] > 0
+        assert any(entry["route"] == "GET /payrolls" for entry in stats["slow_queries"])
+
+    for i in range(3):
+        assert client.get(f"/tidak-ada/{i}").status_code == 404
+    with app_instance.app_context():
+        routes = [entry["route"] for entry in get_sql_stats()["routes"]]
+        assert routes.count("GET <unmatched>") == 1
+        assert not [route for route in routes if "tidak-ada" in route]
+
+    resp = client.get("/admin/server_status")
+    assert b"Query Lambat" in resp.data
+    assert b"GET /payrolls" in resp.data
+    reset_sql_stats()
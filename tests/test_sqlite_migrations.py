@@ -0,0 +1,49 @@
+def test_populated_sqlite_upgrades_to_head_with_foreign_keys_on(tmp_path):
+    import os
+
+    import sqlalchemy as sa
+    from flask_migrate import Migrate, upgrade
+
+    from payroll import create_app
+    from payroll.config import BASE_DIR, build_engine_options
+    from payroll.extensions import db
+
+    url = f"sqlite:///{tmp_path / 'payroll.db'}"
+    app = create_app({"SQLALCHEMY_DATABASE_URI": url, "SQLALCHEMY_ENGINE_OPTIONS": build_engine_options(url),
+                      "SQLALCHEMY_BINDS": {}, "AUTO_BACKUP_WORKER": False})
+    assert app.config["SQLITE_PRAGMAS"]["foreign_keys"] == "ON"
+    Migrate(app, db)
+    directory = os.path.join(BASE_DIR, "migrations")
+
+    with app.app_context():
+        upgrade(directory=directory, revision="e7f8a9b0c1d2")
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql("INSERT INTO employee (id, nik, name) VALUES (1, 'EMP-MIG-1', 'Migrasi')")
+            conn.exec_driver_sql(
+                "INSERT INTO payroll (id, employee_id, pay_period, gaji_pokok, bpjs_ketenagakerjaan, bpjs_kesehatan, "
+                "tunjangan_makan, tunjangan_transport, tunjangan_lainnya, potongan_gaji, alpha, hutang, upah_lembur, "
+                "thr, pph21, loan_deduction, status) "
+                "VALUES (1, 1, '2025-01', 5000000, 0, 0, 500000, 0, 0, 0, 0, 0, 0, 0, 100000, 250000, 'approved')")
+            conn.exec_driver_sql(
+                "INSERT INTO loan (id, employee_id, amount, tenor, installment, status, installments_paid) "
+                "VALUES (1, 1, 1000000, 4, 250000, 'approved', 1)")
+            conn.exec_driver_sql(
+                "INSERT INTO payment (id, loan_id, payment_amount, status) VALUES (1, 1, 250000, 'posted')")
+            conn.exec_driver_sql(
+                "INSERT INTO payroll_loan (payroll_id, loan_id, installment_number, amount, payment_id) "
+                "VALUES (1, 1, 1, 250000, 1)")
+
+        upgrade(directory=directory)
+
+        with db.engine.connect() as conn:
+            tables = sa.inspect(conn).get_table_names()
+            assert not [name for name in tables if name.startswith("_alembic_tmp")]
+            assert conn.exec_driver_sql("PRAGMA foreign_key_check").all() == []
+            assert conn.exec_driver_sql("SELECT version_num FROM alembic_version").scalar() == "a8b9c0d1e2f3"
+            row = conn.exec_driver_sql(
+                "SELECT period_start, total_deductions, take_home_pay FROM payroll WHERE id = 1").one()
+            assert str(row[0]) == "2025-01-01"
+            assert row[1] == 350000
+            assert row[2] == 5150000
+            assert conn.exec_driver_sql("SELECT count(*) FROM payroll_loan").scalar() == 1
+        db.engine.dispose()
@@ -0,0 +1,78 @@
+def test_sqlite_performance_pragmas_and_maintenance(tmp_path):
+    from payroll import create_app
+    from payroll.config import build_engine_options
+    from payroll.database import run_scheduled_sqlite_maintenance, sqlite_maintenance_state, sqlite_pragma_status
+    from payroll.extensions import db
+
+    url = f"sqlite:///{tmp_path / 'payroll.db'}"
+    app = create_app({"SQLALCHEMY_DATABASE_URI": url, "SQLALCHEMY_ENGINE_OPTIONS": build_engine_options(url),
+                      "SQLALCHEMY_BINDS": {}, "AUTO_BACKUP_WORKER": False})
+    with app.app_context():
+        db.create_all()
+        status = sqlite_pragma_status(db.engine)
+        assert status["journal_mode"] == "wal"
+        assert status["synchronous"] == 1   # NORMAL
+        assert status["foreign_keys"] == 1
+        assert status["busy_timeout"] == 5000
+        assert status["auto_vacuum"] == 2   # INCREMENTAL (file baru)
+
+    sqlite_maintenance_state["last_run"] = None
+    results = run_scheduled_sqlite_maintenance(app)
+    assert list(results.values())[0]["wal_checkpoint"]["busy"] == 0
+    # interval belum lewat: tidak dijalankan lagi
+    assert run_scheduled_sqlite_maintenance(app) is None
+    sqlite_maintenance_state["last_run"] = None
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+def test_delete_routes_with_sqlite_foreign_keys(tmp_path):
+    from payroll import create_app
+    from payroll.config import build_engine_options
+    from payroll.extensions import db
+    from payroll.models import AuditLog, CompensationComponent, Employee, EmployeeCompensation, Payroll, User
+
+    url = f"sqlite:///{tmp_path / 'payroll.db'}"
+    app = create_app({"SQLALCHEMY_DATABASE_URI": url, "SQLALCHEMY_ENGINE_OPTIONS": build_engine_options(url),
+                      "SQLALCHEMY_BINDS": {}, "AUTO_BACKUP_WORKER": False, "TESTING": True})
+    with app.app_context():
+        db.create_all()
+        admin = User(fullname="Admin", email="admin@example.com", password="x", role="admin")
+        user = User(fullname="Approver", email="approver@example.com", password="x", role="admin")
+        component = CompensationComponent(code="GP", name="Gaji Pokok", comp_type="gaji_pokok")
+        db.session.add_all([admin, user, component])
+        db.session.flush()
+        employee = Employee(nik="EMP-FK-001", name="Karyawan FK", user_id=user.id)
+        db.session.add(employee)
+        db.session.flush()
+        db.session.add_all([
+            AuditLog(user_id=user.id, action="approve_payroll", entity_type="payroll", entity_id=1),
+            Payroll(employee_id=employee.id, pay_period="2025-06", gaji_pokok=1, status="draft",
+                    approved_by=user.id, submitted_by=user.id),
+            EmployeeCompensation(employee_id=employee.id, component_id=component.id, value=1),
+        ])
+        db.session.commit()
+        admin_id, user_id, employee_id = admin.id, user.id, employee.id
+
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess["user_id"] = admin_id
+        sess["role"] = "admin"
+        sess["csrf_token"] = "token"
+
+    resp = client.post(f"/delete_user/{user_id}", data={"csrf_token": "token"})
+    assert resp.status_code == 302
+    with app.app_context():
+        assert db.session.get(User, user_id) is None
+        assert AuditLog.query.one().user_id is None
+        assert Payroll.query.one().approved_by is None
+        assert db.session.get(Employee, employee_id).user_id is None
+
+    resp = client.get(f"/delete_employee/{employee_id}")
+    assert resp.status_code == 302
+    with app.app_context():
+        assert db.session.get(Employee, employee_id) is None
+        assert EmployeeCompensation.query.count() == 0
+        db.session.remove()
+        db.engine.dispose()
@@ -0,0 +1,55 @@
+from datetime import date
+
+import pytest
+
+
+def test_generate_synthetic_dataset_is_consistent(app_instance):
+    import sqlalchemy as sa
+
+    from payroll.extensions import db
+    from payroll.models import AuditLog, Employee, Loan, LoanSchedule, Payment, Payroll, PayrollLoan
+    from payroll.services.loans import reconcile_loan_totals
+    from payroll.synthetic import generate
+
+    with app_instance.app_context():
+        with db.engine.begin() as conn:
+            counts = generate(conn, employees=40, months=6, seed=7, end_period=date(2025, 6, 1),
+                              loan_ratio=0.5, chunk_size=50)
+        assert counts["employee"] == 40
+        assert counts["payroll"] == 240
+        assert counts["audit_log"] == 240 + counts["loan"]
+        assert counts["payment"] == counts["payroll_loan"] > 0
+
+        assert Payroll.query.filter(Payroll.in_period("2025-01")).count() == 40
+        assert db.session.scalar(sa.select(sa.func.sum(Payroll.loan_deduction))) == pytest.approx(
+            db.session.scalar(sa.select(sa.func.sum(Payment.payment_amount))))
+        assert reconcile_loan_totals(dry_run=True) == []
+        assert LoanSchedule.query.filter_by(status="paid").count() == counts["payment"]
+        assert PayrollLoan.query.count() == Payment.query.filter_by(status="posted").count()
+        assert AuditLog.query.filter_by(action="approve_loan").count() == Loan.query.count()
+
+        def synthetic_names():
+            query = Employee.query.filter(Employee.nik.like("SYN7-%")).order_by(Employee.nik).limit(5)
+            return [e.name for e in query]
+
+        first_names = synthetic_names()
+
+        # id baru tetap bisa dibuat lewat ORM setelah sequence disetel ulang
+        employee = Employee(nik="EMP-AFTER-SYN", name="Sesudah", position="Staff")
+        db.session.add(employee)
+        db.session.commit()
+
+        with pytest.raises(ValueError):
+            with db.engine.begin() as conn:
+                generate(conn, employees=1, months=1, seed=7)
+
+        db.session.execute(sa.delete(AuditLog))
+        for model in (LoanSchedule, PayrollLoan, Payment, Payroll, Loan):
+            db.session.execute(sa.delete(model))
+        db.session.commit()
+        db.session.execute(sa.text("DELETE FROM employee_compensation"))
+        db.session.execute(sa.delete(Employee).where(Employee.nik.like("SYN7-%")))
+        db.session.commit()
+        with db.engine.begin() as conn:
+            generate(conn, employees=40, months=6, seed=7, end_period=date(2025, 6, 1), loan_ratio=0.5)
+        assert synthetic_names() == first_names
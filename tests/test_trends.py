@@ -0,0 +1,88 @@
+def test_trends_snapshot_refreshed_on_approve(client, app_instance, monkeypatch, tmp_path):
+    from payroll.extensions import db
+    from payroll.models import Employee, Payroll, User
+    from payroll.services import trends
+
+    monkeypatch.setitem(app_instance.config, "ANALYTICS_SNAPSHOT_DIR", str(tmp_path))
+
+    with app_instance.app_context():
+        admin = User(fullname="Admin", email="trends-admin@example.com", password="x", role="admin")
+        db.session.add(admin)
+        employees = [Employee(nik=f"EMP-TR-00{i}", name=f"Tren {i}", position="Staff") for i in range(2)]
+        db.session.add_all(employees)
+        db.session.flush()
+        for period in ("2024-12", "2025-01"):
+            for employee in employees:
+                db.session.add(Payroll(employee_id=employee.id, pay_period=period, gaji_pokok=3_000_000,
+                                       pph21=100_000, status="approved"))
+        pending = Payroll(employee_id=employees[0].id, pay_period="2025-02", gaji_pokok=3_000_000,
+                          status="submitted")
+        db.session.add(pending)
+        db.session.commit()
+        admin_id, pending_id = admin.id, pending.id
+
+    with client.session_transaction() as sess:
+        sess["user_id"] = admin_id
+        sess["role"] = "admin"
+        sess["csrf_token"] = "token"
+
+    assert client.post(f"/payrolls/{pending_id}/approve", data={"csrf_token": "token"}).status_code == 302
+    worker = trends._refresh_state["thread"]
+    if worker is not None:
+        worker.join(timeout=30)
+
+    with app_instance.app_context():
+        data = trends.load_trends()
+        assert [row["key"] for row in data["yearly"]] == ["2024", "2025"]
+        assert [row["headcount"] for row in data["monthly"]] == [2, 2, 1]
+        assert data["yearly"][1]["cost"] == 9_000_000
+        assert data["yearly"][1]["deductions"] == 200_000
+        assert data["yearly"][1]["take_home"] == 8_800_000
+
+    resp = client.get("/dashboard/trends")
+    assert resp.status_code == 200
+    assert b"2024-12" in resp.data
+
+
+def test_trends_refresh_after_approve_reads_primary(client, app_instance, monkeypatch, tmp_path):
+    import sqlalchemy as sa
+
+    from payroll.database import replica_health
+    from payroll.extensions import db, REPLICA_BIND_KEY
+    from payroll.models import Employee, Payroll, User
+    from payroll.services import trends
+
+    monkeypatch.setitem(app_instance.config, "ANALYTICS_SNAPSHOT_DIR", str(tmp_path / "analytics"))
+    # replica yang tertinggal: skema ada, data belum tereplikasi
+    replica = sa.create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    with app_instance.app_context():
+        db.metadata.create_all(replica)
+        db.engines[REPLICA_BIND_KEY] = replica
+        admin = User(fullname="Admin", email="trends-primary@example.com", password="x", role="admin")
+        employee = Employee(nik="EMP-TR-101", name="Tren Primary", position="Staff")
+        db.session.add_all([admin, employee])
+        db.session.flush()
+        pending = Payroll(employee_id=employee.id, pay_period="2025-03", gaji_pokok=3_000_000,
+                          status="submitted")
+        db.session.add(pending)
+        db.session.commit()
+        admin_id, pending_id = admin.id, pending.id
+    replica_health.update(checked_at=0.0)
+
+    try:
+        with client.session_transaction() as sess:
+            sess["user_id"] = admin_id
+            sess["role"] = "admin"
+            sess["csrf_token"] = "token"
+        assert client.post(f"/payrolls/{pending_id}/approve", data={"csrf_token": "token"}).status_code == 302
+        worker = trends._refresh_state["thread"]
+        if worker is not None:
+            worker.join(timeout=30)
+
+        with app_instance.app_context():
+            assert [row["key"] for row in trends.load_trends()["monthly"]] == ["2025-03"]
+    finally:
+        with app_instance.app_context():
+            db.engines.pop(REPLICA_BIND_KEY, None)
+        replica_health.update(checked_at=0.0, ok=False)
+        replica.dispose()